@@ -1,34 +1,22 @@
 # Internal_Audit.py
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QSplitter,
-                             QHBoxLayout, QLabel, QPushButton, QLineEdit, QScrollArea, QGridLayout, QFrame, QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, 
+                             QHBoxLayout, QLabel, QPushButton, QLineEdit, QScrollArea, QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, 
                               QDialogButtonBox, QMessageBox, QMenuBar, QSizePolicy)
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QAction
+from PySide6.QtGui import QAction
 import sqlite3
 import os
 from datetime import datetime
 import re
-import json
-
-def replace_placeholders_recursive(text, name_to_term):
-    """
-    재귀(반복)적으로 {placeholder}를 치환하여
-    더 이상 치환할 부분이 없을 때 최종 문자열을 반환
-    """
-    pattern = r'\{([^}]+)\}'
-    
-    while True:
-        # re.sub에서 lambda로 매칭된 키를 체크하고, 있으면 치환, 없으면 그대로 둔다.
-        new_text = re.sub(pattern, lambda m: f"({name_to_term[m.group(1).strip()]})" 
-                            if m.group(1).strip() in name_to_term 
-                            else m.group(0), text)
-        
-        if new_text == text:
-            # 더 이상 치환되지 않았으면 break
-            break
-        text = new_text
-    
-    return text
+from ocr_search import get_ocr_index, open_search_connection, prepare_ocr_rank
+from audit_query import SearchSyntaxError, compile_search, build_search_query
+from search_terms import SearchTermCycleError, get_search_term_registry
+from preset_sweep import PresetSweepWorker, PresetHeatmapDialog, filter_matrix
+from thumbnail_cache import get_thumbnail_cache
+from image_grid import ImageGridView
+from image_store import image_store_for_db
+from image_dedup import ImageHashWorker, collapse_runs, loaded_hashes
+
 
 class InternalAuditWidget(QWidget):
     def __init__(self):
@@ -36,11 +24,14 @@ class InternalAuditWidget(QWidget):
         self.db_path = None  # db_path 초기화
         self.current_results = []  # 현재 결과를 저장할 리스트
         self.images_loaded = False  # 이미지 로드 여부 플래그
-        self.current_selected_box = None  # 현재 선택된 set-box를 추적하기 위한 변수
         self.last_clicked_timestamp = None  # 마지막으로 클릭한 이미지의 타임스탬프
         self.last_clicked_token = None      # 마지막으로 클릭한 이미지의 토큰
-        self.current_page = 1  # 현재 페이지
-        self.images_per_page = 28  # 페이지당 이미지 수
+        self.sweep_worker = None  # 프리셋 일괄 검색 스레드
+        self.sweep_matrix = None  # 캡처 × 프리셋 적중 행렬 (DataFrame)
+        self.sweep_presets = []   # 일괄 검색한 (프리셋 이름, 전개된 검색식) 목록
+        self.sweep_dialog = None  # 히트맵 대화상자
+        self.hash_worker = None   # ImageStore dHash 계산 스레드
+        self.image_hashes = None  # {토큰: dHash} - 유사 화면 접기에 사용
         self.setup_ui()
 
     def create_preset_button(self, text, click_handler):
@@ -148,6 +139,19 @@ class InternalAuditWidget(QWidget):
         reset_button.setStyleSheet(button_style)
         reset_button.clicked.connect(self.reset_search)
         left_layout.addWidget(reset_button)
+
+        # 프리셋 일괄 검색 버튼
+        self.sweep_button = QPushButton("일괄")
+        self.sweep_button.setToolTip("사용 설정된 저장 검색어(없으면 전체)를 한 번에 검색하여 날짜별 히트맵 표시")
+        self.sweep_button.setStyleSheet(button_style)
+        self.sweep_button.clicked.connect(self.run_preset_sweep)
+        left_layout.addWidget(self.sweep_button)
+
+        # 유사 화면 접기 (연속된 거의 같은 스크린샷을 타일 하나로 표시)
+        self.collapse_checkbox = QCheckBox("유사 화면 접기")
+        self.collapse_checkbox.setToolTip("지각 해시(dHash)가 거의 같은 연속 캡처를 첫 화면 하나로 접어서 표시")
+        self.collapse_checkbox.toggled.connect(self.on_collapse_toggled)
+        left_layout.addWidget(self.collapse_checkbox)
         
         # 자료 송수신 기록 버튼 추가
         PC_Messenger_button = self.create_preset_button(
@@ -195,23 +199,11 @@ class InternalAuditWidget(QWidget):
         # 스플리터 생성
         splitter = QSplitter(Qt.Vertical)
         
-        # 이미지 디스플레이를 위한 스크롤 영역 생성
-        self.image_scroll_area = QScrollArea()
-        self.image_scroll_area.setWidgetResizable(True)
-        # self.image_scroll_area.setMinimumHeight(400)
-        
-        # 이미지 컨테이너 설정
-        self.image_container = QWidget()
-        self.image_container.setMinimumWidth(800)
-        
-        # 이미지 레이아웃 설정
-        self.image_layout = QGridLayout(self.image_container)
-        self.image_layout.setSpacing(2)
-        self.image_layout.setHorizontalSpacing(2)
-        self.image_layout.setVerticalSpacing(0)
-        self.image_layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.image_scroll_area.setWidget(self.image_container)
+        # 썸네일 그리드 (보이는 타일만 그리는 QListView, 페이지 없이 연속 스크롤)
+        self.image_grid = ImageGridView()
+        self.image_grid.setMinimumWidth(800)
+        self.image_grid.capture_selected.connect(self.handle_image_click)
+        self.image_grid.capture_activated.connect(self.open_in_image_table)
         
         # 하단 텍스트 박스
         self.lower_text_box = QTextEdit()
@@ -219,7 +211,7 @@ class InternalAuditWidget(QWidget):
         # self.lower_text_box.setMinimumHeight(200)
         
         # 스플리터에 위젯 추가
-        splitter.addWidget(self.image_scroll_area)
+        splitter.addWidget(self.image_grid)
         splitter.addWidget(self.lower_text_box)
         
         # 스플리터 비율 설정 (7:3)
@@ -231,187 +223,108 @@ class InternalAuditWidget(QWidget):
         # 초기 텍스트 설정
         self.lower_text_box.setText("하단 분석 결과가 여기에 표시됩니다.")
 
-        # 이미지 컨테이너의 여백 제거
-        self.image_container.setContentsMargins(0, 0, 0, 0)
-
     def search_data_transfer(self, search_name):
         """프리셋 검색어로 검색 실행"""
-        try:
-            # 먼저 search_terms.json에서 해당 검색어명이 존재하는지 확인
-            with open('search_terms.json', 'r', encoding='utf-8') as f:
-                search_terms_file = json.load(f)
-                exists = any(term['name'] == search_name for term in search_terms_file)
-                
-                if exists:
-                    # 존재하는 검색어명이면 중괄호 형식으로 설정
-                    self.keyword_search.setText(f"{{{search_name}}}")
-                    self.search_images()
-                else:
-                    print(f"[Internal Audit] 경고: '{search_name}'은(는) search_terms.json에 정의되지 않은 검색어입니다.")
-                    QMessageBox.warning(self, "검색어 오류", 
-                        f"'{search_name}'은(는) 정의되지 않은 검색어입니다.\n"
-                        "search_terms.json 파일을 확인해주세요.")
-                    
-        except Exception as e:
-            print(f"[Internal Audit] search_terms.json 로드 오류: {e}")
+        # 검색어 레지스트리는 search_terms.json이 바뀌었을 때만 다시 읽음
+        registry = get_search_term_registry()
+        if registry.contains(search_name):
+            # 존재하는 검색어명이면 중괄호 형식으로 설정
+            self.keyword_search.setText(f"{{{search_name}}}")
+            self.search_images()
+        elif registry.load_error:
             QMessageBox.critical(self, "오류", 
-                f"search_terms.json 파일을 읽는 중 오류가 발생했습니다.\n{str(e)}")
+                f"search_terms.json 파일을 읽는 중 오류가 발생했습니다.\n{registry.load_error}")
+        else:
+            print(f"[Internal Audit] 경고: '{search_name}'은(는) search_terms.json에 정의되지 않은 검색어입니다.")
+            QMessageBox.warning(self, "검색어 오류", 
+                f"'{search_name}'은(는) 정의되지 않은 검색어입니다.\n"
+                "search_terms.json 파일을 확인해주세요.")
+
+    def run_preset_sweep(self):
+        """저장된 검색어(프리셋)를 한 번에 평가하여 캡처 × 프리셋 적중 행렬을 만듦"""
+        if self.db_path is None:
+            print("[Internal Audit] DB 경로가 설정되지 않았습니다.")
+            return
+        if self.sweep_worker is not None and self.sweep_worker.isRunning():
+            return
+
+        registry = get_search_term_registry()
+        registry.refresh()
+        names = [entry['name'].strip() for entry in registry.entries
+                 if entry.get('enabled') and entry.get('name', '').strip() in registry.terms]
+        if not names:
+            names = list(registry.terms)  # 사용 설정된 검색어가 없으면 전체
+        presets = []
+        for name in names:
+            try:
+                presets.append((name, registry.expand_name(name)))
+            except SearchTermCycleError as e:
+                print(f"[Internal Audit] 일괄 검색에서 제외: {e}")
+        if not presets:
+            self.lower_text_box.setText("일괄 검색할 저장 검색어가 없습니다.")
+            return
+        if self.sweep_matrix is not None and presets == self.sweep_presets:
+            self.show_sweep_heatmap()  # 검색어가 바뀌지 않았으면 이전 결과 재사용
+            return
+
+        self.sweep_button.setEnabled(False)
+        self.lower_text_box.setText(f"프리셋 {len(presets)}개 일괄 검색 중...")
+        self.sweep_worker = PresetSweepWorker(self.db_path, presets)
+        self.sweep_worker.progress.connect(self.on_sweep_progress)
+        self.sweep_worker.sweep_finished.connect(self.on_sweep_finished)
+        self.sweep_worker.sweep_failed.connect(self.on_sweep_failed)
+        self.sweep_worker.start()
+
+    def on_sweep_progress(self, done, total):
+        self.lower_text_box.setText(f"프리셋 일괄 검색 중... OCR {done}/{total}")
+
+    def on_sweep_finished(self, matrix, from_cache):
+        self.sweep_button.setEnabled(True)
+        self.sweep_matrix = matrix
+        self.sweep_presets = self.sweep_worker.presets
+        source = " (캐시)" if from_cache else ""
+        self.lower_text_box.setText(f"프리셋 {len(self.sweep_presets)}개 일괄 검색 완료{source}: 캡처 {len(matrix)}개")
+        self.show_sweep_heatmap()
+
+    def on_sweep_failed(self, message):
+        self.sweep_button.setEnabled(True)
+        self.lower_text_box.setText(message)
+
+    def show_sweep_heatmap(self):
+        """프리셋 × 날짜 히트맵 표시 (셀을 클릭하면 해당 캡처만 표시)"""
+        if self.sweep_dialog is not None:
+            self.sweep_dialog.close()
+        self.sweep_dialog = PresetHeatmapDialog(self.sweep_matrix, [name for name, _ in self.sweep_presets], self)
+        self.sweep_dialog.cell_selected.connect(self.show_sweep_cell)
+        self.sweep_dialog.show()
+
+    def show_sweep_cell(self, preset, day):
+        """적중 행렬에서 프리셋(및 날짜)에 해당하는 캡처를 표시 (DB 재검색 없음)"""
+        self.keyword_search.setText(f"{{{preset}}}")  # OCR 내용 강조 표시에 사용
+        results = filter_matrix(self.sweep_matrix, preset, day)
+        label = f"{preset} / {day}" if day else preset
+        if results:
+            self.display_images(results)
+            self.lower_text_box.setText(f"[{label}] 총 {len(results)}개의 결과가 검색되었습니다. (일괄 검색)")
+        else:
+            self.clear_images()
+            self.current_results = []
+            self.lower_text_box.setText(f"[{label}] 검색 결과가 없습니다.")
 
     def set_db_path(self, db_path):
         """데이터베이스 경로 설정"""
         print(f"[Internal Audit] DB 경로 설정: {db_path}")  # 디버깅 메시지
         self.db_path = db_path
+        self.sweep_matrix = None  # 다른 케이스의 일괄 검색 결과는 사용하지 않음
+        if self.hash_worker is not None:
+            self.hash_worker.cancel()  # 끝나면 on_hash_worker_finished에서 현재 케이스로 다시 시작
+        self.image_hashes = loaded_hashes(db_path)
+        if self.collapse_checkbox.isChecked() and self.image_hashes is None:
+            self.start_hash_worker()
+        get_ocr_index(db_path)  # OCR 검색 색인을 백그라운드에서 준비
 
     def search_images(self):
         """OCR, App, Web, File 검색 수행"""
-        # 검색 시작 시 현재 페이지를 1로 초기화
-        self.current_page = 1
-
-        def parse_expression(expression, patterns, param_list):
-            """검색 표현식 파싱 함수"""
-            print(f"[DEBUG] Parsing expression: '{expression}'")
-            
-            def process_special_patterns(expr, patterns):
-                """특수 검색어 패턴 처리"""
-                conditions = []
-                params = []
-                
-                for pattern, (like_condition, null_condition) in patterns.items():
-                    matches = re.finditer(pattern, expr)
-                    for match in matches:
-                        search_term = match.group(1)
-                        if search_term.lower() == "n/a":
-                            conditions.append(null_condition)
-                        else:
-                            conditions.append(like_condition)
-                            params.append(f"%{search_term}%")
-                        expr = expr.replace(match.group(0), "")
-                
-                return expr.strip(), conditions, params
-            
-            def process_term(term):
-                """단일 검색어 처리"""
-                is_not = term.startswith('!!')
-                if is_not:
-                    term = term[2:].strip()
-                
-                condition = """
-                    (wc.WindowTitle LIKE ? OR
-                        a.Name LIKE ? OR
-                        wctc.c2 LIKE ?)
-                """
-                
-                if is_not:
-                    condition = f"NOT {condition}"
-                
-                param_list.extend([f"%{term}%" for _ in range(3)])
-                return condition
-
-            def split_with_operator(expr, operator):
-                """연산자로 문자열 분리 (괄호 고려)"""
-                result = []
-                current = []
-                paren_count = 0
-                i = 0
-                
-                while i < len(expr):
-                    if expr[i] == '(':
-                        paren_count += 1
-                        current.append(expr[i])
-                    elif expr[i] == ')':
-                        paren_count -= 1
-                        current.append(expr[i])
-                    elif paren_count == 0 and i < len(expr) - 1 and expr[i:i+2] == operator:
-                        result.append(''.join(current).strip())
-                        current = []
-                        i += 1
-                    else:
-                        current.append(expr[i])
-                    i += 1
-                    
-                if current:
-                    result.append(''.join(current).strip())
-                return result
-
-            def process_group(expr):
-                """괄호로 묶인 그룹 처리"""
-                print(f"[DEBUG] Processing group: {expr}")
-                expr = expr.strip()
-                
-                if not expr:
-                    return "1=1"  # 빈 표현식은 항상 참인 조건으로 변환
-                
-                # 괄호 제거 (가장 바깥쪽만)
-                if expr.startswith('(') and expr.endswith(')'):
-                    # 괄호 균형 확인
-                    paren_count = 0
-                    for char in expr[:-1]:  # 마지막 괄호 제외
-                        if char == '(':
-                            paren_count += 1
-                        elif char == ')':
-                            paren_count -= 1
-                        if paren_count == 0:
-                            break
-                    if paren_count == 1:  # 올바른 괄호쌍
-                        inner_expr = expr[1:-1].strip()
-                        if not inner_expr:  # 빈 괄호인 경우
-                            return "1=1"
-                        expr = inner_expr
-                
-                # OR 연산자로 분리
-                or_terms = split_with_operator(expr, '||')
-                or_conditions = []
-                
-                for or_term in or_terms:
-                    # AND 연산자로 분리
-                    and_terms = split_with_operator(or_term, '&&')
-                    and_conditions = []
-                    
-                    for and_term in and_terms:
-                        term = and_term.strip()
-                        if not term:
-                            continue
-                        
-                        if term.startswith('!!'):
-                            # NOT 연산자 처리
-                            inner_term = term[2:].strip()
-                            if inner_term.startswith('('):
-                                and_conditions.append(f"NOT {process_group(inner_term)}")
-                            else:
-                                and_conditions.append(process_term(term))
-                        elif term.startswith('('):
-                            group_result = process_group(term)
-                            if group_result != "1=1":  # 빈 그룹이 아닌 경우만 추가
-                                and_conditions.append(group_result)
-                        else:
-                            and_conditions.append(process_term(term))
-                    
-                    if and_conditions:
-                        or_conditions.append(f"({' AND '.join(and_conditions)})")
-                
-                if not or_conditions:
-                    return "1=1"
-                
-                return f"({' OR '.join(or_conditions)})"
-
-            # 특수 패턴 처리
-            remaining_expr, special_conditions, special_params = process_special_patterns(expression, patterns)
-            param_list.extend(special_params)
-            
-            # 일반 검색어 처리
-            regular_condition = process_group(remaining_expr) if remaining_expr else ""
-            
-            # 최종 조건 결합
-            all_conditions = []
-            if special_conditions:
-                all_conditions.extend(special_conditions)
-            if regular_condition:
-                all_conditions.append(regular_condition)
-            
-            final_condition = ' AND '.join(f"({cond})" for cond in all_conditions) if all_conditions else ""
-            print(f"[DEBUG] Final SQL condition: {final_condition}")
-            return final_condition
-
         original_keyword = self.keyword_search.text().strip()  # 원본 키워드 저장
         if not original_keyword:
             self.load_all_images()
@@ -421,87 +334,31 @@ class InternalAuditWidget(QWidget):
             print("[Internal Audit] DB 경로가 설정되지 않았습니다.")
             return
 
-        # {} 패턴 여부 확인
-        has_braces = bool(re.search(r'\{([^}]+)\}', original_keyword))
-
-        processed_keyword = original_keyword
-        name_to_term = {}
-
-        # {}가 있을 때만 search_terms.json 로드
-        if has_braces and os.path.exists('search_terms.json'):
-            try:
-                with open('search_terms.json', 'r', encoding='utf-8') as f:
-                    saved_terms = json.load(f)
-                    print(f"[DEBUG] Loaded search_terms: {saved_terms}")
-                    # saved_terms: [{'enabled': bool, 'name': str, 'term': str, ...}, ...]
-                    for t in saved_terms:
-                        if 'name' in t and 'term' in t:
-                            name_to_term[t['name']] = t['term']
-            except Exception as e:
-                print(f"[Internal Audit] search_terms.json 로드 오류: {e}")
-
-        # {}가 있을 때만 {} 패턴을 실제 검색어로 변환
-        if has_braces:
-            # 재귀적으로(반복적으로) {...} 패턴을 치환
-            processed_keyword = replace_placeholders_recursive(original_keyword, name_to_term)
+        # {검색어명}을 저장된 검색어로 전개 (레지스트리가 전개 결과를 캐시)
+        try:
+            processed_keyword = get_search_term_registry().expand(original_keyword)
+        except SearchTermCycleError as e:
+            print(f"[Internal Audit] {e}")
+            self.lower_text_box.setText(str(e))
+            return
         
         print(f"[DEBUG] Final processed_keyword after braces replacement: '{processed_keyword}'")
         keyword = processed_keyword  # 이후 로직은 processed_keyword를 사용하여 검색
 
         try:
             print(f"[Internal Audit] 검색 시작 - 키워드: {keyword}")
-            conn = sqlite3.connect(self.db_path)
+            conn, use_index = open_search_connection(self.db_path)
             cursor = conn.cursor()
-            
-            params = []
-            conditions = []
-
-            # == 연산자를 사용한 검색 패턴
-            field_patterns = {
-                # 따옴표 없이 (\S+): 공백이 없는 문자열 매칭
-                r'%Web%\s*==\s*([^\s()]+)': ('w.Uri LIKE ?', 'w.Uri IS NULL'),
-                r'%Title%\s*==\s*([^\s()]+)': ('wc.WindowTitle LIKE ?', 'wc.WindowTitle IS NULL'),
-                r'%App%\s*==\s*([^\s()]+)': ('a.Name LIKE ?', 'a.Name IS NULL'),
-                r'%File%\s*==\s*([^\s()]+)': ('f.Path LIKE ?', 'f.Path IS NULL'),
-                r'%OCR%\s*==\s*([^\s()]+)': ('wctc.c2 LIKE ?', 'wctc.c2 IS NULL'),
-            }
 
-            # 검색어 파싱
-            remaining_text = keyword
-            for pattern, (like_condition, null_condition) in field_patterns.items():
-                matches = re.finditer(pattern, remaining_text)
-                for match in matches:
-                    search_term = match.group(1)  # (\S+) 캡처
-                    if search_term.lower() == "n/a":
-                        conditions.append(null_condition)
-                    else:
-                        conditions.append(like_condition)
-                        params.append(f"%{search_term}%")
-                    # 매칭된 부분을 제거
-                    remaining_text = remaining_text.replace(match.group(0), "")
-                # 남은 일반 검색어 처리
-            remaining_text = remaining_text.strip()
-            if remaining_text:
-                condition = parse_expression(remaining_text, field_patterns, params)
-                if condition:
-                    conditions.append(condition)
-
-            # 최종 쿼리 생성
-            where_clause = " AND ".join(f"({cond})" for cond in conditions) if conditions else "1=1"
-            
-            query = f"""
-            SELECT DISTINCT wc.TimeStamp, wc.ImageToken
-            FROM WindowCapture wc
-            LEFT JOIN WindowCaptureTextIndex_content wctc ON wc.Id = wctc.c0
-            LEFT JOIN WindowCaptureAppRelation wcar ON wc.Id = wcar.WindowCaptureId
-            LEFT JOIN App a ON wcar.AppId = a.Id
-            LEFT JOIN WindowCaptureWebRelation wcwr ON wc.Id = wcwr.WindowCaptureId
-            LEFT JOIN Web w ON wcwr.WebId = w.Id
-            LEFT JOIN WindowCaptureFileRelation wcfr ON wc.Id = wcfr.WindowCaptureId
-            LEFT JOIN File f ON wcfr.FileId = f.Id
-            WHERE {where_clause}
-            ORDER BY wc.TimeStamp ASC;
-            """
+            # 검색식을 AST로 파싱/최적화하여 하나의 파라미터 쿼리로 컴파일 (검색식별로 캐시)
+            try:
+                where_clause, params, rank_terms = compile_search(keyword, use_index)
+            except SearchSyntaxError as e:
+                conn.close()
+                print(f"[Internal Audit] 검색식 오류: {e}")
+                self.lower_text_box.setText(f"검색식 오류: {e}")
+                return
+            query = build_search_query(where_clause, prepare_ocr_rank(conn, rank_terms, use_index))
             
             print(f"[Internal Audit] 실행 SQL: {query}")
             print(f"[Internal Audit] 파라미터: {params}")
@@ -529,301 +386,86 @@ class InternalAuditWidget(QWidget):
                     self.clear_images()
                     self.lower_text_box.setText("검색 결과가 없습니다.")
                     self.current_results = []
-                    self.current_page = 1
                     
             else:
                 self.clear_images()
                 self.lower_text_box.setText("검색 결과가 없습니다.")
                 self.current_results = []
-                self.current_page = 1
                 
         except sqlite3.Error as e:
             print(f"[Internal Audit] 데이터베이스 오류: {e}")
             self.lower_text_box.setText(f"데이터베이스 오류: {e}")
 
     def display_images(self, results):
-        self.clear_images()
+        """결과를 썸네일 그리드에 표시 (썸네일은 보이는 타일부터 백그라운드에서 불러옴)"""
         if not self.db_path:
             print("[Internal Audit] DB 경로가 설정되지 않아 이미지를 표시할 수 없습니다.")
             return
-        
-        self.current_results = results
-        self.current_selected_box = None
-        
-        # 전체 페이지 수 계산
-        total_pages = (len(results) + self.images_per_page - 1) // self.images_per_page
-        
-        # 현재 페이지의 시작/끝 인덱스 계산
-        start_idx = (self.current_page - 1) * self.images_per_page
-        end_idx = min(start_idx + self.images_per_page, len(results))
-        
-        # 현재 페이지의 결과만 표시
-        current_page_results = results[start_idx:end_idx]
 
-        # 페이지네이션 컨테이너 생성
-        pagination_container = QWidget()
-        pagination_layout = QHBoxLayout(pagination_container)
-        pagination_layout.setAlignment(Qt.AlignTop | Qt.AlignCenter)
-        
-        # 이전 페이지 버튼
-        prev_button = QPushButton("<")
-        prev_button.setFixedSize(30, 30)
-        prev_button.clicked.connect(lambda: self.change_page('prev'))
-        prev_button.setEnabled(self.current_page > 1)
-        pagination_layout.addWidget(prev_button, 0, Qt.AlignTop)
-        
-        # 페이지 번호 버튼들
-        current_section = (self.current_page - 1) // 10
-        start_page = current_section * 10 + 1
-        end_page = min(start_page + 9, total_pages)
-        
-        for page in range(start_page, end_page + 1):
-            btn = QPushButton(str(page))
-            btn.setFixedSize(30, 30)
-            if page == self.current_page:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #0078D7;
-                        color: white;
-                        border: none;
-                        border-radius: 15px;
-                        font-weight: bold;
-                        font-size: 12pt;
-                    }
-                """)
-            else:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #f0f0f0;
-                        color: #333333;
-                        border: none;
-                        border-radius: 15px;
-                        font-weight: bold;
-                        font-size: 12pt;
-                    }
-                    QPushButton:hover {
-                        background-color: #e0e0e0;
-                    }
-                """)
-            btn.clicked.connect(lambda checked, p=page: self.change_page(p))
-            pagination_layout.addWidget(btn, 0, Qt.AlignTop)
-        
-        # 다음 페이지 버튼
-        next_button = QPushButton(">")
-        next_button.setFixedSize(30, 30)
-        next_button.clicked.connect(lambda: self.change_page('next'))
-        next_button.setEnabled(self.current_page < total_pages)
-        pagination_layout.addWidget(next_button, 0, Qt.AlignTop)
-        
-        # 이미지 레이아웃에 페이지네이션 추가
-        if len(current_page_results) > 0:
-            self.image_layout.addWidget(pagination_container, self.image_layout.rowCount(), 0, 1, -1)
+        self.current_results = results
+        self.image_grid.set_thumbnail_cache(
+            get_thumbnail_cache(os.path.join(os.path.dirname(self.db_path), "ImageStore")))
+        if self.collapse_checkbox.isChecked() and self.image_hashes is not None:
+            collapsed, run_lengths = collapse_runs(results, self.image_hashes)
+            print(f"[Internal Audit] 유사 화면 접기: {len(results)}개 -> {len(collapsed)}개")
+            self.image_grid.set_results(collapsed, run_lengths)
         else:
-            self.image_layout.addWidget(pagination_container, 0, 0, 1, -1)
+            self.image_grid.set_results(results)
 
-        # 컨테이너 너비 계산 방식 수정
-        container_width = self.image_scroll_area.width() - 12  # 스크롤바 영역을 명시적으로 제외
-        
-        # 디버깅을 위한 로그 추가
-        print(f"[Internal Audit] 컨테이너 너비: {container_width}")
-        print(f"[Internal Audit] 스크롤 영역 너비: {self.image_scroll_area.width()}")
-        print(f"[Internal Audit] 뷰포트 너비: {self.image_scroll_area.viewport().width()}")
-        print(f"[Internal Audit] 이미지 컨테이너 너비: {self.image_container.width()}")
-
-        selection_border_width = 2  # 선택 상자의 테두리 두께
-        grid_spacing = selection_border_width * 2  # 테두리 두께의 2배로 간격 설정
-        self.image_layout.setSpacing(grid_spacing)  # 전체 간격 설정
-        self.image_layout.setHorizontalSpacing(grid_spacing)  # 수평 간격 설정
-        self.image_layout.setVerticalSpacing(0)  # 수직 간격은 0으로 유지
-        self.image_layout.setContentsMargins(0, 0, 0, 0)  # 레이아웃의 여백 제거
-        images_per_row = 4
-
-        # 스크롤바 너비를 10px로 고정
-        scrollbar_width = 10
-        print(f"[Internal Audit] 스크롤바 너비: {scrollbar_width}")
-        
-        # 컨테이너 너비 조정
-        adjusted_container_width = container_width - scrollbar_width - grid_spacing
-        print(f"[Internal Audit] 조정된 컨테이너 너비: {adjusted_container_width}")
-        
-        # 이미지가 4개 이상일 때의 크기를 기준으로 고정
-        fixed_image_width = (adjusted_container_width - (grid_spacing * (images_per_row - 1))) // images_per_row
-        print(f"[Internal Audit] 계산된 이미지 너비: {fixed_image_width}")
-        fixed_image_height = int(fixed_image_width * 0.7)
-        timestamp_height = 17
-
-        # 중앙 정렬을 위한 컨테이너 생성
-        center_container = QWidget()
-        center_layout = QGridLayout(center_container)
-        center_layout.setSpacing(2)
-        center_layout.setContentsMargins(0, 0, 0, 0)
-
-        # 이미지 배치
-        for index, (timestamp, image_token) in enumerate(current_page_results):
-            # 이미지 토큰이 None인 경우 건너뛰기
-            if image_token is None:
-                print(f"[Internal Audit] 이미지 토큰이 None인 항목 건너뛰기 - TimeStamp: {timestamp}")
-                continue
-
-            set_box = QFrame()
-            set_layout = QVBoxLayout(set_box)
-            set_layout.setSpacing(0)
-            set_layout.setContentsMargins(0, 0, 0, 0)
-            set_layout.setAlignment(Qt.AlignCenter)  # 레이아웃 전체 중앙 정렬
-            
-            # 처음부터 2px의 투명한 테두리를 가지도록 설정
-            set_box.setStyleSheet("""
-                border: 2px solid transparent;  /* 투명한 테두리로 공간 유지 */
-                padding: 0px;
-                margin: 0px;
-                background-color: #ffffff;
-            """)
-
-            image_box = QLabel()
-            image_box.setAlignment(Qt.AlignCenter)
-            image_box.setContentsMargins(0, 0, 0, 0)
-            image_box.setStyleSheet("border: none; background-color: #ffffff;")
-
-            timestamp_box = QLabel()
-            timestamp_box.setAlignment(Qt.AlignCenter)  # Qt.AlignCenter는 수직/수평 모두 중앙 정렬
-            timestamp_box.setContentsMargins(0, 0, 0, 0)
-            timestamp_box.setStyleSheet("""
-                border: none; 
-                border-top: 1px solid #e0e0e0; 
-                background-color: #ffffff;
-                padding: 0px;
-                font-size: 12pt;
-                font-weight: bold;
-            """)
-            timestamp_box.setFixedHeight(timestamp_height)
-
-            # 타임스탬프 박스를 위한 컨테이너 생성
-            timestamp_container = QWidget()
-            timestamp_layout = QVBoxLayout(timestamp_container)
-            timestamp_layout.setContentsMargins(0, 0, 0, 0)
-            timestamp_layout.setSpacing(0)
-            timestamp_layout.addWidget(timestamp_box, 0, Qt.AlignCenter)  # 수직 중앙 정렬
-            
-            dt = datetime.fromtimestamp(timestamp / 1000)
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            timestamp_box.setText(formatted_time)
-
-            base_image_path = os.path.join(os.path.dirname(self.db_path), "ImageStore", image_token)
-            base_image_path = os.path.normpath(base_image_path)
-            possible_extensions = ['', '.jpg', '.jpeg', '.png']
-            image_path_with_ext = None
-
-            for ext in possible_extensions:
-                temp_path = base_image_path + ext
-                if os.path.exists(temp_path):
-                    image_path_with_ext = temp_path
-                    break
-
-            if image_path_with_ext:
-                pixmap = QPixmap(image_path_with_ext)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        fixed_image_width, fixed_image_height,  # 고정된 크기 사용
-                        Qt.KeepAspectRatio,
-                        Qt.SmoothTransformation
-                    )
-                    image_box.setPixmap(scaled_pixmap)
-                    timestamp_box.setFixedWidth(fixed_image_width)  # 고정된 너비 사용
-                    image_box.setFixedSize(fixed_image_width, fixed_image_height)  # 고정된 크기 사용
-
-                    # 클릭 이벤트 연결
-                    set_box.mousePressEvent = lambda e, box=set_box, t=timestamp: self.handle_image_click(box, t)
-
-                    set_layout.addWidget(image_box)
-                    set_layout.addWidget(timestamp_container)  # timestamp_box 대신 container 추가
-
-                    # 그리드 레이아웃에 추가
-                    row = index // images_per_row
-                    col = index % images_per_row
-                    center_layout.addWidget(set_box, row, col, Qt.AlignLeft | Qt.AlignTop)  # 왼쪽 상단 정렬
-                else:
-                    print("[Internal Audit] 이미지 로드 실패 (픽스맵이 NULL입니다):", image_path_with_ext)
-            else:
-                print("[Internal Audit] 이미지 파일을 찾을 수 없음:", base_image_path)
+    def on_collapse_toggled(self, checked):
+        """유사 화면 접기 전환 (해시가 없으면 백그라운드에서 먼저 계산)"""
+        if self.db_path is None:
+            return
+        if checked and self.image_hashes is None:
+            self.image_hashes = loaded_hashes(self.db_path)  # 다른 탭에서 계산했으면 재사용
+            if self.image_hashes is None:
+                self.start_hash_worker()
+                return
+        if self.current_results:
+            self.display_images(self.current_results)
 
-        # 빈 공간을 채우기 위한 스페이서 추가
-        center_layout.setColumnStretch(images_per_row, 1)
-        
-        # 중앙 컨테이너를 이미지 레이아웃에 추가
-        self.image_layout.addWidget(center_container, 0, 0, Qt.AlignLeft | Qt.AlignTop)
-
-    def update_pagination(self, total_pages):
-        # 기존 페이지 번호 버튼 제거
-        while self.page_numbers_layout.count():
-            item = self.page_numbers_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # 현재 페이지가 속한 구간 계산
-        current_section = (self.current_page - 1) // 10
-        start_page = current_section * 10 + 1
-        end_page = min(start_page + 9, total_pages)
-        
-        # 공통 버튼 스타일
-        button_style = """
-            QPushButton {
-                background-color: #f0f0f0;
-                color: #333333;
-                border: none;
-                border-radius: 15px;
-                font-weight: bold;
-                font-size: 12pt;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:disabled {
-                background-color: #f0f0f0;
-                color: #a0a0a0;
-            }
+    def start_hash_worker(self):
         """
-        
-        # 이전 버튼
-        self.prev_button.setStyleSheet(button_style)
-        self.prev_button.setEnabled(self.current_page > 1)
-        
-        # 페이지 번호 버튼 생성
-        for page in range(start_page, end_page + 1):
-            btn = QPushButton(str(page))
-            btn.setFixedSize(30, 30)
-            if page == self.current_page:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #0078D7;
-                        color: white;
-                        border: none;
-                        border-radius: 15px;
-                        font-weight: bold;
-                        font-size: 12pt;
-                    }
-                """)
-            else:
-                btn.setStyleSheet(button_style)
-            btn.clicked.connect(lambda checked, p=page: self.change_page(p))
-            self.page_numbers_layout.addWidget(btn)
-        
-        # 다음 버튼 (마지막에 추가)
-        self.next_button.setStyleSheet(button_style)
-        self.next_button.setEnabled(self.current_page < total_pages)
+        현재 케이스 ImageStore의 dHash 계산 시작.
+        이미 계산 중이면 무시하고, 이전 케이스 작업이 취소되는 중이면 그 작업이 끝난 뒤 다시 시작한다.
+        """
+        self.lower_text_box.setText("유사 화면 분석 중...")
+        if self.hash_worker is not None:
+            return
+        self.hash_worker = ImageHashWorker(self.db_path, parent=self)
+        self.hash_worker.progress.connect(self.on_hash_progress)
+        self.hash_worker.hashes_ready.connect(self.on_hashes_ready)
+        self.hash_worker.hashes_failed.connect(self.on_hashes_failed)
+        self.hash_worker.finished.connect(self.on_hash_worker_finished)
+        self.hash_worker.start()
+
+    def on_hash_worker_finished(self):
+        worker = self.sender()
+        if worker is self.hash_worker:
+            self.hash_worker = None
+            if worker.is_cancelled() and self.collapse_checkbox.isChecked() and self.image_hashes is None:
+                self.start_hash_worker()  # 케이스를 바꾸면서 취소된 작업 대신 현재 케이스로 다시 계산
+        worker.deleteLater()
+
+    def on_hash_progress(self, done, total):
+        if self.sender().is_cancelled():
+            return
+        self.lower_text_box.setText(f"유사 화면 분석 중... {done}/{total}")
+
+    def on_hashes_ready(self, db_path, hashes):
+        if self.sender().is_cancelled():
+            return  # 케이스를 바꿔 취소된 이전 작업의 결과
+        self.image_hashes = hashes
+        self.lower_text_box.setText(f"유사 화면 분석 완료: 이미지 {len(hashes)}개")
+        if self.collapse_checkbox.isChecked() and self.current_results:
+            self.display_images(self.current_results)
 
-    def change_page(self, page_action):
-        total_pages = (len(self.current_results) + self.images_per_page - 1) // self.images_per_page
-        
-        if isinstance(page_action, int):
-            self.current_page = page_action
-        elif page_action == 'prev':
-            # 한 페이지씩 이동
-            self.current_page = max(1, self.current_page - 1)
-        elif page_action == 'next':
-            # 한 페이지씩 이동
-            self.current_page = min(total_pages, self.current_page + 1)
-        
-        self.display_images(self.current_results)
+    def on_hashes_failed(self, message):
+        print(message)
+        if self.sender().is_cancelled():
+            return  # 케이스를 바꿔 취소된 작업은 끝난 뒤 다시 시작하므로 접기 유지
+        self.lower_text_box.setText(message)
+        self.collapse_checkbox.setChecked(False)
 
     def show_advanced_search_dialog(self):
         """고급 검색 대화상자 표시"""
@@ -834,19 +476,9 @@ class InternalAuditWidget(QWidget):
                 self.keyword_search.setText(search_query)
                 self.search_images()
 
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        # 창 크기 변경 시 이미지를 다시 표시
-        if self.current_results and event.oldSize().width() != event.size().width():
-            self.display_images(self.current_results)
-
     def clear_images(self):
-        """이미지 레이아웃 초기화"""
-        self.current_selected_box = None  # 선택 초기화
-        for i in reversed(range(self.image_layout.count())):
-            widget = self.image_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.deleteLater()
+        """이미지 그리드 초기화"""
+        self.image_grid.set_results([])
 
     def reset_search(self):
         """검색 초기화"""
@@ -874,28 +506,17 @@ class InternalAuditWidget(QWidget):
 
     def filter_existing_images(self, results):
         """이미지 파일이 존재하는 결과만 반환"""
-        image_dir = os.path.join(os.path.dirname(self.db_path), "ImageStore")
-        if not os.path.exists(image_dir):
-            print(f"[Internal Audit] 이미지 디렉토리가 존재하지 않습니다: {image_dir}")
+        image_store = image_store_for_db(self.db_path)
+        if not os.path.exists(image_store.image_dir):
+            print(f"[Internal Audit] 이미지 디렉토리가 존재하지 않습니다: {image_store.image_dir}")
             return []
 
-        filtered_results = []
-        for timestamp, image_token in results:
-            base_image_path = os.path.join(image_dir, image_token)
-            base_image_path = os.path.normpath(base_image_path)
-            possible_extensions = ['', '.jpg', '.jpeg', '.png']
-
-            image_exists = False
-            for ext in possible_extensions:
-                temp_path = base_image_path + ext
-                if os.path.exists(temp_path):
-                    image_exists = True
-                    break
-
-            if image_exists:
-                filtered_results.append((timestamp, image_token))
-            else:
-                print(f"[Internal Audit] 이미지 파일을 찾을 수 없음: {base_image_path}")
+        # ImageStore 색인(scandir 한 번)으로 확인하므로 토큰마다 파일 시스템을 조회하지 않음
+        filtered_results = [(timestamp, image_token) for timestamp, image_token in results
+                            if image_token in image_store]
+        missing_count = len(results) - len(filtered_results)
+        if missing_count:
+            print(f"[Internal Audit] 이미지 파일을 찾을 수 없음: {missing_count}개")
 
         return filtered_results
 
@@ -931,24 +552,12 @@ class InternalAuditWidget(QWidget):
             # 현재 검색어 가져오기
             original_search = self.keyword_search.text().strip()
 
-            # search_terms.json 로드해서 name_to_term 딕셔너리 구성
-            # {} 패턴 여부 확인
-            has_braces = bool(re.search(r'\{([^}]+)\}', original_search))
-            name_to_term = {}
-            if has_braces and os.path.exists('search_terms.json'):
-                try:
-                    with open('search_terms.json', 'r', encoding='utf-8') as f:
-                        saved_terms = json.load(f)
-                        for t in saved_terms:
-                            if 'name' in t and 'term' in t:
-                                name_to_term[t['name']] = t['term']
-                except Exception as e:
-                    print(f"[Internal Audit] search_terms.json 로드 오류: {e}")
-
-            # {}가 있을 때만 실제 검색어로 변환
-            processed_search = original_search
-            if has_braces:
-                processed_search = replace_placeholders_recursive(original_search, name_to_term)
+            # {}가 있을 때만 실제 검색어로 변환 (순환 참조면 원래 검색식으로 하이라이트)
+            try:
+                processed_search = get_search_term_registry().expand(original_search)
+            except SearchTermCycleError as e:
+                print(f"[Internal Audit] {e}")
+                processed_search = original_search
 
             print(f"[DEBUG][show_ocr_content] 최종 processed_search: '{processed_search}'")
             # 실제 하이라이트할 검색어들 추출
@@ -1264,9 +873,6 @@ class InternalAuditWidget(QWidget):
 
     def load_all_images(self):
         """모든 이미미지를 로드"""
-        # 페이지를 1로 초기화
-        self.current_page = 1
-        
         if self.db_path:
             try:
                 print("[Internal Audit] 모든 이미지 로드 시도")
@@ -1302,57 +908,19 @@ class InternalAuditWidget(QWidget):
         else:
             print("[Internal Audit] DB 경로가 설정되지 않았습니다.")
 
-    def handle_image_click(self, clicked_box, timestamp):
-        """이미지 클릭 이벤트 처리"""
-        # 이미 선택된 이미지를 다시 클릭했는지 확인
-        if self.current_selected_box == clicked_box:
-            # 더블클릭으로 간주하고 ImageTable로 이동
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("SELECT ImageToken FROM WindowCapture WHERE TimeStamp = ?", (timestamp,))
-                result = cursor.fetchone()
-                conn.close()
-
-                if result and result[0]:
-                    main_window = self.window()
-                    if hasattr(main_window, 'tab_widget') and hasattr(main_window, 'image_table_tab'):
-                        main_window.tab_widget.setCurrentWidget(main_window.image_table_tab)
-                        main_window.image_table_tab.display_image_from_token_with_index(result[0])
-                    return
-            except sqlite3.Error as e:
-                print(f"[Internal Audit] 데이터베이스 오류: {e}")
-        
-        # 단일 클릭 처리
-        try:
-            # 이전 선택된 박스가 유효한지 확인
-            if self.current_selected_box and self.current_selected_box.parent():
-                # 이전에 선택한 박스를 기본 스타일로 복원
-                self.current_selected_box.setStyleSheet("""
-                    border: 2px solid transparent;  /* 투명한 테두리로 공간 유지 */
-                    padding: 0px;
-                    margin: 0px;
-                    background-color: #ffffff;
-                """)
-        except RuntimeError:
-            # 이전 선택된 박스가 이미 삭제된 경우
-            pass
-
-        # 현재 클릭한 박스에 파란색 테두리 적용
-        clicked_box.setStyleSheet("""
-            border: 2px solid #007AFF;
-            padding: 0px;
-            margin: 0px;
-            background-color: #ffffff;
-        """)
-
-        # 클릭한 박스를 맨 앞으로 이동
-        clicked_box.raise_()
-
-        # 현재 클릭한 이미지 정보 저장
-        self.current_selected_box = clicked_box
+    def handle_image_click(self, timestamp, image_token):
+        """이미지 클릭 이벤트 처리: 선택한 캡처의 OCR 내용 표시"""
+        self.last_clicked_timestamp = timestamp
+        self.last_clicked_token = image_token
         self.show_ocr_content(timestamp)
 
+    def open_in_image_table(self, timestamp, image_token):
+        """선택된 이미지를 다시 클릭하면 ImageTable 탭으로 이동하여 해당 이미지 표시"""
+        main_window = self.window()
+        if hasattr(main_window, 'tab_widget') and hasattr(main_window, 'image_table_tab'):
+            main_window.tab_widget.setCurrentWidget(main_window.image_table_tab)
+            main_window.image_table_tab.display_image_from_token_with_index(image_token)
+
 class AdvancedSearchDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1530,19 +1098,16 @@ class AdvancedSearchDialog(QDialog):
                 })
         
         try:
-            with open('search_terms.json', 'w', encoding='utf-8') as f:
-                json.dump(search_data, f, ensure_ascii=False, indent=2)
+            get_search_term_registry().save(search_data)
             QMessageBox.information(self, "저장 완료", "검색어 설정이 저장되었습니다.")
         except Exception as e:
             QMessageBox.warning(self, "저장 실패", f"검색어 설정 저장 중 오류가 발생했습니다.\n{str(e)}")
 
     def load_search_terms(self):
         """저장된 검색어 설정 불러오기"""
-        try:
-            with open('search_terms.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
+        registry = get_search_term_registry()
+        registry.refresh()
+        return list(registry.entries)
 
     def apply_saved_search_terms(self):
         """저장된 검색어 설정을 UI에 적용"""
@@ -0,0 +1,170 @@
+# analysis_cache.py
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from locked_file import iter_chunks
+
+CACHE_FILE_NAME = "analysis_cache.db"
+ENTRIES_PER_KIND = 4  # 종류(kind)마다 남겨 둘 최근 항목 수 (오래된 항목의 테이블은 삭제)
+
+
+def default_cache_path():
+    """분석 결과 캐시 파일 기본 위치 (Recall_load 폴더)"""
+    return os.path.join(os.path.expanduser("~"), "Desktop", "Recall_load", CACHE_FILE_NAME)
+
+
+class AnalysisCache:
+    """
+    외부 도구/파서 결과(SRUM, Prefetch 등)를 원본 아티팩트 해시 기준으로 보관하는 SQLite 캐시.
+    DataFrame은 열 타입(dtype)과 함께 항목별 테이블에 저장되어, 케이스를 다시 열 때
+    외부 도구 실행과 CSV 파싱 없이 바로 복원된다.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or default_cache_path()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS FileHash (
+                    Path TEXT PRIMARY KEY,
+                    Size INTEGER,
+                    MTime REAL,
+                    SHA256 TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS CacheEntry (
+                    Kind TEXT,
+                    Key TEXT,
+                    TableName TEXT,
+                    Dtypes TEXT,
+                    RowCount INTEGER,
+                    CreatedAt TEXT,
+                    PRIMARY KEY (Kind, Key)
+                )
+            """)
+
+    @contextmanager
+    def connect(self):
+        """커밋 후 연결을 닫는 SQLite 연결 (스레드마다 새 연결 사용)"""
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # 아티팩트 해시
+    # ------------------------------------------------------------------
+    def file_hash(self, path):
+        """
+        파일의 SHA-256. (경로, 크기, 수정 시간)이 같으면 이전에 계산한 값을 재사용한다.
+        """
+        stat = os.stat(path)
+        with self.connect() as conn:
+            row = conn.execute("SELECT Size, MTime, SHA256 FROM FileHash WHERE Path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+
+        sha256 = hashlib.sha256()
+        for chunk in iter_chunks(path):
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+        with self._lock, self.connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO FileHash (Path, Size, MTime, SHA256) VALUES (?, ?, ?, ?)",
+                         (path, stat.st_size, stat.st_mtime, digest))
+        return digest
+
+    def artifact_key(self, paths, extra=()):
+        """
+        여러 원본 파일(예: SRUDB.dat + SOFTWARE)을 하나의 캐시 키로 묶음
+        :param extra: 결과에 영향을 주는 추가 조건 문자열 (예: 필터에 사용한 실행 파일 이름)
+        """
+        combined = hashlib.sha256()
+        for path in paths:
+            combined.update(os.path.basename(path).lower().encode("utf-8"))
+            combined.update(self.file_hash(path).encode("ascii"))
+        for value in extra:
+            combined.update(b"\x00" + str(value).encode("utf-8"))
+        return combined.hexdigest()
+
+    def directory_key(self, directory, extension):
+        """디렉토리 내 특정 확장자 파일 전체(예: Prefetch .pf)를 하나의 캐시 키로 묶음"""
+        paths = sorted(entry.path for entry in os.scandir(directory)
+                       if entry.is_file() and entry.name.lower().endswith(extension))
+        return self.artifact_key(paths)
+
+    # ------------------------------------------------------------------
+    # DataFrame 저장/복원
+    # ------------------------------------------------------------------
+    def load_frame(self, kind, key):
+        """캐시된 DataFrame 반환 (없으면 None)"""
+        with self.connect() as conn:
+            row = conn.execute("SELECT TableName, Dtypes FROM CacheEntry WHERE Kind = ? AND Key = ?",
+                               (kind, key)).fetchone()
+            if row is None:
+                return None
+            table_name, dtypes = row
+            try:
+                df = pd.read_sql_query(f'SELECT * FROM "{table_name}"', conn)
+            except (sqlite3.Error, pd.errors.DatabaseError) as e:
+                print(f"[ERROR] 분석 캐시 로드 실패 ({kind}): {e}")
+                return None
+
+        for column, dtype in json.loads(dtypes).items():
+            if column not in df.columns:
+                continue
+            if dtype.startswith("datetime64"):
+                df[column] = pd.to_datetime(df[column])
+            elif dtype == "bool":
+                df[column] = df[column].astype(bool)
+            elif dtype in ("category", "Int64"):
+                df[column] = df[column].astype(dtype)
+        print(f"[DEBUG] 분석 캐시 사용 ({kind}): {len(df)}개 행")
+        return df
+
+    def store_frame(self, kind, key, df, keep=ENTRIES_PER_KIND):
+        """
+        DataFrame을 열 타입 정보와 함께 저장 (같은 kind/key 항목은 교체).
+        같은 kind의 항목은 최근 keep개만 남기고 나머지는 테이블째 삭제한다.
+        """
+        table_name = f"{kind}_{key[:16]}"
+        dtypes = {column: str(dtype) for column, dtype in df.dtypes.items()}
+        with self._lock, self.connect() as conn:
+            conn.execute("DELETE FROM CacheEntry WHERE Kind = ? AND Key = ?", (kind, key))
+            df.to_sql(table_name, conn, index=False, if_exists="replace")
+            conn.execute(
+                "INSERT INTO CacheEntry (Kind, Key, TableName, Dtypes, RowCount, CreatedAt) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, table_name, json.dumps(dtypes), len(df), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            dropped = self._prune(conn, kind, keep)
+        print(f"[DEBUG] 분석 캐시 저장 ({kind}): {len(df)}개 행" + (f", 오래된 항목 {dropped}개 삭제" if dropped else ""))
+
+    def prune(self, kind, keep=ENTRIES_PER_KIND):
+        """kind 항목 중 최근 keep개만 남기고 삭제, 삭제한 항목 수 반환"""
+        with self._lock, self.connect() as conn:
+            return self._prune(conn, kind, keep)
+
+    @staticmethod
+    def _prune(conn, kind, keep):
+        # 항목을 교체할 때마다 새 행이 추가되므로 rowid 순서가 저장 순서
+        stale = conn.execute(
+            "SELECT Key, TableName FROM CacheEntry WHERE Kind = ? ORDER BY rowid DESC LIMIT -1 OFFSET ?",
+            (kind, keep)
+        ).fetchall()
+        for stale_key, stale_table in stale:
+            conn.execute("DELETE FROM CacheEntry WHERE Kind = ? AND Key = ?", (kind, stale_key))
+            in_use = conn.execute("SELECT 1 FROM CacheEntry WHERE TableName = ?", (stale_table,)).fetchone()
+            if in_use is None:
+                conn.execute(f'DROP TABLE IF EXISTS "{stale_table}"')
+        return len(stale)
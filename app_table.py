@@ -6,21 +6,36 @@ import subprocess
 import ctypes
 import json
 import time
+import threading
 from datetime import datetime, timedelta
-import pytz
-from ctypes import wintypes
 import pandas as pd
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QLabel, QTextEdit, QSplitter, QHeaderView, QStyledItemDelegate
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableView, QLabel, QTextEdit, QSplitter, QHeaderView, \
+    QStyledItemDelegate, QCheckBox, QPushButton
 from PySide6.QtCore import Qt, QAbstractTableModel, QThread, Signal
-from database import SQLiteTableModel, load_app_data_from_db
+from database import SQLiteTableModel, load_app_data_from_db, format_app_data_cell, load_app_sessions_from_db, \
+    format_app_session_cell
+from locked_file import DEFAULT_CHUNK_SIZE, copy_locked, read_locked
+from srum_index import SrumIndex
+from analysis_cache import AnalysisCache
+from prefetch_parser import parse_prefetch_directory
+import srum_reader
+from lnk_parser import parse_lnk_directory, records_to_entries
+from lecmd_index import LecmdIndex, load_lecmd_entries, match_entries_to_table, format_lnk_entries
+from tool_runner import ExternalToolWorker
+
+APP_TIME_COLUMN = 5  # 캡처별 보기의 TimeStamp 열
+APP_SESSION_TIME_COLUMN = 4  # 세션 보기의 FirstSeen 열 (LastSeen은 다음 열)
+SRUM_TOOL_TIMEOUT = 1800  # SrumECmd 제한 시간 (초)
+SRUM_PROGRESS_PATTERN = r"(?i)^\s*processing"  # SrumECmd가 테이블마다 출력하는 줄
 
 
 class SQLiteTableModel(QAbstractTableModel):
-    def __init__(self, data, headers, parent=None):
+    def __init__(self, data, headers, parent=None, formatter=None):
         super().__init__(parent)
         self._data = data  # 데이터: 리스트 형태로 가정
         self._headers = headers  # 헤더: 리스트 형태로 가정
         self._sort_order = Qt.AscendingOrder  # 기본 정렬 순서
+        self._formatter = formatter  # (열, 원시 값) -> 표시 문자열, 화면에 보이는 셀만 변환
 
     def rowCount(self, parent=None):
         return len(self._data)
@@ -29,9 +44,17 @@ class SQLiteTableModel(QAbstractTableModel):
         return len(self._headers)
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or role != Qt.DisplayRole:
+        """DisplayRole은 표시 문자열, UserRole은 정렬/조인에 쓰는 원시 값"""
+        if not index.isValid():
             return None
-        return self._data[index.row()][index.column()]
+        value = self._data[index.row()][index.column()]
+        if role == Qt.UserRole:
+            return value
+        if role != Qt.DisplayRole:
+            return None
+        if self._formatter:
+            return self._formatter(index.column(), value)
+        return value
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role != Qt.DisplayRole:
@@ -52,13 +75,16 @@ class SQLiteTableModel(QAbstractTableModel):
         # 데이터를 정렬 (오름차순 또는 내림차순)
         reverse = (order == Qt.DescendingOrder)
         try:
-            self._data.sort(key=lambda row: row[column], reverse=reverse)
+            # None 값은 항상 마지막에 위치 (원시 값 기준 정렬)
+            self._data.sort(key=lambda row: (row[column] is None, row[column]), reverse=reverse)
         except Exception as e:
             print(f"정렬 중 오류 발생: {e}")
 
         self.endResetModel()  # 모델 리셋 완료
 
 class AppTableWidget(QWidget):
+    task_status = Signal(str)  # 백그라운드 작업(Prefetch 파싱, SrumECmd) 진행 메시지
+
     def __init__(self, mode='analysis'):
         super().__init__()
         self.db_path = ""
@@ -66,7 +92,19 @@ class AppTableWidget(QWidget):
         self.srudb_path = None  # 초기화 추가
         self.software_path = None  # 초기화 추가
         self.foreground_cycle_time_data = None
+        self.csv_data = None
+        self.srum_index = None  # SRUM CSV 조회용 (ExeName, Minute) 인덱스
         self.prefetch_data = None  # 추가
+        self.prefetch_analyzer = None  # Prefetch 파싱 스레드
+        self.srum_tool_worker = None  # SrumECmd 실행 스레드 (dissect.esedb가 없을 때)
+        self.lnk_worker = None  # Recent 폴더 .lnk 파싱 스레드
+        self.srum_reader_worker = None  # SRUDB.dat 직접 읽기 스레드 (dissect.esedb가 있을 때)
+        self.retired_workers = []  # 새 작업으로 교체되어 결과를 버리는, 아직 끝나지 않은 스레드
+        self.analysis_cache = None  # SRUM/Prefetch 결과 캐시 (get_analysis_cache로 접근)
+        self.lecmd_matches = []  # LECmd 항목과 App 테이블 행의 매칭 결과
+        self.lecmd_index = LecmdIndex(os.path.join(os.path.expanduser("~"), "Desktop", "Recall_load"))
+        self.view_mode = 'captures'  # captures(캡처별), sessions(앱 세션별), session_detail(세션 드릴다운)
+        self.time_column = APP_TIME_COLUMN  # 선택/LNK 매칭에 사용하는 시간 열
         self.setup_ui()
 
     def setup_ui(self):
@@ -82,10 +120,26 @@ class AppTableWidget(QWidget):
             text_box.setReadOnly(True)
 
         self.table_view.setSortingEnabled(True)  # 정렬 기능 활성화
+        self.table_view.doubleClicked.connect(self.on_table_double_clicked)
+
+        # 앱 세션 보기 전환 및 드릴다운 후 세션 목록으로 돌아가기
+        self.session_checkbox = QCheckBox("앱별 세션으로 보기", self)
+        self.session_checkbox.toggled.connect(self.on_session_mode_toggled)
+        self.session_back_button = QPushButton("세션 목록으로", self)
+        self.session_back_button.clicked.connect(self.load_app_sessions)
+        self.session_back_button.hide()
+        self.session_label = QLabel("", self)
+        self.session_label.hide()
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(self.session_checkbox)
+        mode_layout.addWidget(self.session_back_button)
+        mode_layout.addWidget(self.session_label)
+        mode_layout.addStretch(1)
 
         splitter = QSplitter(Qt.Horizontal)
         left_widget = QWidget()
         left_layout = QVBoxLayout()
+        left_layout.addLayout(mode_layout)
         left_layout.addWidget(self.table_view)
         left_layout.addWidget(self.info_label)
         left_widget.setLayout(left_layout)
@@ -126,9 +180,21 @@ class AppTableWidget(QWidget):
                 print(f"[DEBUG] Prefetch 디렉토리를 찾을 수 없습니다: {prefetch_dir}")
 
     def load_app_data(self):
+        """현재 보기 방식(캡처별/앱 세션별)에 맞게 App 데이터를 로드"""
+        if self.session_checkbox.isChecked():
+            self.load_app_sessions()
+            return
+        self.view_mode = 'captures'
+        self.time_column = APP_TIME_COLUMN
+        self.session_back_button.hide()
+        self.session_label.hide()
         data, headers = load_app_data_from_db(self.db_path)
+        self.show_app_rows(data, headers)
+
+    def show_app_rows(self, data, headers):
+        """캡처별 App 데이터(load_app_data_from_db 결과)를 테이블에 표시"""
         if data:
-            model = SQLiteTableModel(data, headers)
+            model = SQLiteTableModel(data, headers, formatter=format_app_data_cell)
             self.table_view.setModel(model)
             self.table_view.hideColumn(0)
             self.table_view.hideColumn(1)
@@ -159,6 +225,66 @@ class AppTableWidget(QWidget):
             self.info_label.setText("데이터를 불러올 수 없습니다.")
             self.info_label.show()
 
+    def load_app_sessions(self):
+        """앱별 세션 집계(첫/마지막 캡처, 캡처 수, DwellTime 합계)를 테이블에 표시"""
+        self.view_mode = 'sessions'
+        self.time_column = APP_SESSION_TIME_COLUMN
+        self.session_back_button.hide()
+        self.session_label.setText("세션을 더블클릭하면 해당 구간의 캡처 목록을 볼 수 있습니다.")
+        self.session_label.show()
+
+        start = time.perf_counter()
+        data, headers = load_app_sessions_from_db(self.db_path)
+        if not data:
+            self.table_view.setModel(None)
+            self.info_label.setText("데이터를 불러올 수 없습니다.")
+            self.info_label.show()
+            return
+        print(f"[DEBUG] 앱 세션 집계 완료: {len(data)}개 세션 ({time.perf_counter() - start:.2f}초)")
+
+        model = SQLiteTableModel(data, headers, formatter=format_app_session_cell)
+        self.table_view.setModel(model)
+        self.table_view.hideColumn(0)
+        self.table_view.hideColumn(1)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(2, QHeaderView.Interactive)
+        header.resizeSection(2, 440)
+        for column in range(3, len(headers)):
+            self.table_view.resizeColumnToContents(column)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.sortByColumn(APP_SESSION_TIME_COLUMN, Qt.AscendingOrder)
+
+        self.info_label.hide()
+        selection_model = self.table_view.selectionModel()
+        if selection_model:
+            selection_model.selectionChanged.connect(self.on_table_selection_changed)
+
+    def on_table_double_clicked(self, index):
+        """세션 보기에서 더블클릭한 세션의 캡처 목록을 필요할 때만 로드 (드릴다운)"""
+        if self.view_mode != 'sessions' or not index.isValid():
+            return
+        model = self.table_view.model()
+        row = index.row()
+        app_id = model.data(model.index(row, 0), Qt.UserRole)
+        app_path = model.data(model.index(row, 2))
+        first_seen = model.data(model.index(row, APP_SESSION_TIME_COLUMN), Qt.UserRole)
+        last_seen = model.data(model.index(row, APP_SESSION_TIME_COLUMN + 1), Qt.UserRole)
+
+        data, headers = load_app_data_from_db(self.db_path, app_id, first_seen, last_seen)
+        self.view_mode = 'session_detail'
+        self.time_column = APP_TIME_COLUMN
+        self.session_label.setText(
+            f"세션 상세: {os.path.basename(app_path or '')} "
+            f"({model.data(model.index(row, APP_SESSION_TIME_COLUMN))} ~ "
+            f"{model.data(model.index(row, APP_SESSION_TIME_COLUMN + 1))}, {len(data or [])}개 행)")
+        self.session_back_button.show()
+        self.show_app_rows(data, headers)
+
+    def on_session_mode_toggled(self, checked):
+        """캡처별 보기와 앱 세션 보기 전환"""
+        if self.db_path:
+            self.load_app_data()
+
     def set_csv_data(self, csv_data):
         """Main에서 로드된 CSV 데이터를 설정."""
         if csv_data is None:
@@ -166,131 +292,87 @@ class AppTableWidget(QWidget):
             return
 
         self.csv_data = csv_data
+        self.srum_index = None  # 첫 조회 시 다시 생성
         print(f"[DEBUG] AppTableWidget에 CSV 데이터가 설정되었습니다. 총 {len(self.csv_data)}개의 행")
 
-    def run_lecmd_with_path(self, recent_folder):
+    def parse_recent_folder(self, recent_folder):
         """
-        LECmd 실행 및 결과를 Recall_load 폴더에 저장하는 함수.
-        :param recent_folder: LECmd가 처리할 Recent 파일 경로
+        Recent 폴더의 .lnk 파일을 lnk_parser로 직접 파싱해 App 테이블과 매칭.
+        (LECmd 실행과 JSON 직렬화 없이 처리되며 Linux 분석 환경에서도 동작)
+        :param recent_folder: .lnk 파일이 있는 Recent 폴더 경로
         """
-        import subprocess
-        import os
-        import glob
-        import json
-
-        try:
-            # 실행 파일 및 출력 경로 설정
-            lecmd_path = os.path.join(os.getcwd(), "LECmd.exe")
-            recall_load_path = os.path.join(os.path.expanduser("~"), "Desktop", "Recall_load")
-
-            # Recall_load 폴더 생성
-            os.makedirs(recall_load_path, exist_ok=True)
-
-            # LECmd 실행 명령어 구성
-            command = [lecmd_path, "-d", recent_folder, "--json", recall_load_path]
-            print(f"[DEBUG] LECmd 실행 명령어: {' '.join(command)}")
-
-            # LECmd 실행
-            process = subprocess.run(command, capture_output=True, text=True)
-
-            if process.returncode == 0:
-                print("[DEBUG] LECmd 실행 성공")
-                print(process.stdout)
-            else:
-                print(f"[ERROR] LECmd 실행 실패: {process.stderr.strip()}")
+        # .lnk가 많으면 프로세스 풀을 띄우므로 UI 스레드가 아닌 작업 스레드에서 파싱
+        if self.lnk_worker and self.lnk_worker.isRunning():
+            if self.lnk_worker.recent_folder == recent_folder:
+                print("[DEBUG] 같은 Recent 폴더를 이미 파싱 중입니다.")
                 return
+            self.retire_worker(self.lnk_worker, self.lnk_worker.lnk_parsed, self.lnk_worker.lnk_failed)
 
-            # JSON 파일 찾기
-            json_files = glob.glob(os.path.join(recall_load_path, "*.json"))
-            if not json_files:
-                print("[ERROR] LECmd 실행 결과 JSON 파일을 찾을 수 없습니다.")
-                return
+        self.task_status.emit("LNK 파싱 중...")
+        self.lnk_worker = LnkParseWorker(recent_folder)
+        self.lnk_worker.lnk_parsed.connect(self.on_lnk_parsed)
+        self.lnk_worker.lnk_failed.connect(self.task_status.emit)
+        self.lnk_worker.start()
 
-            # 첫 번째 JSON 파일 선택
-            json_file_path = json_files[0]
-            print(f"[DEBUG] JSON 파일 경로: {json_file_path}")
+    def on_lnk_parsed(self, recent_folder, entries, errors):
+        """LNK 파싱 스레드 결과를 LECmd 인덱스에 저장하고 App 테이블과 매칭"""
+        self.lecmd_index.set_entries(entries, recent_folder, errors)
+        self.show_lnk_matches(entries, errors)
+        self.task_status.emit(f"LNK 파싱 완료 ({len(entries)}개 성공, {len(errors)}개 실패)")
 
-            # JSON 파일 처리
-            self.process_lecmd_results(json_file_path)
+    def retire_worker(self, worker, *signals):
+        """
+        교체되는 작업 스레드의 결과 신호를 끊고(취소 가능하면 취소) 끝날 때까지 참조를 유지.
+        실행 중인 QThread의 마지막 참조를 놓으면 프로그램이 비정상 종료된다.
+        """
+        for signal in signals:
+            signal.disconnect()
+        if hasattr(worker, "cancel"):
+            worker.cancel()
+        self.retired_workers.append(worker)
+        worker.finished.connect(self.release_retired_workers)
 
-        except FileNotFoundError:
-            print("[ERROR] LECmd 실행 파일을 찾을 수 없습니다.")
-        except Exception as e:
-            print(f"[ERROR] LECmd 실행 중 오류 발생: {e}")
+    def release_retired_workers(self):
+        self.retired_workers = [worker for worker in self.retired_workers if worker.isRunning()]
 
     def process_lecmd_results(self, json_file_path):
         """
-        LECmd JSON 결과에서 SourceFile과 SourceCreated를 처리하고,
+        기존 LECmd JSON 결과에서 SourceFile과 SourceCreated를 처리하고,
         테이블의 TimeStamp 열과 비교하여 ±1분 범위 내의 데이터를 text_box3에 출력.
         :param json_file_path: LECmd 결과 JSON 파일 경로
         """
-        import json
-        from datetime import datetime, timedelta
-        import os
-
         try:
-            with open(json_file_path, "r", encoding="utf-8") as f:
-                json_lines = f.readlines()
-
-            # 결과를 저장할 문자열 리스트
-            result_lines = []
-
-            # 테이블 모델 가져오기
-            model = self.table_view.model()
-            if model is None:
-                self.text_box3.setText("[ERROR] 테이블 모델이 설정되지 않았습니다.")
-                return
-
-            # JSON 데이터 처리
-            for line in json_lines:
-                try:
-                    # JSON 라인 파싱
-                    item = json.loads(line)
-
-                    # SourceCreated를 KST로 변환
-                    utc_time = datetime.fromisoformat(item["SourceCreated"].replace("Z", "+00:00"))
-                    kst_time = utc_time + timedelta(hours=9)
-
-                    # SourceFile에서 파일명 추출 및 .lnk 제거
-                    source_file_path = item["SourceFile"]
-                    source_file_name = os.path.basename(source_file_path).replace(".lnk", "")
-
-                    # 테이블 데이터와 비교
-                    match_found = False
-                    for row in range(model.rowCount()):
-                        table_time_str = model.data(model.index(row, 5))  # TimeStamp 열
-                        if table_time_str:
-                            # 테이블의 TimeStamp를 offset-aware로 변환
-                            table_time = datetime.strptime(table_time_str, '%Y-%m-%d %H:%M:%S')
-                            table_time = table_time.replace(tzinfo=None)  # offset-naive로 변환
-
-                            # ±1분 범위 비교
-                            if abs((table_time - kst_time.replace(tzinfo=None)).total_seconds()) <= 60:
-                                match_found = True
-                                break
-
-                    # 매칭 데이터가 있으면 결과에 추가
-                    if match_found:
-                        result_lines.append(f"파일 이름: {source_file_name}")
-                        result_lines.append(f"생성 시간 (KST): {kst_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                        result_lines.append("-" * 50)  # 구분선
-
-                except json.JSONDecodeError as e:
-                    result_lines.append(f"[WARNING] JSON 파싱 실패: {e}")
-                except Exception as e:
-                    result_lines.append(f"[ERROR] JSON 처리 중 오류 발생: {e}")
-
-            # 결과를 text_box3에 출력
-            if result_lines:
-                self.text_box3.setText("\n".join(result_lines))
-            else:
-                self.text_box3.setText("±1분 내에 매칭되는 데이터가 없습니다.")
+            entries, errors = load_lecmd_entries(json_file_path)
+            self.show_lnk_matches(entries, errors)
 
         except FileNotFoundError:
             self.text_box3.setText("[ERROR] JSON 파일을 찾을 수 없습니다.")
         except Exception as e:
             self.text_box3.setText(f"[ERROR] JSON 결과 처리 중 오류 발생: {e}")
 
+    def show_lnk_matches(self, entries, errors):
+        """
+        LNK 항목을 테이블 TimeStamp 열과 구간 조인해 ±1분 내 항목을 text_box3에 출력.
+        매칭 결과는 self.lecmd_matches에 구조화된 형태로 보관한다.
+        """
+        # 테이블 모델 가져오기
+        model = self.table_view.model()
+        if model is None:
+            self.text_box3.setText("[ERROR] 테이블 모델이 설정되지 않았습니다.")
+            return
+
+        # TimeStamp 열 원시 값(UTC epoch 초)을 사용해 행마다 문자열 변환/파싱을 하지 않음
+        table_times = [model.data(model.index(row, self.time_column), Qt.UserRole) for row in range(model.rowCount())]
+        self.lecmd_matches = match_entries_to_table(entries, table_times)
+        print(f"[DEBUG] LNK 항목 {len(entries)}개 중 {len(self.lecmd_matches)}개 매칭")
+
+        # 결과를 text_box3에 출력
+        result_lines = format_lnk_entries([match["entry"] for match in self.lecmd_matches]) + errors
+        if result_lines:
+            self.text_box3.setText("\n".join(result_lines))
+        else:
+            self.text_box3.setText("±1분 내에 매칭되는 데이터가 없습니다.")
+
     def on_table_selection_changed(self, selected, deselected):
         """
         테이블 행 선택 시 Prefetch, SRUM 데이터를 처리하고, JSON 데이터와 비교하여 결과를 text_box3에 출력.
@@ -308,7 +390,7 @@ class AppTableWidget(QWidget):
             model = self.table_view.model()
             if model:
                 app_path = model.data(model.index(row, 2))  # Path 열
-                app_time = model.data(model.index(row, 5))  # TimeStamp 열
+                app_time = model.data(model.index(row, self.time_column))  # TimeStamp (세션 보기: FirstSeen) 열
                 print(f"[DEBUG] 선택된 테이블 데이터 - Path: {app_path}, TimeStamp: {app_time}")
 
                 # 파일명 추출
@@ -316,7 +398,7 @@ class AppTableWidget(QWidget):
                 print(f"[DEBUG] 추출된 파일명: {app_name}")
 
                 # Prefetch 데이터가 있고 비어있지 않은 경우에만 필터링
-                if hasattr(self, 'prefetch_data') and not self.prefetch_data.empty:
+                if self.prefetch_data is not None and not self.prefetch_data.empty:
                     matching_prefetch = self.prefetch_data[
                         self.prefetch_data['ExecutableName'].str.contains(app_name, case=False, na=False)
                     ]
@@ -356,65 +438,18 @@ class AppTableWidget(QWidget):
     def compare_json_with_timestamp(self, table_time):
         """
         테이블의 TimeStamp와 JSON 데이터의 SourceCreated를 비교하여 결과를 text_box3에 출력.
-        Recall_load 폴더 아래의 JSON 파일을 읽음.
+        Recall_load 폴더의 최신 JSON 파일을 LecmdIndex로 캐시하고, 선택 시에는 이진 탐색만 수행.
         :param table_time: 선택된 테이블의 TimeStamp (datetime 객체)
         """
-        import glob
-        from datetime import datetime, timedelta
-        import os
-
         try:
-            # Recall_load 폴더에서 모든 JSON 파일 탐색
-            recall_load_path = os.path.join(os.path.expanduser("~"), "Desktop", "Recall_load")
-            json_files = glob.glob(os.path.join(recall_load_path, "*.json"))
-
-            if not json_files:
+            json_file_path = self.lecmd_index.refresh()
+            if json_file_path is None:
                 self.text_box3.setText("[ERROR] Recall_load 폴더에서 JSON 파일을 찾을 수 없습니다.")
                 print("[ERROR] Recall_load 폴더에서 JSON 파일을 찾을 수 없습니다.")
                 return
 
-            # 가장 최근에 생성된 JSON 파일 선택
-            json_file_path = max(json_files, key=os.path.getctime)
-            print(f"[DEBUG] 선택된 JSON 파일 경로: {json_file_path}")
-
-            # JSON 파일 읽기
-            with open(json_file_path, "r", encoding="utf-8") as f:
-                json_lines = f.readlines()
-
-            # 결과를 저장할 문자열 리스트
-            result_lines = []
-
-            # JSON 데이터 처리
-            for line in json_lines:
-                try:
-                    # JSON 라인 파싱
-                    item = json.loads(line)
-
-                    # SourceCreated를 KST로 변환
-                    utc_time = datetime.fromisoformat(item["SourceCreated"].replace("Z", "+00:00"))
-                    kst_time = utc_time + timedelta(hours=9)
-
-                    # 테이블의 table_time을 offset-naive로 변환
-                    table_time_naive = table_time.replace(tzinfo=None)
-                    kst_time_naive = kst_time.replace(tzinfo=None)
-
-                    # ±1분 범위 비교
-                    if abs((table_time_naive - kst_time_naive).total_seconds()) <= 60:
-                        # SourceFile에서 파일명 추출 및 .lnk 제거
-                        source_file_path = item["SourceFile"]
-                        source_file_name = os.path.basename(source_file_path).replace(".lnk", "")
-
-                        # 결과 추가
-                        result_lines.append(f"파일 이름: {source_file_name}")
-                        result_lines.append(f"생성 시간 (KST): {kst_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                        result_lines.append("-" * 50)  # 구분선
-
-                except json.JSONDecodeError as e:
-                    result_lines.append(f"[WARNING] JSON 파싱 실패: {e}")
-                except Exception as e:
-                    result_lines.append(f"[ERROR] JSON 처리 중 오류 발생: {e}")
-
             # 결과를 text_box3에 출력
+            result_lines = format_lnk_entries(self.lecmd_index.lookup(table_time)) + self.lecmd_index.errors
             if result_lines:
                 self.text_box3.setText("\n".join(result_lines))
             else:
@@ -440,48 +475,28 @@ class AppTableWidget(QWidget):
     def get_srum_related_data(self, app_path, app_time):
         """
         CSV 데이터와 테이블 데이터를 비교하여 연관된 ForegroundCycleTime 값을 반환.
-        초는 무시하고 분 단위 ±1 범위로 비교.
+        초는 무시하고 분 단위 ±1 범위로 비교. 조회는 로드 시 만든 SrumIndex를 사용.
         """
         if not hasattr(self, 'csv_data') or self.csv_data is None:
             print("[DEBUG] CSV 데이터가 self.csv_data에 없습니다.")
             return "CSV 데이터가 없습니다."
 
         try:
+            if self.srum_index is None:
+                self.srum_index = SrumIndex(self.csv_data)
+
             # 파일명만 추출
             app_file_name = os.path.basename(app_path)
             print(f"[DEBUG] 비교를 위한 파일명: {app_file_name}")
 
-            # `ExeInfo`에서 파일명 매칭 후 명시적 복사
-            filtered_data = self.csv_data[
-                self.csv_data["ExeInfo"].str.contains(app_file_name, na=False, case=False)].copy()
-            if filtered_data.empty:
+            if not self.srum_index.has_exe(app_path):
                 print(f"[DEBUG] ExeInfo에 {app_file_name} 관련 데이터가 없습니다.")
                 return "ExeInfo 데이터 없음"
 
-            print(f"[DEBUG] ExeInfo에서 {app_file_name} 관련 데이터 필터링 완료.")
-            print(filtered_data[["ExeInfo", "Timestamp", "ForegroundCycleTime"]].head())
-
-            # 테이블의 TimeStamp를 24시간제로 변환 (초 제거) 및 KST로 설정
-            if app_time:
-                app_time_24h = pd.to_datetime(app_time, format='%Y-%m-%d %H:%M:%S').floor('min')
-                kst_zone = pytz.timezone("Asia/Seoul")
-                app_time_24h = kst_zone.localize(app_time_24h)  # KST로 타임존 설정
-                print(f"[DEBUG] 테이블에서 변환된 TimeStamp (분 단위, KST): {app_time_24h}")
-
-            # SRUM 데이터의 Timestamp를 KST로 변환 후 분 단위로 변환
-            filtered_data["Timestamp_KST"] = pd.to_datetime(
-                filtered_data["Timestamp"], format='%Y-%m-%d %H:%M:%S', utc=True
-            ).dt.tz_convert("Asia/Seoul").dt.floor('min')  # 초 제거, 분 단위로 변환
-
-            print(f"[DEBUG] 변환된 CSV 데이터 (분 단위):")
-            print(filtered_data[["ExeInfo", "Timestamp_KST"]].head())
-
             # ±1분 범위로 Timestamp 비교
-            matched_rows = filtered_data[
-                abs((filtered_data["Timestamp_KST"] - app_time_24h).dt.total_seconds()) <= 60
-                ]
+            matched_rows = self.srum_index.lookup(app_path, app_time) if app_time else None
 
-            if not matched_rows.empty:
+            if matched_rows is not None and not matched_rows.empty:
                 foreground_cycle_time_raw = matched_rows["ForegroundCycleTime"].iloc[0]
                 foreground_cycle_time_seconds = self.convert_foreground_cycle_time_to_seconds(foreground_cycle_time_raw)
                 formatted_time = self.format_seconds_to_minutes_and_seconds(foreground_cycle_time_seconds)
@@ -526,11 +541,8 @@ class AppTableWidget(QWidget):
 
         # SRUDB.dat 파일 복사
         try:
-            os.makedirs(os.path.dirname(srudb_dst_path), exist_ok=True)
-            file_data = self.read_file(srudb_src_path)
-            with open(srudb_dst_path, "wb") as f:
-                f.write(file_data)
-            print(f"SRUDB.dat 파일 복사 완료: {srudb_dst_path}")
+            size, sha256 = copy_locked(srudb_src_path, srudb_dst_path, hash_name="sha256")
+            print(f"SRUDB.dat 파일 복사 완료: {srudb_dst_path} ({size} bytes, SHA256 {sha256})")
         except Exception as e:
             print(f"SRUDB.dat 파일 복사 실패: {e}")
 
@@ -541,35 +553,9 @@ class AppTableWidget(QWidget):
         except Exception as e:
             print(f"SOFTWARE 하이브 복사 실패: {e}")
 
-    def read_file(self, file_path, buffer_size=50 * 1024 * 1024):
-        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
-        GENERIC_READ = 0x80000000
-        FILE_SHARE_READ = 0x00000001 | 0x00000002 | 0x00000004
-        OPEN_EXISTING = 3
-        FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
-
-        file_handle = kernel32.CreateFileW(
-            file_path, GENERIC_READ, FILE_SHARE_READ, None, OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None
-        )
-        if file_handle == wintypes.HANDLE(-1).value:
-            raise ctypes.WinError(ctypes.get_last_error())
-
-        print(f"File handle obtained for {file_path}")
-
-        buffer = ctypes.create_string_buffer(buffer_size)
-        bytes_read = wintypes.DWORD(0)
-        data = b""
-
-        try:
-            while True:
-                success = kernel32.ReadFile(file_handle, buffer, buffer_size, ctypes.byref(bytes_read), None)
-                if not success or bytes_read.value == 0:
-                    break
-                data += buffer.raw[:bytes_read.value]
-        finally:
-            kernel32.CloseHandle(file_handle)
-
-        return data
+    def read_file(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """잠긴 파일 전체를 읽어 bytearray로 반환 (큰 파일은 copy_locked로 바로 스트리밍)"""
+        return read_locked(file_path, chunk_size)
 
     def load_foreground_cycle_time(self, output_csv_dir):
         try:
@@ -578,6 +564,7 @@ class AppTableWidget(QWidget):
                 print("CSV 파일이 존재하지 않습니다. SRUM 작업 실패")
                 self.foreground_cycle_time_data = None
                 self.csv_data = None
+                self.srum_index = None
                 return
 
             csv_file_path = os.path.join(output_csv_dir, csv_files[0])
@@ -590,19 +577,31 @@ class AppTableWidget(QWidget):
             if "Timestamp" in df.columns:
                 df["Timestamp"] = pd.to_datetime(df["Timestamp"]).dt.strftime('%Y-%m-%d %H:%M:%S')
 
-            # ForegroundCycleTime 처리 (기존 로직 유지)
-            if "ForegroundCycleTime" in df.columns:
-                self.foreground_cycle_time_data = df["ForegroundCycleTime"].iloc[0]
-                print(f"ForegroundCycleTime: {self.foreground_cycle_time_data}")
-                self.analyze_relationship()
-
-            self.csv_data = df  # CSV 데이터를 self.csv_data에 저장
+            self.set_srum_frame(df)
             print(f"[DEBUG] CSV 데이터 로드 성공 - 총 {len(self.csv_data)}개의 행")
 
         except Exception as e:
             print(f"ForegroundCycleTime 값을 로드하는 중 오류 발생: {e}")
             self.foreground_cycle_time_data = None
             self.csv_data = None
+            self.srum_index = None
+
+    def set_srum_frame(self, df):
+        """SrumECmd CSV 또는 분석 캐시에서 읽은 SRUM 데이터를 적용"""
+        # ForegroundCycleTime 처리 (기존 로직 유지)
+        if "ForegroundCycleTime" in df.columns:
+            self.foreground_cycle_time_data = df["ForegroundCycleTime"].iloc[0]
+            print(f"ForegroundCycleTime: {self.foreground_cycle_time_data}")
+            self.analyze_relationship()
+
+        self.csv_data = df  # CSV 데이터를 self.csv_data에 저장
+        self.srum_index = SrumIndex(df)  # 선택 시 조회용 인덱스는 로드 시 한 번만 생성
+
+    def get_analysis_cache(self):
+        """SRUM/Prefetch 분석 결과 캐시 (처음 사용할 때 생성)"""
+        if self.analysis_cache is None:
+            self.analysis_cache = AnalysisCache()
+        return self.analysis_cache
 
     def analyze_relationship(self):
         if self.foreground_cycle_time_data is None:
@@ -634,21 +633,27 @@ class AppTableWidget(QWidget):
 
     def analyze_srum_data_for_analysis_mode(self):
         """분석 PC 모드 전용 SRUM 데이터 처리"""
-        if not self.srudb_path or not self.software_path:
-            print("SRUDB.dat 및 SOFTWARE 파일이 모두 지정되어야 합니다.")
+        if not self.srudb_path:
+            print("SRUDB.dat 파일이 지정되어야 합니다.")
             return
 
         print("분석 PC 모드에서 SRUM 데이터 처리를 시작합니다.")
 
+        # dissect.esedb가 있으면 SrumECmd 없이 SRUDB.dat을 직접 읽음 (SOFTWARE 하이브 불필요)
+        if srum_reader.is_available():
+            self.read_srum_natively()
+            return
+
+        if not self.software_path:
+            print("SrumECmd를 사용하려면 SRUDB.dat 및 SOFTWARE 파일이 모두 지정되어야 합니다.")
+            return
+
         # 출력 디렉터리 생성
         output_folder = os.path.join(os.path.dirname(self.srudb_path), "Output_File")
         os.makedirs(output_folder, exist_ok=True)
 
-        # SrumECmd.exe 실행 경로
+        # SrumECmd.exe 실행 경로 (없는지는 캐시를 확인한 뒤 작업 스레드에서 확인)
         srum_tool_path = os.path.join(os.getcwd(), "SrumECmd.exe")
-        if not os.path.exists(srum_tool_path):
-            print(f"SrumECmd.exe 파일이 {srum_tool_path} 경로에 존재하지 않습니다.")
-            return
 
         # 실행 명령어 생성
         command = [
@@ -660,22 +665,75 @@ class AppTableWidget(QWidget):
 
         print(f"실행할 명령어: {' '.join(command)}")
 
-        # 명령어 실행 (subprocess 사용)
+        # 출력을 줄 단위로 받으면서 백그라운드에서 실행 (UI에서 취소 가능)
+        if self.srum_tool_worker and self.srum_tool_worker.isRunning():
+            print("[DEBUG] 이미 SrumECmd가 실행 중입니다.")
+            return
+        # 같은 SRUDB.dat/SOFTWARE를 이미 분석했다면 스레드에서 캐시를 복원하고 SrumECmd를 실행하지 않음
+        worker = SrumToolWorker(command, [self.srudb_path, self.software_path], self.get_analysis_cache(),
+                                name="SrumECmd", timeout=SRUM_TOOL_TIMEOUT, progress_pattern=SRUM_PROGRESS_PATTERN)
+        self.srum_tool_worker = worker
+        self.srum_tool_worker.cached_frame_ready.connect(self.set_srum_frame)
+        self.srum_tool_worker.output_line.connect(lambda stream, line: print(f"[SrumECmd] {line}"))
+        self.srum_tool_worker.progress.connect(
+            lambda done, total: self.task_status.emit(f"SrumECmd 실행 중... 테이블 {done}개 처리"))
+        self.srum_tool_worker.tool_finished.connect(
+            lambda success, message: self.on_srum_tool_finished(success, message, output_folder, worker.cache_key))
+        self.srum_tool_worker.start()
+
+    def on_srum_tool_finished(self, success, message, output_folder, cache_key):
+        """SrumECmd 실행이 끝나면 CSV를 읽어 SRUM 데이터로 적용"""
+        print(message)
+        self.task_status.emit(message)
+        if not success:
+            return
         try:
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-            # 명령어 실행 후 바로 종료 (출력은 로그에 저장되지 않음)
-            process.wait()  # 이 라인 추가로 프로세스 종료를 기다림
+            # ForegroundCycleTime 데이터 로드
+            self.load_foreground_cycle_time(output_folder)
+            if cache_key and self.csv_data is not None:
+                self.get_analysis_cache().store_frame("srum", cache_key, self.csv_data)
+        except Exception as e:
+            print(f"SrumECmd 결과 처리 중 오류 발생: {e}")
 
-            if process.returncode == 0:
-                print("SrumECmd 실행 완료")
-                # ForegroundCycleTime 데이터 로드
-                self.load_foreground_cycle_time(output_folder)
-            else:
-                print("SrumECmd 실행 실패")
+    def cancel_background_tasks(self):
+        """실행 중인 Prefetch 파싱/SrumECmd 중단 (UI에서 호출)"""
+        for worker in (self.prefetch_analyzer, self.srum_tool_worker, self.srum_reader_worker):
+            if worker and worker.isRunning():
+                worker.cancel()
 
+    def read_srum_natively(self):
+        """
+        SRUDB.dat의 Application Resource Usage 테이블을 srum_reader로 스트리밍하면서
+        ukg.db App 테이블에 있는 실행 파일 행만 로드 (순수 파이썬 ESE 읽기이므로 작업 스레드에서 실행)
+        """
+        if self.srum_reader_worker and self.srum_reader_worker.isRunning():
+            if (self.srum_reader_worker.srudb_path, self.srum_reader_worker.db_path) == (self.srudb_path, self.db_path):
+                print("[DEBUG] 같은 SRUDB.dat을 이미 읽는 중입니다.")
+                return
+            self.retire_worker(self.srum_reader_worker, self.srum_reader_worker.progress,
+                               self.srum_reader_worker.srum_loaded, self.srum_reader_worker.srum_failed)
+
+        self.srum_reader_worker = SrumReaderWorker(self.srudb_path, self.db_path, self.get_analysis_cache())
+        self.srum_reader_worker.progress.connect(
+            lambda done, total: self.task_status.emit(f"SRUDB.dat 읽는 중... 레코드 {done}개"))
+        self.srum_reader_worker.srum_loaded.connect(self.on_srum_loaded)
+        self.srum_reader_worker.srum_failed.connect(self.task_status.emit)
+        self.srum_reader_worker.start()
+
+    def on_srum_loaded(self, df):
+        """SRUDB.dat 직접 읽기 결과 적용"""
+        if df.empty:
+            print("[DEBUG] App 테이블과 관련된 SRUM 데이터가 없습니다.")
+            self.task_status.emit("App 테이블과 관련된 SRUM 데이터가 없습니다.")
+            self.foreground_cycle_time_data = None
+            self.csv_data = None
+            self.srum_index = None
+            return
+        try:
+            self.set_srum_frame(df)
+            self.task_status.emit(f"SRUM 데이터 로드 완료 ({len(df)}개 행)")
         except Exception as e:
-            print(f"SrumECmd 실행 중 오류 발생: {e}")
+            print(f"SRUM 데이터 적용 중 오류 발생: {e}")
 
     def load_prefetch_data(self, prefetch_dir=None):
         """Prefetch 파일 로드 및 분석"""
@@ -683,64 +741,35 @@ class AppTableWidget(QWidget):
             if not prefetch_dir:
                 print("Prefetch 디렉토리가 지정되지 않았습니다.")
                 return
-                # PECmd 실행 파일 경로 확인
-            pecmd_path = os.path.join(os.getcwd(), "PECmd.exe")
-            if not os.path.exists(pecmd_path):
-                print("PECmd.exe가 현재 디렉토리에 없습니다.")
-                return
-                # 현재 작업 디렉토리에 결과 저장
-            pecmd_dir = os.getcwd()
-            output_csv = os.path.join(pecmd_dir, "prefetch_result.csv")
-            timeline_csv = os.path.join(pecmd_dir, "prefetch_result_Timeline.csv")
-
-            # 기존 CSV 파일 제거
-            if os.path.exists(output_csv):
-                os.remove(output_csv)
-            if os.path.exists(timeline_csv):
-                os.remove(timeline_csv)
-                print(f"[DEBUG] Prefetch 분석 결과 저장 경로: {output_csv}")
-
-                # PECmd 분석 스레드 생성 및 시작
-            self.prefetch_analyzer = PrefetchAnalyzer(pecmd_path, prefetch_dir, pecmd_dir)
-            self.prefetch_analyzer.finished.connect(self.on_prefetch_analysis_complete)
+
+            # 다른 폴더를 파싱 중이면 결과가 나중에 덮어쓰지 않도록 이전 스레드는 끊고 끝날 때까지 유지
+            if self.prefetch_analyzer and self.prefetch_analyzer.isRunning():
+                if self.prefetch_analyzer.prefetch_dir == prefetch_dir:
+                    print("[DEBUG] 같은 Prefetch 폴더를 이미 파싱 중입니다.")
+                    return
+                self.retire_worker(self.prefetch_analyzer, self.prefetch_analyzer.progress,
+                                   self.prefetch_analyzer.analysis_finished)
+
+            # Prefetch 파싱 스레드 생성 및 시작 (.pf 해시로 분석 캐시를 확인하는 것도 스레드에서 처리)
+            print(f"[DEBUG] Prefetch 파싱 시작: {prefetch_dir}")
+            self.prefetch_analyzer = PrefetchAnalyzer(prefetch_dir, self.get_analysis_cache())
+            self.prefetch_analyzer.progress.connect(
+                lambda done, total: self.task_status.emit(f"Prefetch 파싱 중... {done}/{total}"))
+            self.prefetch_analyzer.analysis_finished.connect(self.on_prefetch_analysis_complete)
             self.prefetch_analyzer.start()
         except Exception as e:
            print(f"Prefetch 데이터 로드 중 오류 발생: {e}")
 
-    def on_prefetch_analysis_complete(self, success, message):
-        """Prefetch 분석이 완료되면 호출되는 콜백"""
+    def on_prefetch_analysis_complete(self, success, message, df):
+        """Prefetch 분석이 완료되면 호출되는 콜백 (df: 파싱에 성공한 행 DataFrame, .pf 파일이 없거나 실패/취소 시 None)"""
         print(f"[DEBUG] Prefetch 분석 완료: {message}")  # 디버그 메시지 추가
+        self.task_status.emit(message)
         if success:
             try:
-                output_csv = os.path.join(os.getcwd(), "prefetch_result.csv")
-                if os.path.exists(output_csv):
-                    df = pd.read_csv(output_csv)
-
-                    # FilesLoaded 컬럼의 내용을 줄바꿈으로 분리
-                    def format_files_loaded(files):
-                        if pd.isna(files):  # null 값 처리
-                            return files
-                        return files.replace(", ", ",\n")
-                    
-                    # FilesLoaded 컬럼 수정
-                    df['FilesLoaded'] = df['FilesLoaded'].apply(format_files_loaded)
-                    
-                    # 수정된 데이터 저장
-                    df.to_csv(output_csv, index=False)                   
-                    self.prefetch_data = df[['ExecutableName', 'LastRun', 'FilesLoaded']]
-
-                    # text_box1에 Prefetch 데이터 표시
-                    prefetch_info = []
-                    for _, row in self.prefetch_data.iterrows():
-                        prefetch_info.append(f"실행 파일: {row['ExecutableName']}")
-                        prefetch_info.append(f"마지막 실행: {row['LastRun']}")
-                        prefetch_info.append(f"로드된 파일: {row['FilesLoaded']}")
-                        prefetch_info.append("-" * 50)  # 구분선
-
-                    self.text_box1.setText("\n".join(prefetch_info))
-                    print("[DEBUG] Prefetch 데이터를 text_box1에 표시 완료")
+                if df is not None:
+                    self.set_prefetch_frame(df)
                 else:
-                    error_msg = "Prefetch 분석 결과 파일을 찾을 수 없습니다."
+                    error_msg = "Prefetch 폴더에 .pf 파일이 없습니다."
                     print(f"[DEBUG] {error_msg}")
                     self.text_box1.setText(error_msg)
             except Exception as e:
@@ -752,6 +781,21 @@ class AppTableWidget(QWidget):
             print(f"[DEBUG] {error_msg}")
             self.text_box1.setText(error_msg)
 
+    def set_prefetch_frame(self, prefetch_frame):
+        """Prefetch 분석 결과(ExecutableName, LastRun, FilesLoaded)를 적용하고 text_box1에 표시"""
+        self.prefetch_data = prefetch_frame
+
+        # text_box1에 Prefetch 데이터 표시
+        prefetch_info = []
+        for _, row in self.prefetch_data.iterrows():
+            prefetch_info.append(f"실행 파일: {row['ExecutableName']}")
+            prefetch_info.append(f"마지막 실행: {row['LastRun']}")
+            prefetch_info.append(f"로드된 파일: {row['FilesLoaded']}")
+            prefetch_info.append("-" * 50)  # 구분선
+
+        self.text_box1.setText("\n".join(prefetch_info))
+        print("[DEBUG] Prefetch 데이터를 text_box1에 표시 완료")
+
     def create_prefetch_summary(self):
         """Prefetch 데이터 요약 생성"""
         if self.prefetch_data is None or self.prefetch_data.empty:
@@ -814,57 +858,147 @@ class AppTableWidget(QWidget):
                     else:
                         self.text_box3.setText("선택된 프로그램의 Prefetch 데이터가 없습니다.")
 
+class LnkParseWorker(QThread):
+    """lnk_parser로 Recent 폴더의 .lnk 파일을 파싱하는 스레드 (파일이 많으면 프로세스 풀 사용)"""
+    lnk_parsed = Signal(str, object, object)  # (Recent 폴더, 항목 리스트, 오류 메시지 리스트)
+    lnk_failed = Signal(str)
+
+    def __init__(self, recent_folder):
+        super().__init__()
+        self.recent_folder = recent_folder
+
+    def run(self):
+        try:
+            start = time.perf_counter()
+            entries, errors = records_to_entries(parse_lnk_directory(self.recent_folder))
+            print(f"[DEBUG] LNK 파싱 완료: {len(entries)}개 성공, {len(errors)}개 실패 "
+                  f"({time.perf_counter() - start:.2f}초)")
+            self.lnk_parsed.emit(self.recent_folder, entries, errors)
+        except FileNotFoundError:
+            print(f"[ERROR] Recent 폴더를 찾을 수 없습니다: {self.recent_folder}")
+            self.lnk_failed.emit(f"Recent 폴더를 찾을 수 없습니다: {self.recent_folder}")
+        except Exception as e:
+            print(f"[ERROR] LNK 파싱 중 오류 발생: {e}")
+            self.lnk_failed.emit(f"LNK 파싱 중 오류 발생: {e}")
+
+
+class SrumReaderWorker(QThread):
+    """srum_reader로 SRUDB.dat을 직접 읽는 스레드 (분석 캐시에 있으면 캐시에서 복원)"""
+    progress = Signal(int, int)  # (읽은 레코드 수, 0 - 전체 수는 알 수 없음)
+    srum_loaded = Signal(object)  # SrumECmd CSV와 같은 형태의 DataFrame
+    srum_failed = Signal(str)
+
+    def __init__(self, srudb_path, db_path, cache):
+        super().__init__()
+        self.srudb_path = srudb_path
+        self.db_path = db_path
+        self.cache = cache
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """남은 레코드 읽기 중단"""
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            app_names = srum_reader.load_app_names_from_db(self.db_path) if self.db_path else None
+            cache_key = self.cache.artifact_key(
+                [self.srudb_path], extra=sorted(app_names) if app_names is not None else ["*"])
+            df = self.cache.load_frame("srum_native", cache_key)
+            if df is None:
+                start = time.perf_counter()
+                df = srum_reader.load_app_resource_usage(self.srudb_path, app_names,
+                                                         progress_callback=self.progress.emit,
+                                                         cancel_event=self._cancel_event)
+                if df is None:
+                    self.srum_failed.emit("SRUDB.dat 읽기가 취소되었습니다.")
+                    return
+                print(f"[DEBUG] SRUDB.dat 직접 읽기 완료: {len(df)}개 행 ({time.perf_counter() - start:.2f}초)")
+                self.cache.store_frame("srum_native", cache_key, df)
+            self.srum_loaded.emit(df)
+
+        except Exception as e:
+            print(f"SRUDB.dat 직접 읽기 중 오류 발생: {e}")
+            self.srum_failed.emit(f"SRUDB.dat 직접 읽기 중 오류 발생: {e}")
+
+
+class SrumToolWorker(ExternalToolWorker):
+    """
+    SrumECmd 실행 스레드. 실행 전에 SRUDB.dat/SOFTWARE 해시로 분석 캐시를 확인하고,
+    있으면 도구를 실행하지 않고 cached_frame_ready로 결과를 보낸다.
+    """
+    cached_frame_ready = Signal(object)
+
+    def __init__(self, command, artifact_paths, cache, **kwargs):
+        super().__init__(command, **kwargs)
+        self.artifact_paths = artifact_paths
+        self.cache = cache
+        self.cache_key = None  # 도구 실행 결과를 저장할 키 (캐시 확인에 실패하면 None)
+
+    def run(self):
+        try:
+            self.cache_key = self.cache.artifact_key(self.artifact_paths)
+            cached_frame = self.cache.load_frame("srum", self.cache_key)
+            if cached_frame is not None:
+                self.cached_frame_ready.emit(cached_frame)
+                return
+        except Exception as e:
+            print(f"[ERROR] SRUM 분석 캐시 확인 중 오류 발생: {e}")
+
+        if not os.path.exists(self.command[0]):
+            self.tool_finished.emit(False, f"SrumECmd.exe 파일이 {self.command[0]} 경로에 존재하지 않습니다.")
+            return
+        super().run()
+
+
 class PrefetchAnalyzer(QThread):
-    finished = Signal(bool, str)
-    def __init__(self, pecmd_path, prefetch_dir, pecmd_dir):
+    """prefetch_parser로 Prefetch 폴더를 파싱하는 스레드 (PECmd 실행 및 CSV 변환 없음)"""
+    analysis_finished = Signal(bool, str, object)  # (성공 여부, 메시지, 파싱 결과 DataFrame 또는 None)
+    progress = Signal(int, int)  # (파싱한 파일 수, 전체 파일 수)
+
+    def __init__(self, prefetch_dir, cache):
         super().__init__()
-        self.pecmd_path = pecmd_path
         self.prefetch_dir = prefetch_dir
-        self.pecmd_dir = pecmd_dir
+        self.cache = cache
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """남은 .pf 파일 파싱 중단"""
+        self._cancel_event.set()
+
     def run(self):
         try:
-            command = [
-                self.pecmd_path,
-                "-d", self.prefetch_dir,
-                "--csv", self.pecmd_dir,
-                "--csvf", "prefetch_result.csv"
-            ]
-
-            print(f"[DEBUG] 실행할 명령어: {' '.join(command)}")
-
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            process.wait()
-
-            stderr = process.stderr.read()
-            if stderr:
-                print(f"[PECmd Error] {stderr}")
-
-            return_code = process.poll()
-            if return_code == 0:
-                print("[DEBUG] PECmd 실행 성공")
-
-                # CSV 파일 수정 - UTC+9 적용
-                csv_path = os.path.join(self.pecmd_dir, "prefetch_result.csv")
-                if os.path.exists(csv_path):
-                    df = pd.read_csv(csv_path)
-                    if "LastRun" in df.columns:  # Last Run Time 컬럼이 있는지 확인
-                        # UTC+9 적용
-                        df["LastRun"] = pd.to_datetime(df["LastRun"]).dt.tz_localize('UTC').dt.tz_convert('Asia/Seoul').dt.strftime('%Y-%m-%d %H:%M:%S')
-                        # 수정된 데이터 저장
-                        df.to_csv(csv_path, index=False)
-                        print("[DEBUG] CSV 파일의 Last Run Time에 UTC+9 적용 완료")
-
-                self.finished.emit(True, "Prefetch 분석 완료")
-            else:
-                print(f"[DEBUG] PECmd 실행 실패 (return code: {return_code})")
-                self.finished.emit(False, f"Prefetch 분석 실패 (return code: {return_code})")
+            start = time.perf_counter()
+            # 같은 .pf 파일들을 이미 분석했다면 다시 파싱하지 않음 (전체 .pf 해시 계산은 GUI 스레드에서 하지 않음)
+            cache_key = None
+            try:
+                cache_key = self.cache.directory_key(self.prefetch_dir, ".pf")
+                cached_frame = self.cache.load_frame("prefetch", cache_key)
+                if cached_frame is not None:
+                    self.analysis_finished.emit(True, f"Prefetch 분석 캐시 사용 ({len(cached_frame)}개)", cached_frame)
+                    return
+            except Exception as e:
+                print(f"[ERROR] Prefetch 분석 캐시 확인 중 오류 발생: {e}")
+
+            result = parse_prefetch_directory(self.prefetch_dir, progress_callback=self.progress.emit,
+                                              cancel_event=self._cancel_event)
+            if result is None:
+                self.analysis_finished.emit(False, "Prefetch 분석이 취소되었습니다.", None)
+                return
+            if result.empty:
+                self.analysis_finished.emit(True, "Prefetch 분석 완료 (.pf 파일 없음)", None)
+                return
+            failed = int(result["Error"].notna().sum())
+            prefetch_frame = result[result["Error"].isna()].drop(columns=["Error"]).reset_index(drop=True)
+            if cache_key:
+                try:
+                    self.cache.store_frame("prefetch", cache_key, prefetch_frame)
+                except Exception as e:
+                    print(f"[ERROR] Prefetch 분석 캐시 저장 중 오류 발생: {e}")
+            elapsed = time.perf_counter() - start
+            self.analysis_finished.emit(True, f"Prefetch 분석 완료 ({len(result) - failed}개 성공, {failed}개 실패, "
+                                              f"{elapsed:.1f}초)", prefetch_frame)
 
         except Exception as e:
-            print(f"[DEBUG] PECmd 실행 중 예외 발생: {str(e)}")
-            self.finished.emit(False, f"오류 발생: {str(e)}")
\ No newline at end of file
+            print(f"[DEBUG] Prefetch 파싱 중 예외 발생: {str(e)}")
+            self.analysis_finished.emit(False, f"오류 발생: {str(e)}", None)
@@ -0,0 +1,329 @@
+# audit_query.py
+
+import re
+import sys
+import time
+import sqlite3
+from collections import OrderedDict
+from ocr_search import OcrIndex, like_pattern, ocr_any_condition, ocr_missing_condition, prepare_ocr_rank
+
+PLAN_CACHE_SIZE = 256
+
+# %Field% == 값 (값은 공백/괄호/&&/||가 나오기 전까지, N/A는 값이 없는 캡처)
+FIELD_PATTERN = re.compile(r'%(\w+)%\s*==\s*((?:(?!&&|\|\|)[^\s()])+)')
+FIELD_NAMES = {"title": "Title", "app": "App", "web": "Web", "file": "File", "ocr": "OCR"}
+TERM_FIELDS = ("Title", "App", "OCR")  # 일반 검색어가 찾는 필드
+
+# 관계 테이블을 거쳐야 하는 필드: (관계 테이블, 외래 키, 대상 테이블, 열)
+FIELD_RELATIONS = {
+    "App": ("WindowCaptureAppRelation", "AppId", "App", "Name"),
+    "Web": ("WindowCaptureWebRelation", "WebId", "Web", "Uri"),
+    "File": ("WindowCaptureFileRelation", "FileId", "File", "Path"),
+}
+
+_plan_cache = OrderedDict()  # (검색식, 색인 사용 여부) -> (WHERE 절, 파라미터, 순위 검색어)
+
+
+class SearchSyntaxError(ValueError):
+    """검색식 문법 오류 (괄호 불일치 등)"""
+
+
+# ----------------------------------------------------------------------
+# 토큰화
+# ----------------------------------------------------------------------
+def tokenize(expression):
+    """
+    검색식을 (종류, 값) 토큰 리스트로 변환.
+    종류: '(' ')' 'and' 'or' 'not' 'field' 'term'
+    !!와 %Field%==는 피연산자 자리에서만 연산자로 보고, 그 외에는 검색어의 일부로 둔다.
+    """
+    tokens = []
+    expect_operand = True
+    i = 0
+    length = len(expression)
+    while i < length:
+        char = expression[i]
+        if char.isspace():
+            i += 1
+            continue
+        pair = expression[i:i + 2]
+        if char in "()":
+            tokens.append((char, None))
+            expect_operand = char == "("
+            i += 1
+            continue
+        if pair in ("&&", "||"):
+            tokens.append(("and" if pair == "&&" else "or", None))
+            expect_operand = True
+            i += 2
+            continue
+        if expect_operand and pair == "!!":
+            tokens.append(("not", None))
+            i += 2
+            continue
+        if expect_operand:
+            match = match_field(expression, i)
+            if match:
+                value = match.group(2)
+                tokens.append(("field", (FIELD_NAMES[match.group(1).lower()],
+                                         None if value.lower() == "n/a" else value)))
+                expect_operand = False
+                i = match.end()
+                continue
+
+        # 검색어: 다음 연산자, 괄호, %Field%== 전까지 (공백 포함, 예: "save as")
+        # 검색어 뒤에 이어진 %Field%==는 별도 피연산자로 두어 parse_and에서 AND로 묶이게 함
+        end = i
+        at_field = False
+        while end < length and expression[end] not in "()" and expression[end:end + 2] not in ("&&", "||"):
+            if end > i and expression[end] == "%" and match_field(expression, end):
+                at_field = True
+                break
+            end += 1
+        term = expression[i:end].strip()
+        if term:
+            tokens.append(("term", term))
+        expect_operand = at_field
+        i = end
+    return tokens
+
+
+def match_field(expression, position):
+    """position에서 시작하는 %Field% == 값 (알 수 있는 필드가 아니면 None)"""
+    match = FIELD_PATTERN.match(expression, position)
+    if match and match.group(1).lower() in FIELD_NAMES:
+        return match
+    return None
+
+
+# ----------------------------------------------------------------------
+# 파싱: expr := and ('||' and)* / and := unary ('&&' unary)* / unary := '!!' unary | primary
+# AST 노드는 튜플 (해시 가능하므로 중복 제거/캐시 키로 사용)
+#   ('or', (자식, ...)), ('and', (자식, ...)), ('not', 자식),
+#   ('term', 검색어), ('field', 필드, 값 또는 None)
+# ----------------------------------------------------------------------
+class Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def advance(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise SearchSyntaxError("닫는 괄호 ')'가 여는 괄호보다 많습니다.")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "or":
+            self.advance()
+            children.append(self.parse_and())
+        return ("or", tuple(children))
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        # 연산자 없이 이어진 피연산자(예: "(a) b")는 AND로 처리
+        while self.peek() in ("and", "not", "(", "field", "term"):
+            if self.peek() == "and":
+                self.advance()
+            children.append(self.parse_unary())
+        return ("and", tuple(children))
+
+    def parse_unary(self):
+        kind = self.peek()
+        if kind == "not":
+            self.advance()
+            return ("not", self.parse_unary())
+        if kind == "(":
+            self.advance()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise SearchSyntaxError("여는 괄호 '('가 닫히지 않았습니다.")
+            self.advance()
+            return node
+        if kind == "field":
+            field, value = self.advance()[1]
+            return ("field", field, value)
+        if kind == "term":
+            return ("term", self.advance()[1])
+        return None  # 빈 피연산자 (예: "a &&", "()")
+
+
+def parse(expression):
+    """검색식을 AST로 변환 (빈 검색식이면 None)"""
+    return Parser(tokenize(expression)).parse()
+
+
+def optimize(node):
+    """
+    AST 정리: 빈 피연산자 제거, 같은 연산자 중첩 평탄화, 반복된 검색어 중복 제거,
+    이중 부정 제거. 남는 조건이 없으면 None.
+    """
+    if node is None:
+        return None
+    kind = node[0]
+    if kind in ("and", "or"):
+        children = []
+        for child in node[1]:
+            child = optimize(child)
+            if child is None:
+                continue
+            if child[0] == kind:
+                children.extend(child[1])
+            else:
+                children.append(child)
+        children = list(dict.fromkeys(children))  # 순서를 유지한 중복 제거
+        if not children:
+            return None
+        if len(children) == 1:
+            return children[0]
+        return (kind, tuple(children))
+    if kind == "not":
+        child = optimize(node[1])
+        if child is None:
+            return None
+        if child[0] == "not":
+            return child[1]
+        return ("not", child)
+    return node
+
+
+# ----------------------------------------------------------------------
+# SQL 생성
+# ----------------------------------------------------------------------
+def field_any_condition(field, values, use_index):
+    """field에 values 중 하나라도 포함된 캡처 조건 (관계 테이블 필드는 서브쿼리로 내려보냄)"""
+    if field == "OCR":
+        return ocr_any_condition(values, use_index)
+    params = [like_pattern(value) for value in values]
+    if field == "Title":
+        return " OR ".join("wc.WindowTitle LIKE ? ESCAPE '\\'" for _ in values), params
+    relation, foreign_key, table, column = FIELD_RELATIONS[field]
+    likes = " OR ".join(f"t.{column} LIKE ? ESCAPE '\\'" for _ in values)
+    return (f"wc.Id IN (SELECT r.WindowCaptureId FROM {relation} r JOIN {table} t ON t.Id = r.{foreign_key} "
+            f"WHERE {likes})", params)
+
+
+def field_missing_condition(field, use_index):
+    """field 값이 없는 캡처 조건 (%Field% == N/A)"""
+    if field == "OCR":
+        return ocr_missing_condition(use_index)
+    if field == "Title":
+        return "wc.WindowTitle IS NULL", []
+    relation, foreign_key, table, column = FIELD_RELATIONS[field]
+    return (f"wc.Id NOT IN (SELECT r.WindowCaptureId FROM {relation} r JOIN {table} t ON t.Id = r.{foreign_key} "
+            f"WHERE r.WindowCaptureId IS NOT NULL AND t.{column} IS NOT NULL)", [])
+
+
+def compile_node(node, use_index, rank_terms, negated=False):
+    """
+    AST 노드를 (SQL 조건, 파라미터)로 변환.
+    OR(및 단일 검색어)은 필드별로 값을 모아 필드마다 조건 하나(OCR은 FTS 쿼리 하나)로 만든다.
+    :param rank_terms: bm25 순위에 사용할 (부정되지 않은) 검색어를 모으는 리스트
+    """
+    kind = node[0]
+    if kind == "and":
+        parts = [compile_node(child, use_index, rank_terms, negated) for child in node[1]]
+        return " AND ".join(f"({sql})" for sql, _ in parts), [p for _, params in parts for p in params]
+    if kind == "not":
+        sql, params = compile_node(node[1], use_index, rank_terms, not negated)
+        # 제목이 NULL인 경우 등은 '포함하지 않음'으로 처리
+        return f"NOT IFNULL(({sql}), 0)", params
+
+    children = node[1] if kind == "or" else (node,)
+    field_values = OrderedDict()  # 필드 -> 값 리스트 (OR로 합칠 조건)
+    parts = []
+    for child in children:
+        if child[0] == "term":
+            for field in TERM_FIELDS:
+                field_values.setdefault(field, []).append(child[1])
+            if not negated:
+                rank_terms.append(child[1])
+        elif child[0] == "field" and child[2] is not None:
+            field_values.setdefault(child[1], []).append(child[2])
+            if child[1] == "OCR" and not negated:
+                rank_terms.append(child[2])
+        elif child[0] == "field":
+            parts.append(field_missing_condition(child[1], use_index))
+        else:
+            parts.append(compile_node(child, use_index, rank_terms, negated))
+    parts = [field_any_condition(field, values, use_index) for field, values in field_values.items()] + parts
+    if len(parts) == 1:
+        return parts[0]
+    return " OR ".join(f"({sql})" for sql, _ in parts), [p for _, params in parts for p in params]
+
+
+def compile_search(expression, use_index):
+    """
+    검색식을 (WHERE 조건, 파라미터, 순위 검색어)로 컴파일. 같은 검색식은 캐시된 결과를 재사용한다.
+    :raises SearchSyntaxError: 괄호가 맞지 않는 경우
+    """
+    key = (expression, use_index)
+    plan = _plan_cache.get(key)
+    if plan is not None:
+        _plan_cache.move_to_end(key)
+        return plan
+
+    tree = optimize(parse(expression))
+    rank_terms = []
+    if tree is None:
+        where_clause, params = "1=1", []
+    else:
+        where_clause, params = compile_node(tree, use_index, rank_terms)
+    plan = (where_clause, tuple(params), tuple(dict.fromkeys(rank_terms)))
+
+    _plan_cache[key] = plan
+    if len(_plan_cache) > PLAN_CACHE_SIZE:
+        _plan_cache.popitem(last=False)
+    return plan
+
+
+def build_search_query(where_clause, rank_join):
+    """컴파일된 조건으로 검색 쿼리 생성 (OCR 검색어가 있으면 bm25 관련도 순, 같으면 시간순)"""
+    return f"""
+            SELECT wc.TimeStamp, wc.ImageToken
+            FROM WindowCapture wc
+            {rank_join}
+            WHERE wc.ImageToken IS NOT NULL
+                AND ({where_clause})
+            ORDER BY ocr_rank.Rank IS NULL, ocr_rank.Rank, wc.TimeStamp ASC;
+            """
+
+
+if __name__ == "__main__":
+    # 벤치마크: python audit_query.py <ukg.db> "<검색식>"
+    if len(sys.argv) < 3:
+        print("사용법: python audit_query.py <ukg.db> \"<검색식>\"")
+        sys.exit(1)
+
+    db, search_expression = sys.argv[1], sys.argv[2]
+    print(f"AST: {optimize(parse(search_expression))}")
+    ocr_index = OcrIndex(db)
+    ocr_index.build()
+
+    for index_attached in (False, True):
+        start = time.perf_counter()
+        where, query_params, ranked = compile_search(search_expression, index_attached)
+        compile_time = time.perf_counter() - start
+        start = time.perf_counter()
+        compile_search(search_expression, index_attached)
+        cached_time = time.perf_counter() - start
+
+        conn = sqlite3.connect(db)
+        if index_attached:
+            ocr_index.attach(conn)
+        start = time.perf_counter()
+        rows = conn.execute(build_search_query(where, prepare_ocr_rank(conn, ranked, index_attached)),
+                            query_params).fetchall()
+        conn.close()
+        label = "FTS5 trigram" if index_attached else "LIKE"
+        print(f"{label:<13} 컴파일 {compile_time:.5f}s (캐시 {cached_time:.6f}s), "
+              f"실행 {time.perf_counter() - start:8.4f}s  {len(rows)}개, 파라미터 {len(query_params)}개")
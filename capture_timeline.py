@@ -0,0 +1,222 @@
+# capture_timeline.py
+
+import sys
+import time
+import sqlite3
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import Qt, QThread, QRectF, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QWidget
+
+from analysis_cache import AnalysisCache
+
+TIMELINE_CACHE_KIND = "capture_timeline"
+MINUTE_MS = 60 * 1000
+TIMELINE_HEIGHT = 48
+
+
+def minute_histogram(db_path):
+    """ImageToken이 있는 캡처의 분 단위 개수 (Minute = TimeStamp // 60000, Count)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query("""
+            SELECT wc.TimeStamp / 60000 AS Minute, COUNT(*) AS Count
+            FROM WindowCapture wc
+            WHERE wc.ImageToken IS NOT NULL AND wc.TimeStamp IS NOT NULL
+            GROUP BY Minute
+            ORDER BY Minute
+        """, conn)
+    finally:
+        conn.close()
+    return df.astype({"Minute": "int64", "Count": "int64"})
+
+
+def timeline_cache_key(cache, db_path):
+    return cache.artifact_key([db_path], extra=[TIMELINE_CACHE_KIND])
+
+
+class CaptureTimeline:
+    """
+    분 단위 캡처 히스토그램.
+    누적 합을 미리 만들어 두어 임의 범위의 캡처 수를 DB 조회 없이 이진 탐색 두 번으로 계산한다.
+    """
+
+    def __init__(self, histogram):
+        self.minutes = histogram["Minute"].to_numpy(dtype=np.int64)
+        self.counts = histogram["Count"].to_numpy(dtype=np.int64)
+        self.cumulative = np.concatenate(([0], np.cumsum(self.counts)))
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def total(self):
+        return int(self.cumulative[-1])
+
+    def time_range(self):
+        """첫/마지막 캡처가 있는 분의 (시작, 끝) 밀리초 (없으면 None)"""
+        if len(self.minutes) == 0:
+            return None
+        return int(self.minutes[0]) * MINUTE_MS, int(self.minutes[-1] + 1) * MINUTE_MS - 1
+
+    def count_between(self, start_ms, end_ms):
+        """start_ms ~ end_ms 범위와 겹치는 분의 캡처 수 (분 단위 근사)"""
+        if end_ms < start_ms:
+            return 0
+        first = np.searchsorted(self.minutes, start_ms // MINUTE_MS, side="left")
+        last = np.searchsorted(self.minutes, end_ms // MINUTE_MS, side="right")
+        return int(self.cumulative[last] - self.cumulative[first])
+
+    def bins(self, start_ms, end_ms, bin_count):
+        """start_ms ~ end_ms를 bin_count개 구간으로 나눈 캡처 수 배열 (타임라인 그리기용)"""
+        edges = np.linspace(start_ms // MINUTE_MS, end_ms // MINUTE_MS + 1, bin_count + 1)
+        positions = np.searchsorted(self.minutes, edges, side="left")
+        return np.diff(self.cumulative[positions])
+
+
+class TimelineWorker(QThread):
+    """분 단위 히스토그램을 분석 캐시에서 읽거나, 없으면 만들어 저장하는 스레드"""
+    timeline_ready = Signal(str, object)  # (db_path, CaptureTimeline)
+    timeline_failed = Signal(str)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+
+    def run(self):
+        try:
+            cache = AnalysisCache()
+            key = timeline_cache_key(cache, self.db_path)
+            histogram = cache.load_frame(TIMELINE_CACHE_KIND, key)
+            if histogram is None:
+                start = time.perf_counter()
+                histogram = minute_histogram(self.db_path)
+                print(f"[DEBUG] 캡처 타임라인 생성: {len(histogram)}분 ({time.perf_counter() - start:.2f}초)")
+                cache.store_frame(TIMELINE_CACHE_KIND, key, histogram)
+            self.timeline_ready.emit(self.db_path, CaptureTimeline(histogram))
+        except (sqlite3.Error, OSError, ValueError, pd.errors.DatabaseError) as e:
+            print(f"[ERROR] 캡처 타임라인 생성 실패: {e}")
+            self.timeline_failed.emit(f"캡처 타임라인 생성 실패: {e}")
+
+
+class TimelineSlider(QWidget):
+    """
+    캡처 활동 타임라인. 전체 기간의 분 단위 캡처 수를 막대로 그리고 선택 범위를 강조한다.
+    마우스로 끌어 범위를 고르면 끄는 동안 range_changed, 놓으면 range_selected 신호를 보낸다.
+    """
+    range_changed = Signal(object, object)   # (시작 밀리초, 끝 밀리초) - 끄는 중
+    range_selected = Signal(object, object)  # 마우스를 놓았을 때
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timeline = None
+        self.full_range = None  # 타임라인 전체 (시작, 끝) 밀리초
+        self.selection = None   # 선택 (시작, 끝) 밀리초
+        self._bins = None       # (너비, 막대 높이 배열) - 크기가 바뀔 때만 다시 계산
+        self._drag_start = None
+        self.setFixedHeight(TIMELINE_HEIGHT)
+        self.setToolTip("끌어서 시간 범위 선택")
+
+    def set_timeline(self, timeline):
+        self.timeline = timeline
+        self.full_range = timeline.time_range() if timeline is not None else None
+        self.selection = self.full_range
+        self._bins = None
+        self.update()
+
+    def set_selection(self, start_ms, end_ms):
+        self.selection = (start_ms, end_ms)
+        self.update()
+
+    def x_to_time(self, x):
+        start, end = self.full_range
+        ratio = min(max(x / max(self.width() - 1, 1), 0.0), 1.0)
+        return int(start + (end - start) * ratio)
+
+    def time_to_x(self, timestamp):
+        start, end = self.full_range
+        return (timestamp - start) / max(end - start, 1) * (self.width() - 1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#f7f7f7"))
+        if self.timeline is None or self.full_range is None:
+            painter.setPen(QColor("#999999"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "타임라인 준비 중...")
+            return
+
+        if self._bins is None or self._bins[0] != self.width():
+            self._bins = (self.width(), self.timeline.bins(*self.full_range, self.width()))
+        heights = self._bins[1]
+        peak = max(int(heights.max()) if len(heights) else 0, 1)
+        bottom = self.height() - 1
+        painter.setPen(QColor("#7fa7d9"))
+        for x in np.flatnonzero(heights):
+            # 조용한 구간도 보이도록 제곱근 비율 사용
+            bar = max(1, int((bottom - 2) * (heights[x] / peak) ** 0.5))
+            painter.drawLine(int(x), bottom, int(x), bottom - bar)
+
+        if self.selection is not None:
+            left = self.time_to_x(self.selection[0])
+            right = self.time_to_x(self.selection[1])
+            painter.fillRect(QRectF(left, 0, max(right - left, 1), self.height()), QColor(0, 122, 255, 50))
+            painter.setPen(QColor("#007AFF"))
+            painter.drawLine(int(left), 0, int(left), bottom)
+            painter.drawLine(int(right), 0, int(right), bottom)
+
+    def mousePressEvent(self, event):
+        if self.full_range is None or event.button() != Qt.LeftButton:
+            return
+        self._drag_start = self.x_to_time(event.position().x())
+        self.set_selection(self._drag_start, self._drag_start)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_start is None:
+            return
+        timestamp = self.x_to_time(event.position().x())
+        self.set_selection(min(self._drag_start, timestamp), max(self._drag_start, timestamp))
+        self.range_changed.emit(*self.selection)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_start is None:
+            return
+        self._drag_start = None
+        if self.selection[0] == self.selection[1]:
+            # 한 번 클릭하면 전체 범위로 되돌림
+            self.set_selection(*self.full_range)
+        self.range_changed.emit(*self.selection)
+        self.range_selected.emit(*self.selection)
+
+
+if __name__ == "__main__":
+    # 벤치마크: python capture_timeline.py <ukg.db> [범위 개수]
+    if len(sys.argv) < 2:
+        print("사용법: python capture_timeline.py <ukg.db> [범위 개수]")
+        sys.exit(1)
+
+    db = sys.argv[1]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    start = time.perf_counter()
+    histogram = minute_histogram(db)
+    timeline = CaptureTimeline(histogram)
+    print(f"히스토그램 생성       {time.perf_counter() - start:8.3f}s  {len(timeline)}분, 캡처 {timeline.total()}개")
+    if len(timeline) == 0:
+        sys.exit(0)
+
+    first_ms, last_ms = timeline.time_range()
+    rng = np.random.default_rng(0)
+    ranges = [tuple(sorted(rng.integers(first_ms, last_ms, 2))) for _ in range(repeat)]
+
+    start = time.perf_counter()
+    with sqlite3.connect(db) as conn:
+        conn.execute("SELECT MIN(TimeStamp), MAX(TimeStamp) FROM WindowCapture WHERE ImageToken IS NOT NULL").fetchone()
+        sql_counts = [conn.execute("SELECT COUNT(*) FROM WindowCapture WHERE TimeStamp BETWEEN ? AND ? "
+                                   "AND ImageToken IS NOT NULL", (int(a), int(b))).fetchone()[0] for a, b in ranges]
+    print(f"SQL MIN/MAX + COUNT  {time.perf_counter() - start:8.3f}s  범위 {repeat}개")
+
+    start = time.perf_counter()
+    histogram_counts = [timeline.count_between(int(a), int(b)) for a, b in ranges]
+    timeline.time_range()
+    print(f"히스토그램 조회       {time.perf_counter() - start:8.3f}s  "
+          f"최대 차이 {max(h - s for h, s in zip(histogram_counts, sql_counts))}개 (분 경계)")
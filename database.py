@@ -92,91 +92,240 @@ def load_data_from_db(db_path):
     finally:
         conn.close()
 
-def load_app_data_from_db(db_path):
+APP_DATA_TIME_COLUMNS = (3, 5)  # HourStartTimeStamp, TimeStamp (초 단위 UTC epoch)
+APP_DATA_DWELL_COLUMN = 4  # DwellTime (밀리초)
+
+
+SESSION_GAP_SECONDS = 300  # 같은 앱 캡처 간격이 이보다 크면 새 세션으로 분리
+
+
+def prepare_app_dwell_tables(conn, app_id=None, start_seconds=None, end_seconds=None):
+    """
+    App 데이터 조인에 사용할 임시 테이블 준비 (연결을 닫으면 삭제됨).
+    - CaptureSeconds: (AppId, 캡처 초)별 캡처 수, (AppId, 초) 순서로 저장
+    - DwellSeconds: AppDwellTime을 (WindowsAppID, 초) 인덱스로 저장.
+      같은 (WindowsAppID, HourStartTimeStamp) 중복 행은 첫 번째 행만 남긴다.
+      (ROW_NUMBER() 윈도 함수 대신 MIN(rowid) 사용)
+    두 테이블 모두 WITHOUT ROWID 기본 키 순서로 저장되므로 최종 조회에 DISTINCT/ORDER BY 정렬이 필요 없다.
+    :param app_id: 지정하면 해당 App의 캡처/DwellTime만 준비 (세션 드릴다운)
+    :param start_seconds: 캡처 시작 시각 (UTC epoch 초, 포함)
+    :param end_seconds: 캡처 종료 시각 (UTC epoch 초, 포함)
+    """
+    capture_conditions = []
+    capture_params = []
+    dwell_condition = ""
+    dwell_params = []
+    if app_id is not None:
+        capture_conditions.append("wcar.AppId = ?")
+        capture_params.append(app_id)
+        dwell_condition = "WHERE WindowsAppID = (SELECT WindowsAppID FROM App WHERE ID = ?)"
+        dwell_params.append(app_id)
+    if start_seconds is not None:
+        capture_conditions.append("wc.TimeStamp >= ?")
+        capture_params.append(start_seconds * 1000)
+    if end_seconds is not None:
+        capture_conditions.append("wc.TimeStamp < ?")
+        capture_params.append((end_seconds + 1) * 1000)
+    capture_where = "WHERE " + " AND ".join(capture_conditions) if capture_conditions else "WHERE true"
+
+    conn.executescript("""
+        DROP TABLE IF EXISTS temp.CaptureSeconds;
+        DROP TABLE IF EXISTS temp.DwellSeconds;
+
+        CREATE TEMP TABLE CaptureSeconds (
+            AppId INTEGER,
+            TimeStampSeconds INTEGER,
+            CaptureCount INTEGER,
+            PRIMARY KEY (AppId, TimeStampSeconds)
+        ) WITHOUT ROWID;
+
+        CREATE TEMP TABLE DwellSeconds (
+            WindowsAppID TEXT,
+            HourStartSeconds INTEGER,
+            DwellTime INTEGER,
+            PRIMARY KEY (WindowsAppID, HourStartSeconds, DwellTime)
+        ) WITHOUT ROWID;
+    """)
+    # 같은 초의 캡처는 한 행으로 합치고 CaptureCount만 증가 (WHERE는 UPSERT 구문 해석을 위해 필요)
+    conn.execute(f"""
+        INSERT INTO CaptureSeconds (AppId, TimeStampSeconds, CaptureCount)
+        SELECT
+            wcar.AppId,
+            CAST(wc.TimeStamp / 1000 AS INTEGER), -- 초 단위 변환
+            1
+        FROM WindowCapture wc
+        JOIN WindowCaptureAppRelation wcar ON wc.Id = wcar.WindowCaptureId
+        {capture_where}
+        ON CONFLICT (AppId, TimeStampSeconds) DO UPDATE SET CaptureCount = CaptureCount + 1
+    """, capture_params)
+    conn.execute(f"""
+        INSERT OR IGNORE INTO DwellSeconds
+        SELECT
+            WindowsAppID,
+            CAST(HourStartTimeStamp / 1000 AS INTEGER), -- 초 단위 변환
+            DwellTime
+        FROM AppDwellTime
+        WHERE rowid IN (
+            SELECT MIN(rowid) FROM AppDwellTime {dwell_condition} GROUP BY WindowsAppID, HourStartTimeStamp
+        )
+    """, dwell_params)
+
+
+def format_app_data_cell(column, value):
+    """
+    load_app_data_from_db의 원시 값을 표시 문자열로 변환 (뷰에서 화면에 보이는 셀만 호출).
+    HourStartTimeStamp/TimeStamp는 초 -> KST 문자열, DwellTime은 밀리초 -> 초(소수점 3자리)
+    """
+    if not value:
+        return value
+    if column in APP_DATA_TIME_COLUMNS:
+        return convert_unix_timestamp(value * 1000)  # 초 단위를 다시 밀리초로 변환 후 KST
+    if column == APP_DATA_DWELL_COLUMN:
+        return "{:.3f}".format(Decimal(value) / 1000)  # Decimal로 정밀 변환
+    return value
+
+
+def load_app_data_from_db(db_path, app_id=None, start_seconds=None, end_seconds=None):
     """
     App, WindowCaptureAppRelation, WindowCapture, 그리고 AppDwellTime 테이블을 조인하여
     ID, WindowsAppID, PATH, HourStartTimeStamp, DwellTime, TimeStamp를 반환합니다.
-    DwellTime은 초 단위로 변환하며, 소수점 이하를 정확히 유지합니다.
+    캡처 시각 ±1초 이내의 DwellTime을 인덱스 구간 조회(BETWEEN ts-1 AND ts+1)로 찾으며,
+    시간/DwellTime은 원시 값(초, 밀리초)으로 반환하고 표시 변환은 format_app_data_cell에서 합니다.
+    app_id/start_seconds/end_seconds를 지정하면 한 세션의 캡처만 조회합니다. (세션 드릴다운)
     """
-    def is_within_time_range(ts1, ts2):
-        """
-        두 초 단위 KST 타임스탬프가 ±1초 이내인지 확인합니다.
-        """
-        return abs(ts1 - ts2) <= 1
-
+    conn = None
     try:
         conn = sqlite3.connect(db_path)
+        prepare_app_dwell_tables(conn, app_id, start_seconds, end_seconds)
         cursor = conn.cursor()
 
-        # 수정된 SQL 쿼리
+        # (AppId, 초) 순서로 CaptureSeconds를 읽으면서 DwellSeconds를 ±1초 구간으로 조회
         query = """
-        WITH FilteredTime AS (
-            SELECT 
-                wc.Id AS WindowCaptureId,
-                wcar.AppId AS AppId,
-                CAST(wc.TimeStamp / 1000 AS INTEGER) AS TimeStampSeconds -- 초 단위 변환
-            FROM WindowCapture wc
-            JOIN WindowCaptureAppRelation wcar ON wc.Id = wcar.WindowCaptureId
-        ),
-        FilteredDwellTime AS (
-            SELECT 
-                WindowsAppID,
-                CAST(HourStartTimeStamp / 1000 AS INTEGER) AS HourStartTimeStampSeconds, -- 초 단위 변환
-                DwellTime,
-                ROW_NUMBER() OVER (
-                    PARTITION BY WindowsAppID, HourStartTimeStamp 
-                    ORDER BY HourStartTimeStamp
-                ) AS RowNum
-            FROM AppDwellTime
-        )
-        SELECT DISTINCT -- 중복 제거
+        SELECT
             app.ID AS AppID,
             app.WindowsAppID,
             app.PATH,
-            CASE 
-                WHEN ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1 THEN adt.HourStartTimeStampSeconds
-                ELSE NULL
-            END AS HourStartTimeStamp, -- 조건에 맞지 않으면 HourStartTimeStamp를 NULL로 처리
-            CASE 
-                WHEN ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1 THEN adt.DwellTime
-                ELSE NULL
-            END AS DwellTime, -- 조건에 맞지 않으면 DwellTime을 NULL로 처리
-            ft.TimeStampSeconds AS TimeStamp
-        FROM FilteredTime ft
-        JOIN App app ON ft.AppId = app.ID
-        LEFT JOIN FilteredDwellTime adt 
-            ON app.WindowsAppID = adt.WindowsAppID 
-           AND ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1
-           AND adt.RowNum = 1 -- 첫 번째 Row만 선택
-        ORDER BY app.ID, ft.TimeStampSeconds;
+            ds.HourStartSeconds AS HourStartTimeStamp,
+            ds.DwellTime,
+            cs.TimeStampSeconds AS TimeStamp
+        FROM temp.CaptureSeconds cs
+        JOIN App app ON cs.AppId = app.ID
+        LEFT JOIN temp.DwellSeconds ds
+            ON ds.WindowsAppID = app.WindowsAppID
+           AND ds.HourStartSeconds BETWEEN cs.TimeStampSeconds - 1 AND cs.TimeStampSeconds + 1
+        ORDER BY cs.AppId, cs.TimeStampSeconds;
         """
         cursor.execute(query)
         data = cursor.fetchall()
 
         # 열 이름 가져오기
         headers = [description[0] for description in cursor.description]
+        return data, headers
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return None, None
+    finally:
+        if conn:
+            conn.close()
 
-        # 시간 변환 처리
-        converted_data = []
-        for row in data:
-            row = list(row)
-            # HourStartTimeStamp KST 변환
-            if row[3]:
-                row[3] = convert_unix_timestamp(row[3] * 1000)  # 초 단위를 다시 밀리초로 변환 후 KST
-            # DwellTime 변환 (밀리초 -> 초, 소수점 유지)
-            if row[4]:
-                row[4] = "{:.3f}".format(Decimal(row[4]) / 1000)  # Decimal로 정밀 변환
-            # TimeStamp KST 변환
-            if row[5]:
-                row[5] = convert_unix_timestamp(row[5] * 1000)  # 초 단위를 다시 밀리초로 변환 후 KST
-            converted_data.append(row)
 
-        return converted_data, headers
+APP_SESSION_TIME_COLUMNS = (4, 5)  # FirstSeen, LastSeen (초 단위 UTC epoch)
+APP_SESSION_DURATION_COLUMN = 6  # Duration (초)
+APP_SESSION_DWELL_COLUMN = 8  # DwellTime (밀리초 합계)
+
+
+def format_app_session_cell(column, value):
+    """load_app_sessions_from_db의 원시 값을 표시 문자열로 변환 (뷰에서 화면에 보이는 셀만 호출)"""
+    if value is None:
+        return value
+    if column in APP_SESSION_TIME_COLUMNS:
+        return convert_unix_timestamp(value * 1000)
+    if column == APP_SESSION_DURATION_COLUMN:
+        hours, remainder = divmod(int(value), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours:02}:{minutes:02}:{seconds:02}"
+    if column == APP_SESSION_DWELL_COLUMN:
+        return "{:.3f}".format(Decimal(value) / 1000)
+    return value
+
+
+def load_app_sessions_from_db(db_path, gap_seconds=SESSION_GAP_SECONDS):
+    """
+    앱별 사용 세션을 SQL 윈도 함수로 집계합니다.
+    같은 앱의 이전 캡처와 gap_seconds보다 멀리 떨어진 캡처에서 새 세션이 시작되며,
+    세션마다 AppID, WindowsAppID, PATH, Session, FirstSeen, LastSeen, Duration, CaptureCount,
+    DwellTime(세션 구간 ±1초 안의 AppDwellTime 합계)을 반환합니다.
+    시간 값은 원시 값(초, 밀리초)이며 표시 변환은 format_app_session_cell에서 합니다.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        prepare_app_dwell_tables(conn)
+        cursor = conn.cursor()
+
+        query = """
+        WITH Marked AS (
+            SELECT
+                AppId,
+                TimeStampSeconds,
+                CaptureCount,
+                CASE
+                    WHEN TimeStampSeconds - LAG(TimeStampSeconds) OVER (
+                        PARTITION BY AppId ORDER BY TimeStampSeconds
+                    ) <= :gap THEN 0
+                    ELSE 1
+                END AS IsSessionStart
+            FROM temp.CaptureSeconds
+        ),
+        Numbered AS (
+            SELECT
+                AppId,
+                TimeStampSeconds,
+                CaptureCount,
+                SUM(IsSessionStart) OVER (
+                    PARTITION BY AppId ORDER BY TimeStampSeconds ROWS UNBOUNDED PRECEDING
+                ) AS Session
+            FROM Marked
+        ),
+        Sessions AS (
+            SELECT
+                AppId,
+                Session,
+                MIN(TimeStampSeconds) AS FirstSeen,
+                MAX(TimeStampSeconds) AS LastSeen,
+                SUM(CaptureCount) AS CaptureCount
+            FROM Numbered
+            GROUP BY AppId, Session
+        )
+        SELECT
+            app.ID AS AppID,
+            app.WindowsAppID,
+            app.PATH,
+            s.Session,
+            s.FirstSeen,
+            s.LastSeen,
+            s.LastSeen - s.FirstSeen AS Duration,
+            s.CaptureCount,
+            (
+                SELECT SUM(ds.DwellTime)
+                FROM temp.DwellSeconds ds
+                WHERE ds.WindowsAppID = app.WindowsAppID
+                  AND ds.HourStartSeconds BETWEEN s.FirstSeen - 1 AND s.LastSeen + 1
+            ) AS DwellTime
+        FROM Sessions s
+        JOIN App app ON s.AppId = app.ID
+        ORDER BY s.FirstSeen, app.ID;
+        """
+        cursor.execute(query, {"gap": gap_seconds})
+        data = cursor.fetchall()
+        headers = [description[0] for description in cursor.description]
+        return data, headers
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         return None, None
     finally:
-        conn.close()
+        if conn:
+            conn.close()
 
 
 def load_web_data(db_path, keywords=None):
@@ -337,3 +486,105 @@ def load_file_data_from_db(db_path):
     finally:
         conn.close()
 
+
+
+if __name__ == "__main__":
+    # 벤치마크: python database.py [캡처 수] [DwellTime 행 수] [기존 쿼리 캡처 수]
+    import sys
+    import time
+    import random
+    import tempfile
+
+    capture_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dwell_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    legacy_capture_count = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    app_count = 200
+
+    # 기존 쿼리 (ABS 조건 조인 + ROW_NUMBER, 비교용)
+    legacy_query = """
+    WITH FilteredTime AS (
+        SELECT wc.Id AS WindowCaptureId, wcar.AppId AS AppId,
+               CAST(wc.TimeStamp / 1000 AS INTEGER) AS TimeStampSeconds
+        FROM WindowCapture wc
+        JOIN WindowCaptureAppRelation wcar ON wc.Id = wcar.WindowCaptureId
+    ),
+    FilteredDwellTime AS (
+        SELECT WindowsAppID, CAST(HourStartTimeStamp / 1000 AS INTEGER) AS HourStartTimeStampSeconds, DwellTime,
+               ROW_NUMBER() OVER (PARTITION BY WindowsAppID, HourStartTimeStamp ORDER BY HourStartTimeStamp) AS RowNum
+        FROM AppDwellTime
+    )
+    SELECT DISTINCT app.ID AS AppID, app.WindowsAppID, app.PATH,
+        CASE WHEN ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1
+             THEN adt.HourStartTimeStampSeconds ELSE NULL END AS HourStartTimeStamp,
+        CASE WHEN ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1
+             THEN adt.DwellTime ELSE NULL END AS DwellTime,
+        ft.TimeStampSeconds AS TimeStamp
+    FROM FilteredTime ft
+    JOIN App app ON ft.AppId = app.ID
+    LEFT JOIN FilteredDwellTime adt
+        ON app.WindowsAppID = adt.WindowsAppID
+       AND ABS(ft.TimeStampSeconds - adt.HourStartTimeStampSeconds) <= 1
+       AND adt.RowNum = 1
+    ORDER BY app.ID, ft.TimeStampSeconds;
+    """
+
+    def build_synthetic_db(path, captures, dwell_rows):
+        """Recall ukg.db와 같은 구조의 합성 DB 생성 (DwellTime 행은 캡처 시각 ±1.5초 근처)"""
+        rng = random.Random(0)
+        start_ms = 1_717_200_000_000
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE WindowCapture(Id INTEGER PRIMARY KEY, TimeStamp INT);
+            CREATE TABLE App(Id INTEGER PRIMARY KEY, WindowsAppId TEXT, Path TEXT);
+            CREATE TABLE WindowCaptureAppRelation(WindowCaptureId INT, AppId INT);
+            CREATE TABLE AppDwellTime(Id INTEGER PRIMARY KEY, WindowsAppId TEXT, HourStartTimeStamp INT, DwellTime INT);
+        """)
+        conn.executemany("INSERT INTO App VALUES (?, ?, ?)",
+                         ((i, f"App.{i}", f"C:\\Program Files\\App{i}\\app{i}.exe") for i in range(1, app_count + 1)))
+        timestamps = [start_ms + i * 2500 + rng.randint(0, 999) for i in range(captures)]
+        app_ids = [rng.randint(1, app_count) for _ in range(captures)]
+        conn.executemany("INSERT INTO WindowCapture VALUES (?, ?)", ((i + 1, ts) for i, ts in enumerate(timestamps)))
+        conn.executemany("INSERT INTO WindowCaptureAppRelation VALUES (?, ?)",
+                         ((i + 1, app_id) for i, app_id in enumerate(app_ids)))
+        dwell = []
+        for _ in range(dwell_rows):
+            i = rng.randrange(captures)
+            dwell.append((f"App.{app_ids[i]}", timestamps[i] + rng.randint(-1500, 1500), rng.randint(1, 3_600_000)))
+        conn.executemany("INSERT INTO AppDwellTime (WindowsAppId, HourStartTimeStamp, DwellTime) VALUES (?, ?, ?)",
+                         dwell)
+        conn.commit()
+        conn.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "ukg_bench.db")
+        start = time.perf_counter()
+        build_synthetic_db(db, capture_count, dwell_count)
+        print(f"[DEBUG] 합성 DB 생성: 캡처 {capture_count}개, DwellTime {dwell_count}개 "
+              f"({time.perf_counter() - start:.1f}초)")
+
+        start = time.perf_counter()
+        rows, _ = load_app_data_from_db(db)
+        elapsed = time.perf_counter() - start
+        matched = sum(1 for row in rows if row[APP_DATA_DWELL_COLUMN] is not None)
+        print(f"구간 조인 (임시 테이블)   {elapsed:8.3f}s  {len(rows)}개 행, DwellTime 매칭 {matched}개")
+
+        # 기존 쿼리는 중첩 루프이므로 일부 캡처만 사용해 비교 (ORDER BY가 같은 행끼리는 순서가 다를 수 있어 집합으로 비교)
+        small_db = os.path.join(tmp, "ukg_bench_small.db")
+        build_synthetic_db(small_db, legacy_capture_count, max(1, dwell_count * legacy_capture_count // capture_count))
+        conn = sqlite3.connect(small_db)
+        start = time.perf_counter()
+        legacy_rows = conn.execute(legacy_query).fetchall()
+        legacy_elapsed = time.perf_counter() - start
+        conn.close()
+        start = time.perf_counter()
+        new_rows, _ = load_app_data_from_db(small_db)
+        new_elapsed = time.perf_counter() - start
+        print(f"기존 쿼리 (캡처 {legacy_capture_count}개)  {legacy_elapsed:8.3f}s  {len(legacy_rows)}개 행")
+        print(f"구간 조인 (캡처 {legacy_capture_count}개)  {new_elapsed:8.3f}s  {len(new_rows)}개 행, "
+              f"결과 일치: {len(legacy_rows) == len(new_rows) and set(legacy_rows) == set(new_rows)}")
+
+        # 표시 변환은 화면에 보이는 셀만 수행 (예: 50행)
+        start = time.perf_counter()
+        for row in rows[:50]:
+            [format_app_data_cell(column, value) for column, value in enumerate(row)]
+        print(f"표시 변환 (50행)          {time.perf_counter() - start:8.5f}s")
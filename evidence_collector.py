@@ -0,0 +1,238 @@
+# evidence_collector.py
+
+import os
+import csv
+import glob
+import shutil
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PySide6.QtCore import QThread, Signal
+from locked_file import copy_locked
+
+COPY_CHUNK_SIZE = 1024 * 1024  # 스트리밍 복사 단위 (1MB)
+MANIFEST_FILE_NAME = "collection_manifest.csv"
+MANIFEST_HEADERS = [
+    "Category", "Source", "Destination", "Size", "SHA256",
+    "Created", "Modified", "Accessed", "CollectedAt", "Error"
+]
+
+
+class CopyTask:
+    """수집할 아티팩트 파일 하나에 대한 복사 계획"""
+
+    def __init__(self, category, src, dst):
+        self.category = category  # 아티팩트 종류 (Recent, Prefetch, ...)
+        self.src = src
+        self.dst = dst
+
+    def __repr__(self):
+        return f"CopyTask({self.category!r}, {self.src!r}, {self.dst!r})"
+
+
+def format_file_time(timestamp):
+    """stat 타임스탬프(초)를 UTC ISO 문자열로 변환"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def copy_with_hash(src, dst, chunk_size=COPY_CHUNK_SIZE):
+    """
+    src를 dst로 스트리밍 복사하면서 SHA-256을 함께 계산한다.
+    사용 중인 파일(ukg.db 등)도 읽을 수 있도록 locked_file의 공유 모드 리더를 사용한다.
+    복사 전에 원본의 시간 정보를 기록하고, 복사 후 shutil.copy2처럼 메타데이터를 보존한다.
+    :return: 매니페스트 한 행(dict)
+    """
+    stat = os.stat(src)  # 읽기로 접근 시간이 바뀌기 전에 기록
+    size, sha256 = copy_locked(src, dst, chunk_size, hash_name="sha256")
+    shutil.copystat(src, dst)
+
+    return {
+        "Size": size,
+        "SHA256": sha256,
+        "Created": format_file_time(stat.st_ctime),
+        "Modified": format_file_time(stat.st_mtime),
+        "Accessed": format_file_time(stat.st_atime),
+    }
+
+
+def plan_directory(category, src_dir, dst_dir, extension=None):
+    """디렉토리 내 파일(확장자 필터 가능)을 복사 계획으로 변환"""
+    tasks = []
+    if not os.path.isdir(src_dir):
+        print(f"[ERROR] {category} 폴더를 찾을 수 없습니다: {src_dir}")
+        return tasks
+
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if extension and not entry.name.lower().endswith(extension):
+                continue
+            tasks.append(CopyTask(category, entry.path, os.path.join(dst_dir, entry.name)))
+    return tasks
+
+
+def plan_recent_lnk(recall_load_dir):
+    """Recent 폴더 내 .lnk 파일 복사 계획"""
+    recent_folder = os.path.join(os.environ.get('USERPROFILE', os.path.expanduser("~")),
+                                 'AppData', 'Roaming', 'Microsoft', 'Windows', 'Recent')
+    return plan_directory("Recent", recent_folder, os.path.join(recall_load_dir, "Recent_Artifact"), ".lnk")
+
+
+def plan_prefetch(recall_load_dir, prefetch_src=r"C:\Windows\Prefetch"):
+    """Prefetch(.pf) 파일 복사 계획"""
+    return plan_directory("Prefetch", prefetch_src, os.path.join(recall_load_dir, "Prefetch_Data"), ".pf")
+
+
+def plan_browser_history(recall_load_dir, history_paths):
+    """
+    브라우저 히스토리 파일 복사 계획
+    :param history_paths: {브라우저 이름: 원본 히스토리 경로}
+    """
+    tasks = []
+    browser_history_folder = os.path.join(recall_load_dir, "Browser_History")
+    for browser, path in history_paths.items():
+        if os.path.exists(path):
+            tasks.append(CopyTask("Browser_History", path, os.path.join(browser_history_folder, f"{browser}_History")))
+        else:
+            print(f"{browser} 히스토리 파일 경로가 존재하지 않습니다: {path}")
+    return tasks
+
+
+def plan_recall_database(recall_load_dir, output_dir):
+    """
+    ukg.db, ImageStore, ukg.db-wal 복사 계획
+    :return: (복사 계획 리스트, 복사 전 비워야 할 디렉토리 리스트)
+    """
+    tasks = []
+    clean_dirs = []
+    user_path = os.path.expanduser("~")
+    ukp_folder_path = os.path.join(user_path, "AppData", "Local", "CoreAIPlatform.00", "UKP")
+    guid_folders = glob.glob(os.path.join(ukp_folder_path, "{*}"))
+
+    for folder in guid_folders:
+        potential_path = os.path.join(folder, "ukg.db")
+        if os.path.exists(potential_path):
+            tasks.append(CopyTask("ukg.db", potential_path, os.path.join(recall_load_dir, "ukg.db")))
+            break
+    else:
+        print("ukg.db 파일을 찾을 수 없습니다.")
+
+    for folder in guid_folders:
+        image_store_path = os.path.join(folder, "ImageStore")
+        if os.path.exists(image_store_path):
+            image_store_destination = os.path.join(recall_load_dir, "ImageStore")
+            clean_dirs.append(image_store_destination)
+            tasks.extend(plan_directory("ImageStore", image_store_path, image_store_destination))
+            break
+    else:
+        print("ImageStore 폴더를 찾을 수 없습니다.")
+
+    for folder in guid_folders:
+        potential_wal_path = os.path.join(folder, "ukg.db-wal")
+        if os.path.exists(potential_wal_path):
+            tasks.append(CopyTask("ukg.db-wal", potential_wal_path, os.path.join(output_dir, "remained.db-wal")))
+            break
+    else:
+        print("ukg.db-wal 파일을 찾을 수 없습니다.")
+
+    return tasks, clean_dirs
+
+
+def write_manifest(manifest_path, rows):
+    """수집 결과 매니페스트(CSV) 저장"""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_HEADERS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: row.get(key, "") for key in MANIFEST_HEADERS})
+
+
+class EvidenceCollector(QThread):
+    """
+    미리 계획된 아티팩트 복사를 제한된 스레드 풀에서 병렬로 수행하는 스레드.
+    각 파일은 스트리밍 복사 중 SHA-256을 계산하고, 완료 후 매니페스트를 기록한다.
+    """
+    progress = Signal(int, int, str)  # (완료 수, 전체 수, 방금 처리한 파일)
+    task_failed = Signal(str, str)  # (원본 경로, 오류 메시지)
+    collection_finished = Signal(str)  # 매니페스트 경로
+
+    def __init__(self, tasks, manifest_path, clean_dirs=None, extra_steps=None, max_workers=None):
+        """
+        :param tasks: CopyTask 리스트
+        :param manifest_path: 매니페스트 CSV 저장 경로
+        :param clean_dirs: 복사 전에 비울 디렉토리 리스트 (예: 기존 ImageStore)
+        :param extra_steps: 복사 후 실행할 (이름, 호출 가능 객체) 리스트 (예: 레지스트리 하이브 백업)
+        :param max_workers: 최대 동시 복사 수 (기본값: CPU 수 기준, 최대 8)
+        """
+        super().__init__()
+        self.tasks = tasks
+        self.manifest_path = manifest_path
+        self.clean_dirs = clean_dirs or []
+        self.extra_steps = extra_steps or []
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+        self._cancelled = False
+
+    def cancel(self):
+        """대기 중인 복사 작업 취소 (이미 진행 중인 파일은 끝까지 복사)"""
+        self._cancelled = True
+
+    def copy_task(self, task):
+        """스레드 풀에서 실행되는 단일 파일 복사"""
+        if self._cancelled:
+            return None
+        row = {
+            "Category": task.category,
+            "Source": task.src,
+            "Destination": task.dst,
+            "CollectedAt": datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        row.update(copy_with_hash(task.src, task.dst))
+        return row
+
+    def run(self):
+        for directory in self.clean_dirs:
+            if os.path.exists(directory):
+                print(f"{directory} 폴더 이미 존재, 기존 폴더 삭제")
+                shutil.rmtree(directory, ignore_errors=True)
+
+        total = len(self.tasks)
+        done = 0
+        rows = []
+        print(f"[DEBUG] 아티팩트 수집 시작: {total}개 파일, 동시 작업 {self.max_workers}개")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.copy_task, task): task for task in self.tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                done += 1
+                try:
+                    row = future.result()
+                    if row is not None:
+                        rows.append(row)
+                except Exception as e:
+                    print(f"{task.category} 파일 복사 중 오류 발생: {task.src} ({e})")
+                    rows.append({"Category": task.category, "Source": task.src,
+                                 "Destination": task.dst, "Error": str(e)})
+                    self.task_failed.emit(task.src, str(e))
+                self.progress.emit(done, total, task.src)
+
+        for name, step in self.extra_steps:
+            if self._cancelled:
+                break
+            try:
+                step()
+                print(f"{name} 완료")
+            except Exception as e:
+                print(f"{name} 중 오류 발생: {e}")
+                rows.append({"Category": name, "Error": str(e)})
+                self.task_failed.emit(name, str(e))
+
+        rows.sort(key=lambda row: (row.get("Category", ""), row.get("Source", "")))
+        try:
+            write_manifest(self.manifest_path, rows)
+            print(f"[DEBUG] 수집 매니페스트 저장 완료: {self.manifest_path}")
+        except OSError as e:
+            print(f"수집 매니페스트 저장 중 오류 발생: {e}")
+
+        self.collection_finished.emit(self.manifest_path)
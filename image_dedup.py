@@ -0,0 +1,250 @@
+# image_dedup.py
+
+import os
+import sys
+import time
+import hashlib
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from PySide6.QtCore import Qt, QThread, QSize, Signal
+from PySide6.QtGui import QImage, QImageReader
+
+try:
+    from PIL import Image
+except ImportError:  # 선택 의존성: 없으면 QImageReader로 축소 디코딩
+    Image = None
+
+from analysis_cache import AnalysisCache
+from image_store import IMAGE_EXTENSIONS, image_store_for_db
+
+HASH_CACHE_KIND = "image_dhash"
+HASH_WIDTH, HASH_HEIGHT = 9, 8  # dHash: 9x8 흑백 이미지에서 가로로 이웃한 픽셀 비교 -> 64비트
+DUPLICATE_DISTANCE = 6          # 해밍 거리가 이 값 이하이면 같은 화면으로 봄
+PROGRESS_INTERVAL = 200         # 진행 상황을 알리는 이미지 간격
+SERIAL_LIMIT = 64               # 새로 계산할 이미지가 이보다 적으면 프로세스를 띄우지 않고 직접 계산
+
+_hash_maps = {}  # 케이스 키(hash_cache_key) -> {정규화된 토큰: dHash} (이번 실행에서 계산/복원한 것)
+_hash_maps_lock = threading.Lock()
+
+
+def _gray_pixels(image_path):
+    """9x8 흑백 픽셀 값 목록 (행 우선, 읽을 수 없으면 None)"""
+    if Image is not None:
+        try:
+            with Image.open(image_path) as image:
+                image.draft("L", (HASH_WIDTH * 8, HASH_HEIGHT * 8))  # JPEG는 디코딩 단계에서 축소
+                return list(image.convert("L").resize((HASH_WIDTH, HASH_HEIGHT), Image.LANCZOS).getdata())
+        except OSError:
+            return None
+
+    reader = QImageReader(image_path)
+    source_size = reader.size()
+    if source_size.isValid():
+        # JPEG는 1/8까지 디코딩 단계에서 축소되므로 원본 전체를 풀지 않음
+        reader.setScaledSize(QSize(max(HASH_WIDTH, source_size.width() // 8),
+                                   max(HASH_HEIGHT, source_size.height() // 8)))
+    image = reader.read()
+    if image.isNull():
+        return None
+    image = image.convertToFormat(QImage.Format_Grayscale8).scaled(
+        HASH_WIDTH, HASH_HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    pixels = []
+    for y in range(HASH_HEIGHT):
+        pixels.extend(image.pixelColor(x, y).red() for x in range(HASH_WIDTH))
+    return pixels
+
+
+def hash_image(image_path):
+    """이미지 파일의 64비트 dHash (읽을 수 없으면 None). 프로세스 풀 작업 함수."""
+    pixels = _gray_pixels(image_path)
+    if pixels is None:
+        return None
+    value = 0
+    for y in range(HASH_HEIGHT):
+        row = pixels[y * HASH_WIDTH:(y + 1) * HASH_WIDTH]
+        for x in range(HASH_WIDTH - 1):
+            value = (value << 1) | (row[x] < row[x + 1])
+    return value
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def scan_image_store(image_dir):
+    """ImageStore 파일 목록 DataFrame (ImageToken(정규화), Path, Size, MTime)"""
+    rows = []
+    with os.scandir(image_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            name = os.path.normcase(entry.name)
+            token = name
+            for extension in IMAGE_EXTENSIONS[1:]:
+                if name.endswith(extension):
+                    token = name[:-len(extension)]
+                    break
+            stat = entry.stat()
+            rows.append((token, entry.path, stat.st_size, stat.st_mtime_ns))
+    return pd.DataFrame(rows, columns=["ImageToken", "Path", "Size", "MTime"])
+
+
+def hash_cache_key(db_path):
+    """
+    케이스 식별 키: ImageStore 경로와 ukg.db (경로, 크기, 수정 시간).
+    같은 Recall_load 경로에 다시 수집한 케이스는 ukg.db가 바뀌므로 이전 케이스의 해시를 쓰지 않는다.
+    """
+    stat = os.stat(db_path)
+    identity = [os.path.normcase(os.path.abspath(image_store_for_db(db_path).image_dir)),
+                os.path.normcase(os.path.abspath(db_path)), str(stat.st_size), str(stat.st_mtime_ns)]
+    return hashlib.sha256("\x00".join(identity).encode("utf-8")).hexdigest()
+
+
+def compute_image_hashes(db_path, progress_callback=None, cancel_event=None, max_workers=None, cache=None):
+    """
+    ukg.db 옆 ImageStore 전체의 dHash {정규화된 토큰: 값}.
+    분석 캐시에 (토큰, 크기, 수정 시간, 해시)를 저장해 두고, 새로 생기거나 바뀐 파일만 프로세스 풀에서 계산한다.
+    취소되면 None.
+    """
+    cache = cache or AnalysisCache()
+    key = hash_cache_key(db_path)
+    files = scan_image_store(image_store_for_db(db_path).image_dir)
+    cached = cache.load_frame(HASH_CACHE_KIND, key)
+    if cached is not None and len(cached):
+        merged = files.merge(cached, on=["ImageToken", "Size", "MTime"], how="left")
+    else:
+        merged = files.assign(Hash=None)
+    pending = merged[merged["Hash"].isna()]
+    total = len(pending)
+
+    hashes = {}
+    start = time.perf_counter()
+    if max_workers == 1 or total < SERIAL_LIMIT:
+        for done, (token, path) in enumerate(zip(pending["ImageToken"], pending["Path"]), 1):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            value = hash_image(path)
+            if value is not None:
+                hashes[token] = value
+            if progress_callback and (done % PROGRESS_INTERVAL == 0 or done == total):
+                progress_callback(done, total)
+    else:
+        # Qt 스레드에서 호출되므로 fork 대신 spawn 사용 (Windows와 동일한 방식)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = executor.map(hash_image, pending["Path"], chunksize=64)
+            for done, (token, value) in enumerate(zip(pending["ImageToken"], results), 1):
+                if cancel_event is not None and cancel_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+                if value is not None:
+                    hashes[token] = value
+                if progress_callback and (done % PROGRESS_INTERVAL == 0 or done == total):
+                    progress_callback(done, total)
+    if total:
+        print(f"[DEBUG] 이미지 dHash 계산: {total}개 ({time.perf_counter() - start:.1f}초)")
+
+    known = merged[merged["Hash"].notna()]
+    hashes.update(zip(known["ImageToken"], (int(value, 16) for value in known["Hash"])))
+    if total:
+        stored = files[files["ImageToken"].isin(hashes)].drop(columns="Path")
+        stored["Hash"] = [format(hashes[token], "016x") for token in stored["ImageToken"]]
+        cache.store_frame(HASH_CACHE_KIND, key, stored)
+    return hashes
+
+
+def collapse_runs(results, hashes, max_distance=DUPLICATE_DISTANCE):
+    """
+    (TimeStamp, ImageToken) 목록에서 연속된 유사 화면 구간을 첫 프레임 하나로 접음.
+    각 프레임은 구간의 첫 프레임과 비교하므로 조금씩 바뀌는 화면이 한 구간으로 끝없이 이어지지 않는다.
+    :return: (접은 목록, {대표 ImageToken: 구간 프레임 수})
+    """
+    collapsed = []
+    run_lengths = {}
+    anchor = None  # 현재 구간 첫 프레임의 해시
+    for row in results:
+        value = hashes.get(os.path.normcase(row[1])) if row[1] else None
+        if value is not None and anchor is not None and hamming_distance(value, anchor) <= max_distance:
+            run_lengths[collapsed[-1][1]] += 1
+            continue
+        collapsed.append(row)
+        run_lengths[row[1]] = 1
+        anchor = value
+    return collapsed, run_lengths
+
+
+def loaded_hashes(db_path):
+    """이번 실행에서 이 케이스에 대해 이미 계산/복원한 해시 (없으면 None)"""
+    try:
+        key = hash_cache_key(db_path)
+    except OSError:
+        return None
+    with _hash_maps_lock:
+        return _hash_maps.get(key)
+
+
+class ImageHashWorker(QThread):
+    """ImageStore dHash 계산 스레드 (이미지 디코딩은 프로세스 풀에서 실행)"""
+    progress = Signal(int, int)         # (계산한 이미지 수, 계산할 전체)
+    hashes_ready = Signal(str, object)  # (ukg.db 경로, {토큰: dHash})
+    hashes_failed = Signal(str)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        try:
+            key = hash_cache_key(self.db_path)
+            hashes = compute_image_hashes(self.db_path, self.progress.emit, self._cancel_event)
+            if hashes is None:
+                self.hashes_failed.emit("유사 화면 분석이 취소되었습니다.")
+                return
+            with _hash_maps_lock:
+                _hash_maps[key] = hashes
+            self.hashes_ready.emit(self.db_path, hashes)
+        except (OSError, ValueError, sqlite3.Error, BrokenProcessPool) as e:
+            # 어떤 경우에도 hashes_ready/hashes_failed 중 하나는 보내야 탭이 "분석 중"에 머물지 않음
+            print(f"[ERROR] 유사 화면 분석 실패: {e}")
+            self.hashes_failed.emit(f"유사 화면 분석 실패: {e}")
+
+
+if __name__ == "__main__":
+    # 벤치마크: python image_dedup.py <ukg.db> [프로세스 수]  (ukg.db 옆 ImageStore 폴더 사용)
+    if len(sys.argv) < 2:
+        print("사용법: python image_dedup.py <ukg.db> [프로세스 수]")
+        sys.exit(1)
+
+    db = sys.argv[1]
+    process_count = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    listing = scan_image_store(image_store_for_db(db).image_dir)
+
+    start = time.perf_counter()
+    for path in listing["Path"][:50]:
+        hash_image(path)
+    serial = (time.perf_counter() - start) / max(min(len(listing), 50), 1)
+    print(f"단일 프로세스        {serial * 1000:8.2f}ms/이미지 (Pillow: {Image is not None})")
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as temp_dir:
+        benchmark_cache = AnalysisCache(os.path.join(temp_dir, "analysis_cache.db"))
+        start = time.perf_counter()
+        image_hashes = compute_image_hashes(db, max_workers=process_count, cache=benchmark_cache)
+        print(f"프로세스 풀 (전체)   {time.perf_counter() - start:8.3f}s  {len(image_hashes)}개")
+        start = time.perf_counter()
+        compute_image_hashes(db, max_workers=process_count, cache=benchmark_cache)
+        print(f"분석 캐시 (재실행)   {time.perf_counter() - start:8.3f}s")
+
+    ordered = [(None, token) for token in sorted(image_hashes)]
+    frames, runs = collapse_runs(ordered, image_hashes)
+    print(f"유사 화면 접기       {len(ordered)}개 -> {len(frames)}개 (가장 긴 구간 {max(runs.values(), default=0)}개)")
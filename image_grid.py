@@ -0,0 +1,251 @@
+# image_grid.py
+
+from datetime import datetime
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QPoint, QRect, QSize, QTimer, Signal
+from PySide6.QtGui import QColor, QFont, QPen
+from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate, QAbstractItemView
+
+TOKEN_ROLE = Qt.UserRole + 1
+TIMESTAMP_ROLE = Qt.UserRole + 2
+RUN_LENGTH_ROLE = Qt.UserRole + 3  # 유사 화면을 접었을 때 타일이 대표하는 프레임 수
+
+IMAGES_PER_ROW = 4
+SELECTION_BORDER_WIDTH = 2  # 선택 상자의 테두리 두께
+GRID_SPACING = SELECTION_BORDER_WIDTH * 2
+TIMESTAMP_HEIGHT = 17
+IMAGE_RATIO = 0.7
+REQUEST_DELAY_MS = 30  # 스크롤이 멈춘 뒤 썸네일을 요청하기까지의 지연
+
+
+class CaptureResultsModel(QAbstractListModel):
+    """검색 결과 (TimeStamp, ImageToken) 목록 모델. 표시용 시각 문자열은 그려질 때만 만든다."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results = []
+        self.run_lengths = {}  # 대표 ImageToken -> 접힌 구간 프레임 수
+
+    def set_results(self, results, run_lengths=None):
+        self.beginResetModel()
+        self.results = [(timestamp, token) for timestamp, token in results if token is not None]
+        self.run_lengths = run_lengths or {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        timestamp, token = self.results[index.row()]
+        if role == Qt.DisplayRole:
+            return datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        if role == TOKEN_ROLE:
+            return token
+        if role == TIMESTAMP_ROLE:
+            return timestamp
+        if role == RUN_LENGTH_ROLE:
+            return self.run_lengths.get(token, 1)
+        return None
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """썸네일 타일 그리기: 썸네일(없으면 자리표시자) + 시각, 선택 시 파란 테두리"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thumbnail_cache = None
+        self.image_size = QSize(150, 105)
+        self.time_font = QFont()
+        self.time_font.setPointSize(12)
+        self.time_font.setBold(True)
+
+    def tile_size(self):
+        return QSize(self.image_size.width() + SELECTION_BORDER_WIDTH * 2,
+                     self.image_size.height() + TIMESTAMP_HEIGHT + SELECTION_BORDER_WIDTH * 2)
+
+    def sizeHint(self, option, index):
+        return self.tile_size()
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = QRect(option.rect.topLeft(), self.tile_size())
+        painter.fillRect(rect, QColor("#ffffff"))
+        inner = rect.adjusted(SELECTION_BORDER_WIDTH, SELECTION_BORDER_WIDTH,
+                              -SELECTION_BORDER_WIDTH, -SELECTION_BORDER_WIDTH)
+        image_rect = QRect(inner.topLeft(), self.image_size)
+
+        token = index.data(TOKEN_ROLE)
+        width, height = self.image_size.width(), self.image_size.height()
+        pixmap = self.thumbnail_cache.cached_pixmap(token, width, height) if self.thumbnail_cache else None
+        if pixmap is not None:
+            x = image_rect.left() + (image_rect.width() - pixmap.width()) // 2
+            y = image_rect.top() + (image_rect.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            failed = self.thumbnail_cache is not None and self.thumbnail_cache.is_failed(token, width, height)
+            painter.fillRect(image_rect, QColor("#f0f0f0"))
+            painter.setPen(QColor("#999999"))
+            painter.drawText(image_rect, Qt.AlignCenter, "이미지 없음" if failed else "로딩 중...")
+
+        run_length = index.data(RUN_LENGTH_ROLE)
+        if run_length > 1:
+            # 접힌 유사 화면 수 표시 (오른쪽 위)
+            badge = f"+{run_length - 1}"
+            badge_rect = painter.fontMetrics().boundingRect(badge).adjusted(-5, -2, 5, 2)
+            badge_rect.moveTopRight(image_rect.topRight() + QPoint(-4, 4))
+            painter.fillRect(badge_rect, QColor(0, 0, 0, 160))
+            painter.setPen(QColor("#ffffff"))
+            painter.drawText(badge_rect, Qt.AlignCenter, badge)
+
+        time_rect = QRect(inner.left(), image_rect.bottom() + 1, inner.width(), TIMESTAMP_HEIGHT)
+        painter.setPen(QColor("#e0e0e0"))
+        painter.drawLine(time_rect.topLeft(), time_rect.topRight())
+        painter.setPen(QColor("#000000"))
+        painter.setFont(self.time_font)
+        painter.drawText(time_rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+
+        if option.state & QStyle.State_Selected:
+            painter.setPen(QPen(QColor("#007AFF"), SELECTION_BORDER_WIDTH))
+            half = SELECTION_BORDER_WIDTH // 2
+            painter.drawRect(rect.adjusted(half, half, -half, -half))
+        painter.restore()
+
+
+class ImageGridView(QListView):
+    """
+    검색 결과 썸네일 그리드 (QListView IconMode).
+    화면에 보이는 타일만 그리고, 보이는 범위의 썸네일을 스레드 풀에 요청한 뒤 다음 화면 분량을 미리 준비한다.
+    스크롤하면 보이지 않게 된 타일의 대기 중인 요청은 취소된다. 결과 수와 관계없이 위젯은 하나뿐이다.
+    """
+    capture_selected = Signal(object, str)   # (TimeStamp, ImageToken) - 타일 클릭
+    capture_activated = Signal(object, str)  # 선택된 타일을 다시 클릭
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results_model = CaptureResultsModel(self)
+        self.delegate = ThumbnailDelegate(self)
+        self.thumbnail_cache = None
+
+        self.setModel(self.results_model)
+        self.setItemDelegate(self.delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # 스크롤바가 나타나고 사라지며 타일 크기가 바뀌는 것을 막음
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setStyleSheet("QListView { background-color: #ffffff; border: none; }")
+
+        self.request_timer = QTimer(self)
+        self.request_timer.setSingleShot(True)
+        self.request_timer.timeout.connect(self.request_visible_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_thumbnail_requests)
+        self.last_selected_row = None  # 마지막으로 클릭한 행 (다시 클릭하면 capture_activated)
+        self.clicked.connect(self.on_clicked)
+
+    # ------------------------------------------------------------------
+    # 데이터
+    # ------------------------------------------------------------------
+    def set_thumbnail_cache(self, thumbnail_cache):
+        if thumbnail_cache is self.thumbnail_cache:
+            return
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.cancel()
+            self.thumbnail_cache.thumbnail_ready.disconnect(self.on_thumbnail_loaded)
+            self.thumbnail_cache.thumbnail_failed.disconnect(self.on_thumbnail_loaded)
+        thumbnail_cache.thumbnail_ready.connect(self.on_thumbnail_loaded)
+        thumbnail_cache.thumbnail_failed.connect(self.on_thumbnail_loaded)
+        self.thumbnail_cache = thumbnail_cache
+        self.delegate.thumbnail_cache = thumbnail_cache
+
+    def set_results(self, results, run_lengths=None):
+        """결과 표시. run_lengths가 있으면 유사 화면 구간을 접은 타일에 접힌 프레임 수를 표시."""
+        self.results_model.set_results(results, run_lengths)
+        self.last_selected_row = None
+        self.scrollToTop()
+        self.schedule_thumbnail_requests()
+
+    def results(self):
+        return self.results_model.results
+
+    # ------------------------------------------------------------------
+    # 레이아웃
+    # ------------------------------------------------------------------
+    def update_tile_size(self):
+        """뷰포트 너비에 맞춰 한 줄에 IMAGES_PER_ROW개가 들어가도록 타일 크기 조정"""
+        # 한 줄을 꽉 채우면 IconMode 배치에서 마지막 타일이 다음 줄로 넘어가므로 1px 여유를 둠
+        cell_width = (self.viewport().width() - 1) // IMAGES_PER_ROW
+        image_width = max(cell_width - GRID_SPACING - SELECTION_BORDER_WIDTH * 2, 40)
+        image_size = QSize(image_width, int(image_width * IMAGE_RATIO))
+        if image_size == self.delegate.image_size:
+            return
+        self.delegate.image_size = image_size
+        tile = self.delegate.tile_size()
+        self.setGridSize(QSize(tile.width() + GRID_SPACING, tile.height() + GRID_SPACING))
+        self.schedule_thumbnail_requests()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_tile_size()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_tile_size()
+        self.schedule_thumbnail_requests()
+
+    # ------------------------------------------------------------------
+    # 썸네일 요청
+    # ------------------------------------------------------------------
+    def schedule_thumbnail_requests(self):
+        self.request_timer.start(REQUEST_DELAY_MS)
+
+    def visible_rows(self):
+        """화면에 보이는 첫/마지막 결과 행 번호 (결과가 없으면 None)"""
+        count = self.results_model.rowCount()
+        grid = self.gridSize()
+        if count == 0 or grid.width() <= 0 or grid.height() <= 0:
+            return None
+        columns = max(self.viewport().width() // grid.width(), 1)
+        first_line = self.verticalScrollBar().value() // grid.height()
+        line_count = self.viewport().height() // grid.height() + 2  # 일부만 보이는 위/아래 줄 포함
+        first_row = min(first_line * columns, count - 1)
+        last_row = min((first_line + line_count) * columns, count) - 1
+        return first_row, last_row
+
+    def request_visible_thumbnails(self):
+        """보이는 타일을 화면 순서대로 요청하고, 다음 화면 분량을 낮은 우선순위로 요청"""
+        if self.thumbnail_cache is None or not self.isVisible():
+            return
+        rows = self.visible_rows()
+        self.thumbnail_cache.cancel()  # 더 이상 보이지 않는 타일의 대기 중인 요청 취소
+        if rows is None:
+            return
+        first_row, last_row = rows
+        width, height = self.delegate.image_size.width(), self.delegate.image_size.height()
+        results = self.results_model.results
+        self.thumbnail_cache.request([token for _, token in results[first_row:last_row + 1]],
+                                     width, height, priority=1)
+        page = last_row - first_row + 1
+        self.thumbnail_cache.request([token for _, token in results[last_row + 1:last_row + 1 + page]],
+                                     width, height)
+
+    def on_thumbnail_loaded(self, image_token, width, height):
+        if (width, height) == (self.delegate.image_size.width(), self.delegate.image_size.height()):
+            self.viewport().update()
+
+    # ------------------------------------------------------------------
+    # 클릭
+    # ------------------------------------------------------------------
+    def on_clicked(self, index):
+        timestamp, token = index.data(TIMESTAMP_ROLE), index.data(TOKEN_ROLE)
+        if index.row() == self.last_selected_row:
+            self.capture_activated.emit(timestamp, token)
+            return
+        self.last_selected_row = index.row()
+        self.capture_selected.emit(timestamp, token)
@@ -0,0 +1,164 @@
+# image_prefetch.py
+
+import os
+import sys
+import math
+import time
+from collections import OrderedDict
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+MEMORY_LIMIT = 512 * 1024 * 1024       # 미리 읽은 이미지 버퍼 최대 크기 (바이트)
+DEFAULT_IMAGE_BYTES = 1920 * 1080 * 4  # 아직 디코딩한 이미지가 없을 때의 이미지 크기 추정값
+LOOKAHEAD_SECONDS = 2.0                # 자동 이동 시 미리 읽을 재생 시간
+MIN_DEPTH = 3                          # 수동 이동 시 진행 방향으로 미리 읽을 이미지 수
+MAX_DEPTH = 64
+BEHIND_DEPTH = 2                       # 반대 방향으로 남겨 둘 이미지 수
+
+
+def read_ahead_depth(speed=None):
+    """진행 방향으로 미리 읽을 이미지 수 K (자동 이동 속도(이미지/초)가 빠를수록 깊게)"""
+    if not speed:
+        return MIN_DEPTH
+    return max(MIN_DEPTH, min(MAX_DEPTH, math.ceil(speed * LOOKAHEAD_SECONDS)))
+
+
+def neighbour_indices(index, count, direction, depth, behind=BEHIND_DEPTH):
+    """현재 위치 다음에 볼 순서대로 정렬한 인덱스 (진행 방향 depth개, 반대 방향 behind개)"""
+    step = -1 if direction == 'prev' else 1
+    ahead = [index + step * i for i in range(1, depth + 1)]
+    back = [index - step * i for i in range(1, behind + 1)]
+    return [i for i in ahead + back if 0 <= i < count]
+
+
+class DecodeSignals(QObject):
+    image_decoded = Signal(str, QImage)  # (ImageToken, 이미지)
+
+
+class ImageDecodeTask(QRunnable):
+    """스레드 풀에서 원본 이미지를 QImage로 디코딩하는 작업 (QImage만 사용하므로 스레드 안전)"""
+
+    def __init__(self, signals, image_token, image_path):
+        super().__init__()
+        self.setAutoDelete(False)  # 취소(tryTake)할 수 있도록 ImageReadAhead가 참조를 유지
+        self.signals = signals
+        self.image_token = image_token
+        self.image_path = image_path
+
+    def run(self):
+        reader = QImageReader(self.image_path)
+        reader.setAutoTransform(True)
+        image = reader.read()
+        if image.isNull():
+            print(f"[ERROR] 이미지 미리 읽기 실패: {self.image_path} ({reader.errorString()})")
+        self.signals.image_decoded.emit(self.image_token, image)
+
+
+class ImageReadAhead(QObject):
+    """
+    Image 탭 이미지 미리 읽기 버퍼.
+    update()로 다음에 볼 토큰 목록(가까운 순)을 받으면 목록에 없는 대기 요청은 취소하고 버퍼에서도 내보내며,
+    메모리 한도 안에서 목록 앞쪽부터 전용 스레드 풀에 디코딩을 요청한다.
+    디코딩된 이미지는 GUI 스레드에서 QPixmap으로 바꿔 두므로 표시할 때 디스크를 기다리지 않는다.
+    """
+    image_ready = Signal(str)  # 버퍼에 올라간 ImageToken
+
+    def __init__(self, image_store, memory_limit=MEMORY_LIMIT, parent=None):
+        super().__init__(parent)
+        self.image_store = image_store
+        self.memory_limit = memory_limit
+        self.image_bytes = DEFAULT_IMAGE_BYTES  # 최근 디코딩한 이미지 크기
+        self._buffer = OrderedDict()  # ImageToken -> QPixmap
+        self._tasks = {}              # ImageToken -> 대기/실행 중인 ImageDecodeTask
+        self._wanted = set()          # 마지막 update()에서 버퍼에 유지할 토큰
+        self.pool = QThreadPool(self)  # 썸네일 작업과 경쟁하지 않도록 별도 풀 사용
+        self.pool.setMaxThreadCount(max(2, min(4, QThread.idealThreadCount())))
+        self.signals = DecodeSignals()
+        self.signals.image_decoded.connect(self.on_image_decoded)
+
+    def pixmap(self, image_token):
+        """버퍼에 있는 이미지 (없으면 None)"""
+        return self._buffer.get(image_token)
+
+    def memory_used(self):
+        return sum(pixmap.width() * pixmap.height() * 4 for pixmap in self._buffer.values())
+
+    def update(self, image_tokens):
+        """
+        다음에 볼 토큰 목록(가까운 순)으로 버퍼를 맞춤.
+        메모리 한도에 들어가는 만큼만 요청하며, 가까운 토큰이 먼저 디코딩되도록 우선순위를 준다.
+        """
+        capacity = max(1, self.memory_limit // max(self.image_bytes, 1))
+        wanted = [token for token in dict.fromkeys(image_tokens) if token][:capacity]
+        self._wanted = set(wanted)
+
+        for token, task in list(self._tasks.items()):
+            if token not in self._wanted and self.pool.tryTake(task):
+                del self._tasks[token]
+        for token in [token for token in self._buffer if token not in self._wanted]:
+            del self._buffer[token]
+
+        for distance, token in enumerate(wanted):
+            if token in self._buffer or token in self._tasks:
+                continue
+            image_path = self.image_store.resolve(token)
+            if image_path is None:
+                continue
+            task = ImageDecodeTask(self.signals, token, image_path)
+            self._tasks[token] = task
+            self.pool.start(task, len(wanted) - distance)
+
+    def cancel(self):
+        """대기 중인 요청을 모두 취소하고 버퍼를 비움"""
+        self.update([])
+
+    def on_image_decoded(self, image_token, image):
+        """디코딩 완료 (GUI 스레드): 아직 필요한 토큰이면 버퍼에 올림"""
+        self._tasks.pop(image_token, None)
+        if image.isNull() or image_token not in self._wanted:
+            return
+        self.image_bytes = image.width() * image.height() * 4
+        self._buffer[image_token] = QPixmap.fromImage(image)
+        self.image_ready.emit(image_token)
+
+
+if __name__ == "__main__":
+    # 벤치마크: python image_prefetch.py <ImageStore 폴더> [속도(이미지/초)]
+    from PySide6.QtWidgets import QApplication
+    from image_store import ImageStoreIndex
+
+    if len(sys.argv) < 2:
+        print("사용법: python image_prefetch.py <ImageStore 폴더> [속도(이미지/초)]")
+        sys.exit(1)
+
+    app = QApplication(sys.argv)
+    store = ImageStoreIndex(sys.argv[1])
+    playback_speed = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    tokens = sorted(os.path.splitext(entry.name)[0] for entry in os.scandir(sys.argv[1]) if entry.is_file())
+
+    start = time.perf_counter()
+    for token in tokens:
+        QPixmap(store.resolve(token))
+    print(f"요청 시 디코딩          {(time.perf_counter() - start) / len(tokens) * 1000:8.2f}ms/이미지  {len(tokens)}개")
+
+    read_ahead = ImageReadAhead(store)
+    depth = read_ahead_depth(playback_speed)
+    interval = 1.0 / playback_speed
+    hits = 0
+    stalls = []
+    for position, token in enumerate(tokens):
+        step_start = time.perf_counter()
+        app.processEvents()
+        if read_ahead.pixmap(token) is not None:
+            hits += 1
+        else:
+            QPixmap(store.resolve(token))
+            stalls.append(time.perf_counter() - step_start)
+        read_ahead.update([tokens[i] for i in neighbour_indices(position, len(tokens), 'next', depth)])
+        while time.perf_counter() - step_start < interval:
+            app.processEvents()
+            time.sleep(0.001)
+    print(f"미리 읽기 (K={depth}, {playback_speed}장/초)  적중 {hits}/{len(tokens)}, "
+          f"미적중 지연 합 {sum(stalls) * 1000:.1f}ms, 버퍼 {read_ahead.memory_used() / 1024 / 1024:.0f}MB")
+    read_ahead.cancel()
+    read_ahead.pool.waitForDone()
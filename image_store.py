@@ -0,0 +1,135 @@
+# image_store.py
+
+import os
+import sys
+import time
+import threading
+
+IMAGE_STORE_DIR_NAME = "ImageStore"
+IMAGE_EXTENSIONS = ['', '.jpg', '.jpeg', '.png']  # 토큰 뒤에 붙을 수 있는 확장자 (우선순위 순)
+REFRESH_INTERVAL = 1.0  # 폴더 수정 시간을 다시 확인하는 최소 간격 (초)
+
+_stores = {}  # ImageStore 경로 -> ImageStoreIndex
+_stores_lock = threading.Lock()
+
+
+class ImageStoreIndex:
+    """
+    ImageStore 폴더의 ImageToken -> (실제 파일 경로, 크기) 색인.
+    os.scandir 한 번으로 만들고, 폴더 수정 시간(mtime)이 바뀌었을 때만 다시 만든다.
+    토큰마다 ['', '.jpg', '.jpeg', '.png'] 확장자를 os.path.exists로 확인하던 것을 딕셔너리 조회로 대신한다.
+    여러 스레드(썸네일 작업 등)에서 조회해도 안전하다.
+    """
+
+    def __init__(self, image_dir):
+        self.image_dir = image_dir
+        self.entries = {}       # 정규화된 토큰 -> (경로, 크기)
+        self._mtime = None      # 마지막으로 색인한 폴더 수정 시간 (폴더가 없으면 None)
+        self._checked_at = 0.0  # 마지막으로 수정 시간을 확인한 시각
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        """폴더가 바뀌었으면 다시 색인 (다시 만들었으면 True)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < REFRESH_INTERVAL:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.image_dir).st_mtime_ns
+            except OSError:
+                mtime = None
+            if not force and mtime == self._mtime:
+                return False
+
+            start = time.perf_counter()
+            entries = {}
+            priorities = {}
+            if mtime is not None:
+                try:
+                    with os.scandir(self.image_dir) as it:
+                        for entry in it:
+                            if not entry.is_file():
+                                continue
+                            name = os.path.normcase(entry.name)
+                            token, ext = name, ''
+                            for candidate in IMAGE_EXTENSIONS[1:]:
+                                if name.endswith(candidate):
+                                    token, ext = name[:-len(candidate)], candidate
+                                    break
+                            # 확장자 없는 파일이 그대로 토큰인 경우도 함께 등록 (우선순위가 높은 확장자 우선)
+                            for key, priority in ((name, 0), (token, IMAGE_EXTENSIONS.index(ext))):
+                                if key not in priorities or priority < priorities[key]:
+                                    priorities[key] = priority
+                                    entries[key] = (os.path.normpath(entry.path), entry.stat().st_size)
+                except OSError as e:
+                    print(f"[ERROR] ImageStore 색인 실패: {self.image_dir} ({e})")
+            self.entries = entries
+            self._mtime = mtime
+            print(f"[DEBUG] ImageStore 색인: 파일 {len(entries)}개 항목 ({time.perf_counter() - start:.3f}초)")
+            return True
+
+    def lookup(self, image_token):
+        """(경로, 크기) 또는 None"""
+        if not image_token:
+            return None
+        self.refresh()
+        return self.entries.get(os.path.normcase(image_token))
+
+    def resolve(self, image_token):
+        """토큰의 실제 이미지 파일 경로 (없으면 None)"""
+        entry = self.lookup(image_token)
+        return entry[0] if entry else None
+
+    def size(self, image_token):
+        """토큰 이미지 파일 크기 (없으면 None)"""
+        entry = self.lookup(image_token)
+        return entry[1] if entry else None
+
+    def __contains__(self, image_token):
+        return self.lookup(image_token) is not None
+
+
+def get_image_store(image_dir):
+    """ImageStore 경로별로 하나의 색인을 공유 (Image 탭, Internal Audit, 썸네일 작업)"""
+    key = os.path.normcase(os.path.abspath(image_dir))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ImageStoreIndex(image_dir)
+            _stores[key] = store
+        return store
+
+
+def image_store_for_db(db_path):
+    """ukg.db 옆의 ImageStore 색인"""
+    return get_image_store(os.path.join(os.path.dirname(db_path), IMAGE_STORE_DIR_NAME))
+
+
+if __name__ == "__main__":
+    # 벤치마크: python image_store.py <ImageStore 폴더>
+    if len(sys.argv) < 2:
+        print("사용법: python image_store.py <ImageStore 폴더>")
+        sys.exit(1)
+
+    folder = sys.argv[1]
+    names = [entry.name for entry in os.scandir(folder) if entry.is_file()]
+    tokens = [os.path.splitext(name)[0] for name in names] + [f"missing-{i}" for i in range(len(names))]
+
+    start = time.perf_counter()
+    found = 0
+    for token in tokens:
+        base_path = os.path.normpath(os.path.join(folder, token))
+        for extension in IMAGE_EXTENSIONS:
+            if os.path.exists(base_path + extension):
+                found += 1
+                break
+    print(f"os.path.exists 확인   {time.perf_counter() - start:8.3f}s  토큰 {len(tokens)}개, 존재 {found}개")
+
+    start = time.perf_counter()
+    index = ImageStoreIndex(folder)
+    print(f"색인 생성 (scandir)   {time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    found = sum(1 for token in tokens if token in index)
+    print(f"색인 조회             {time.perf_counter() - start:8.3f}s  토큰 {len(tokens)}개, 존재 {found}개")
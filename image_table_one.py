@@ -1,12 +1,18 @@
 # image_table_one.py
 # ver 1.7
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDateTimeEdit, QSizePolicy, QApplication, QLineEdit
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDateTimeEdit, QSizePolicy, QApplication, QLineEdit, QCheckBox
 from PySide6.QtCore import Qt, QDateTime, Signal, QObject, QTimer
 from PySide6.QtGui import QPixmap, QKeyEvent, QDoubleValidator
 import sqlite3
 import os
+import bisect
 from datetime import datetime
+from ocr_search import get_ocr_index, open_search_connection, ocr_condition, prepare_ocr_rank
+from image_store import image_store_for_db
+from image_prefetch import ImageReadAhead, read_ahead_depth, neighbour_indices
+from capture_timeline import TimelineWorker, TimelineSlider
+from image_dedup import ImageHashWorker, collapse_runs, loaded_hashes
 
 # 이미지 로딩을 위한 신호를 정의할 클래스
 class ImageLoader(QObject):
@@ -19,17 +25,55 @@ class ImageLoader(QObject):
         else:
             self.image_loaded.emit(QPixmap())  # 빈 QPixmap을 보내어 로드 실패를 알림
 
+class ImageList(list):
+    """
+    검색 결과 (TimeStamp, ImageToken) 목록.
+    다른 탭에서 이동할 때 쓰는 토큰 -> 인덱스 딕셔너리를 검색마다 한 번만 만든다.
+    같은 토큰이 여러 번 나오면 첫 번째 인덱스를 사용한다.
+    """
+
+    def __init__(self, rows=()):
+        super().__init__(rows)
+        self._token_index = None
+        self._timestamps = None
+
+    def index_of_token(self, image_token):
+        """토큰의 인덱스 (없으면 None)"""
+        if self._token_index is None:
+            # 뒤에서부터 채워 첫 번째 인덱스가 남도록 함
+            self._token_index = {token: idx for idx, (_, token) in reversed(list(enumerate(self)))}
+        return self._token_index.get(image_token)
+
+    def between(self, start_timestamp, end_timestamp):
+        """시간순으로 정렬된 목록에서 start ~ end 범위의 행만 잘라낸 ImageList (이진 탐색)"""
+        if self._timestamps is None:
+            # ORDER BY ASC에서 NULL 타임스탬프는 앞쪽에 모이므로 제외
+            self._timestamps = [ts for ts, _ in self if ts is not None]
+        offset = len(self) - len(self._timestamps)
+        first = bisect.bisect_left(self._timestamps, start_timestamp)
+        last = bisect.bisect_right(self._timestamps, end_timestamp)
+        return ImageList(self[offset + first:offset + last])
+
 class ImageTableWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.db_path = None
-        self.images = []
+        self.images = ImageList()
+        self.all_images = ImageList()  # ImageToken이 있는 전체 캡처 (시간순) - 키워드 없는 검색은 여기서 잘라냄
+        self.timeline = None  # 분 단위 캡처 히스토그램 (CaptureTimeline)
+        self.timeline_db_path = None  # self.timeline을 만든 DB
+        self.timeline_worker = None
+        self.search_results = ImageList()  # 유사 화면을 접기 전의 현재 검색 결과
+        self.image_hashes = None  # {토큰: dHash} - 유사 화면 접기에 사용
+        self.hash_worker = None
         self.current_image_index = 0
 
         # 자동 이동 관련 속성
         self.auto_timer = QTimer(self)
         self.auto_timer.timeout.connect(self.auto_move)
         self.auto_move_direction = None  # 'prev' 또는 'next'
+        self.last_move_direction = 'next'  # 마지막 이동 방향 (미리 읽기 방향)
+        self.read_ahead = None  # 현재 케이스 ImageStore의 미리 읽기 버퍼
 
         # 메인 레이아웃 설정
         main_layout = QVBoxLayout(self)
@@ -86,6 +130,12 @@ class ImageTableWidget(QWidget):
         reset_button.clicked.connect(self.reset_search)
         search_group.addWidget(reset_button)
 
+        # 유사 화면 접기 (연속된 거의 같은 스크린샷은 첫 화면만 표시)
+        self.collapse_checkbox = QCheckBox("유사 화면 접기")
+        self.collapse_checkbox.setToolTip("지각 해시(dHash)가 거의 같은 연속 캡처를 건너뜀")
+        self.collapse_checkbox.toggled.connect(self.on_collapse_toggled)
+        search_group.addWidget(self.collapse_checkbox)
+
         # --- 자동 이동 컨트롤 그룹 ---
         auto_move_group = QHBoxLayout()
 
@@ -136,6 +186,22 @@ class ImageTableWidget(QWidget):
         # Control 레이아웃 추가
         main_layout.addLayout(control_layout)
 
+        # --- 캡처 활동 타임라인 (끌어서 시간 범위 선택) ---
+        timeline_layout = QHBoxLayout()
+        self.timeline_slider = TimelineSlider()
+        self.timeline_slider.range_changed.connect(self.on_timeline_range_changed)
+        self.timeline_slider.range_selected.connect(self.on_timeline_range_selected)
+        timeline_layout.addWidget(self.timeline_slider, stretch=1)
+        self.range_count_label = QLabel()
+        self.range_count_label.setMinimumWidth(180)
+        self.range_count_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        timeline_layout.addWidget(self.range_count_label)
+        main_layout.addLayout(timeline_layout)
+
+        # 시간 입력이 바뀌면 DB 조회 없이 타임라인 선택과 캡처 수만 갱신
+        self.start_time.dateTimeChanged.connect(self.update_range_summary)
+        self.end_time.dateTimeChanged.connect(self.update_range_summary)
+
         # 이미지 디스플레이 및 버튼 레이아웃
         image_layout = QHBoxLayout()
         image_layout.setContentsMargins(0, 0, 0, 0)
@@ -211,8 +277,21 @@ class ImageTableWidget(QWidget):
     def set_db_path(self, db_path):
         """db_path 설정 및 이미지 로드"""
         self.db_path = db_path
-        self.set_default_time_range()  # 시간 범위 초기화 후
-        self.load_images()  # 이미지 로드
+        get_ocr_index(db_path)  # OCR 검색 색인을 백그라운드에서 준비
+        if self.read_ahead is not None:
+            self.read_ahead.cancel()
+        self.read_ahead = ImageReadAhead(image_store_for_db(db_path), parent=self)
+        if self.hash_worker is not None:
+            self.hash_worker.cancel()  # 끝나면 on_hash_worker_finished에서 현재 케이스로 다시 시작
+        self.image_hashes = loaded_hashes(db_path)
+        if self.timeline_db_path != db_path:
+            self.timeline = None
+            self.timeline_slider.set_timeline(None)
+        self.start_timeline_worker()
+        self.load_images()  # 이미지 로드 후
+        self.set_default_time_range()  # 시간 범위 초기화
+        if self.collapse_checkbox.isChecked() and self.image_hashes is None:
+            self.start_hash_worker()  # 새 케이스 해시가 준비되면 접어서 다시 표시
 
     def load_images(self):
         """ImageToken이 NULL이 아닌 모든 이미지 로드"""
@@ -229,8 +308,10 @@ class ImageTableWidget(QWidget):
             ORDER BY wc.Timestamp ASC;
             """
             cursor.execute(query)
-            self.images = cursor.fetchall()
+            self.all_images = ImageList(cursor.fetchall())
             conn.close()
+            self.search_results = self.all_images
+            self.images = self.collapsed(self.all_images)
 
             if self.images:
                 self.current_image_index = 0
@@ -243,7 +324,9 @@ class ImageTableWidget(QWidget):
         except sqlite3.Error as e:
             print(f"데이터베이스 오류: {e}")
             self.image_display.setText("데이터베이스 오류가 발생했습니다.")
-            self.images = []
+            self.images = ImageList()
+            self.all_images = self.images
+            self.search_results = self.images
             self.prev_button.setEnabled(False)
             self.next_button.setEnabled(False)
 
@@ -253,8 +336,7 @@ class ImageTableWidget(QWidget):
             return
 
         # 타임스탬프 범위
-        start_timestamp = self.start_time.dateTime().toSecsSinceEpoch() * 1000
-        end_timestamp = self.end_time.dateTime().toSecsSinceEpoch() * 1000
+        start_timestamp, end_timestamp = self.selected_time_range()
 
         # 키워드
         keyword = self.keyword_search.text().strip()
@@ -262,158 +344,230 @@ class ImageTableWidget(QWidget):
         print(f"검색 범위 (밀리초): {start_timestamp} ~ {end_timestamp}")
         print(f"OCR 검색 키워드: {keyword}")
 
+        if not keyword:
+            # 키워드가 없는 경우: 시간순 전체 목록에서 범위만 잘라냄 (DB 조회 없음)
+            self.show_search_results(self.all_images.between(start_timestamp, end_timestamp))
+            return
+
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn, use_index = open_search_connection(self.db_path)
             cursor = conn.cursor()
-            
-            if keyword:
-                # AND 연산 (&&)
-                if "&&" in keyword:
-                    terms = [term.strip() for term in keyword.split("&&")]
-                    params = [start_timestamp, end_timestamp]
-                    conditions = []
-                    for term in terms:
-                        params.append(f"%{term}%")
-                        conditions.append(f"EXISTS (SELECT 1 FROM WindowCaptureTextIndex_content wctc2 WHERE wctc2.c0 = wc.Id AND wctc2.c2 LIKE ?)")
-                    
-                    query = f"""
-                    SELECT DISTINCT wc.TimeStamp, wc.ImageToken
-                    FROM WindowCapture wc
-                    WHERE wc.TimeStamp BETWEEN ? AND ?
-                        AND wc.ImageToken IS NOT NULL
-                        AND {" AND ".join(conditions)}
-                    ORDER BY wc.TimeStamp ASC;
-                    """
-                    cursor.execute(query, params)
-                    
-                # OR 연산 (||)
-                elif "||" in keyword:
-                    terms = [term.strip() for term in keyword.split("||")]
-                    conditions = []
-                    params = [start_timestamp, end_timestamp]
-                    for term in terms:
-                        conditions.append("wctc.c2 LIKE ?")
-                        params.append(f"%{term}%")
-                    
-                    query = f"""
-                    SELECT DISTINCT wc.TimeStamp, wc.ImageToken
-                    FROM WindowCapture wc
-                    JOIN WindowCaptureTextIndex_content wctc ON wc.Id = wctc.c0
-                    WHERE wc.TimeStamp BETWEEN ? AND ?
-                        AND wc.ImageToken IS NOT NULL
-                        AND ({" OR ".join(conditions)})
-                    ORDER BY wc.TimeStamp ASC;
-                    """
-                    cursor.execute(query, params)
-                    
-                # 일반 검색
-                else:
-                    query = """
-                    SELECT DISTINCT wc.TimeStamp, wc.ImageToken
-                    FROM WindowCapture wc
-                    JOIN WindowCaptureTextIndex_content wctc ON wc.Id = wctc.c0
-                    WHERE wc.TimeStamp BETWEEN ? AND ?
-                        AND wc.ImageToken IS NOT NULL
-                        AND wctc.c2 LIKE ?
-                    ORDER BY wc.TimeStamp ASC;
-                    """
-                    cursor.execute(query, (start_timestamp, end_timestamp, f"%{keyword}%"))
+
+            # OCR 조건은 trigram FTS5 색인의 MATCH로 찾고, 결과는 bm25 관련도 순 (같으면 시간순)
+            if "&&" in keyword:
+                terms, joiner = [term.strip() for term in keyword.split("&&")], " AND "
+            elif "||" in keyword:
+                terms, joiner = [term.strip() for term in keyword.split("||")], " OR "
             else:
-                # 키워드가 없는 경우
-                query = """
-                SELECT wc.TimeStamp, wc.ImageToken
-                FROM WindowCapture wc
-                WHERE wc.TimeStamp BETWEEN ? AND ? 
+                terms, joiner = [keyword], " AND "
+            rank_join = prepare_ocr_rank(conn, terms, use_index)
+            params = [start_timestamp, end_timestamp]
+            conditions = []
+            for term in terms:
+                condition, condition_params = ocr_condition(term, use_index)
+                conditions.append(condition)
+                params.extend(condition_params)
+
+            query = f"""
+            SELECT wc.TimeStamp, wc.ImageToken
+            FROM WindowCapture wc
+            {rank_join}
+            WHERE wc.TimeStamp BETWEEN ? AND ?
                 AND wc.ImageToken IS NOT NULL
-                ORDER BY wc.TimeStamp ASC;
-                """
-                cursor.execute(query, (start_timestamp, end_timestamp))
-
-            self.images = cursor.fetchall()
+                AND ({joiner.join(conditions)})
+            ORDER BY ocr_rank.Rank IS NULL, ocr_rank.Rank, wc.TimeStamp ASC;
+            """
+            cursor.execute(query, params)
+            results = ImageList(cursor.fetchall())
             conn.close()
-
-            if self.images:
-                print(f"검색된 이미지 수: {len(self.images)}")
-                self.current_image_index = 0
-                self.display_image_from_token(self.images[0][1])
-                self.update_button_state()
-            else:
-                self.image_display.clear()
-                self.image_display.setText("해당 범위 내 이미지가 없습니다. 검색 범위를 확인해주세요.")
-                self.prev_button.setEnabled(False)
-                self.next_button.setEnabled(False)
+            self.show_search_results(results)
         except sqlite3.Error as e:
             print(f"데이터베이스 오류: {e}")
             self.image_display.setText("데이터베이스 오류가 발생했습니다.")
-            self.images = []
+            self.images = ImageList()
             self.prev_button.setEnabled(False)
             self.next_button.setEnabled(False)
         except Exception as e:
             print(f"알 수 없는 오류 발생: {e}")
             self.image_display.setText("알 수 없는 오류가 발생했습니다.")
-            self.images = []
+            self.images = ImageList()
             self.prev_button.setEnabled(False)
             self.next_button.setEnabled(False)
 
+    def show_search_results(self, results):
+        """검색 결과를 현재 이미지 목록으로 설정하고 첫 이미지 표시"""
+        self.search_results = results
+        self.images = self.collapsed(results)
+        if self.images:
+            print(f"검색된 이미지 수: {len(self.images)}")
+            self.current_image_index = 0
+            self.display_image_from_token(self.images[0][1])
+            self.update_button_state()
+        else:
+            self.image_display.clear()
+            self.image_display.setText("해당 범위 내 이미지가 없습니다. 검색 범위를 확인해주세요.")
+            self.prev_button.setEnabled(False)
+            self.next_button.setEnabled(False)
+
+    def collapsed(self, results):
+        """유사 화면 접기가 켜져 있으면 연속된 유사 화면을 첫 화면 하나로 접은 ImageList"""
+        if not self.collapse_checkbox.isChecked() or self.image_hashes is None:
+            return results
+        frames, _ = collapse_runs(results, self.image_hashes)
+        print(f"유사 화면 접기: {len(results)}개 -> {len(frames)}개")
+        return ImageList(frames)
+
+    def on_collapse_toggled(self, checked):
+        """유사 화면 접기 전환 (해시가 없으면 백그라운드에서 먼저 계산)"""
+        if self.db_path is None:
+            return
+        if checked and self.image_hashes is None:
+            self.image_hashes = loaded_hashes(self.db_path)  # 다른 탭에서 계산했으면 재사용
+            if self.image_hashes is None:
+                self.start_hash_worker()
+                return
+        self.show_current_results()
+
+    def start_hash_worker(self):
+        """
+        현재 케이스 ImageStore의 dHash 계산 시작.
+        이미 계산 중이면 무시하고, 이전 케이스 작업이 취소되는 중이면 그 작업이 끝난 뒤 다시 시작한다.
+        """
+        if self.hash_worker is not None:
+            return
+        self.hash_worker = ImageHashWorker(self.db_path, parent=self)
+        self.hash_worker.hashes_ready.connect(self.on_hashes_ready)
+        self.hash_worker.hashes_failed.connect(self.on_hashes_failed)
+        self.hash_worker.finished.connect(self.on_hash_worker_finished)
+        self.hash_worker.start()
+
+    def on_hash_worker_finished(self):
+        worker = self.sender()
+        if worker is self.hash_worker:
+            self.hash_worker = None
+            if worker.is_cancelled() and self.collapse_checkbox.isChecked() and self.image_hashes is None:
+                self.start_hash_worker()  # 케이스를 바꾸면서 취소된 작업 대신 현재 케이스로 다시 계산
+        worker.deleteLater()
+
+    def show_current_results(self):
+        """현재 검색 결과를 (접기 설정에 맞춰) 다시 표시하고 보던 이미지 근처로 이동"""
+        current = self.images[self.current_image_index] if self.current_image_index < len(self.images) else None
+        self.show_search_results(self.search_results)
+        if current is not None:
+            self.display_image_from_token_with_index(current[1])  # 보던 이미지가 접혔으면 구간 대표 화면으로
+
+    def on_hashes_ready(self, db_path, hashes):
+        if self.sender().is_cancelled():
+            return  # 케이스를 바꿔 취소된 이전 작업의 결과
+        self.image_hashes = hashes
+        if self.collapse_checkbox.isChecked():
+            self.show_current_results()
+
+    def on_hashes_failed(self, message):
+        print(message)
+        if not self.sender().is_cancelled():  # 케이스를 바꿔 취소된 작업은 끝난 뒤 다시 시작하므로 접기 유지
+            self.collapse_checkbox.setChecked(False)
+
     def reset_search(self):
-        """검색 필드를 초기화하고 기본 타임스탬프 범위로 되돌림"""
+        """검색 필드를 초기화하고 기본 타임스탬프 범위로 되돌림 (전체 목록 재사용)"""
         self.set_default_time_range()
         self.keyword_search.clear()
-        self.load_images()
+        self.show_search_results(self.all_images)
 
     def set_default_time_range(self):
-        """ImageToken이 NULL이 아닌 TimeStamp 중 가장 처음과 끝 값을 기본값으로 설정"""
+        """
+        ImageToken이 NULL이 아닌 TimeStamp 중 가장 처음과 끝 값을 기본값으로 설정.
+        이미 읽은 시간순 전체 목록의 양 끝을 사용하므로 MIN/MAX 조회가 필요 없다.
+        """
         if self.db_path is None:
             return
 
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = """
-            SELECT MIN(wc.Timestamp), MAX(wc.Timestamp)
-            FROM WindowCapture wc
-            WHERE wc.ImageToken IS NOT NULL;
-            """
-            cursor.execute(query)
-            result = cursor.fetchone()
-            conn.close()
+        timestamps = [timestamp for timestamp, _ in (self.all_images[:1] + self.all_images[-1:]) if timestamp]
+        if not timestamps:
+            return
+        self.start_time.setDateTime(QDateTime.fromSecsSinceEpoch(timestamps[0] // 1000))
+        self.end_time.setDateTime(QDateTime.fromSecsSinceEpoch(timestamps[-1] // 1000))
+        self.update_button_state()
 
-            if result and result[0] and result[1]:
-                min_timestamp, max_timestamp = result
-                min_time = QDateTime.fromSecsSinceEpoch(min_timestamp // 1000)
-                max_time = QDateTime.fromSecsSinceEpoch(max_timestamp // 1000)
-                self.start_time.setDateTime(min_time)
-                self.end_time.setDateTime(max_time)
-                self.update_button_state()
-        except sqlite3.Error as e:
-            print(f"데이터베이스 오류: {e}")
-            self.image_display.setText("데이터베이스 오류가 발생했습니다.")
+    def selected_time_range(self):
+        """시간 입력 상자의 (시작, 끝) 밀리초. 끝 시각은 그 초의 마지막 밀리초까지 포함."""
+        start_timestamp = self.start_time.dateTime().toSecsSinceEpoch() * 1000
+        end_timestamp = self.end_time.dateTime().toSecsSinceEpoch() * 1000 + 999
+        return start_timestamp, end_timestamp
+
+    def start_timeline_worker(self):
+        """현재 케이스의 분 단위 히스토그램 준비 시작 (같은 DB를 이미 처리 중이면 무시)"""
+        if self.timeline_worker is not None and self.timeline_worker.db_path == self.db_path:
+            return
+        # 이전 케이스 스레드는 부모(self)가 소유하므로 참조를 바꿔도 끝날 때까지 유지되고, 결과는 db_path로 걸러짐
+        self.timeline_worker = TimelineWorker(self.db_path, parent=self)
+        self.timeline_worker.timeline_ready.connect(self.on_timeline_ready)
+        self.timeline_worker.finished.connect(self.on_timeline_worker_finished)
+        self.timeline_worker.start()
+
+    def on_timeline_worker_finished(self):
+        worker = self.sender()
+        if worker is self.timeline_worker:
+            self.timeline_worker = None
+        worker.deleteLater()
+
+    def on_timeline_ready(self, db_path, timeline):
+        """분 단위 히스토그램 준비 완료: 타임라인에 표시하고 현재 범위 캡처 수 갱신"""
+        if db_path != self.db_path:
+            return
+        self.timeline = timeline
+        self.timeline_db_path = db_path
+        self.timeline_slider.set_timeline(timeline)
+        self.update_range_summary()
+
+    def update_range_summary(self):
+        """선택한 시간 범위를 타임라인에 표시하고 캡처 수를 히스토그램으로 바로 계산"""
+        if self.timeline is None:
+            self.range_count_label.setText("")
+            return
+        start_timestamp, end_timestamp = self.selected_time_range()
+        if self.timeline_slider.full_range is not None:
+            self.timeline_slider.set_selection(start_timestamp, end_timestamp)
+        self.update_range_count(start_timestamp, end_timestamp)
+
+    def update_range_count(self, start_timestamp, end_timestamp):
+        count = self.timeline.count_between(start_timestamp, end_timestamp)
+        self.range_count_label.setText(f"선택 범위: 약 {count:,}장 / {self.timeline.total():,}장")
+
+    def on_timeline_range_changed(self, start_timestamp, end_timestamp):
+        """타임라인을 끄는 동안 시간 입력 상자 갱신"""
+        for edit, timestamp in ((self.start_time, start_timestamp), (self.end_time, end_timestamp)):
+            edit.blockSignals(True)
+            edit.setDateTime(QDateTime.fromSecsSinceEpoch(timestamp // 1000))
+            edit.blockSignals(False)
+        self.update_range_count(start_timestamp, end_timestamp)
+
+    def on_timeline_range_selected(self, start_timestamp, end_timestamp):
+        """타임라인에서 범위를 고르면 해당 범위로 검색"""
+        self.search_images()
 
     def display_image_from_token(self, image_token):
         """이미지 토큰을 통해 이미지를 로드하고 표시"""
         if self.db_path:
-            image_dir = os.path.join(os.path.dirname(self.db_path), "ImageStore")
-            base_image_path = os.path.join(image_dir, image_token)
-            base_image_path = os.path.normpath(base_image_path)
-
-            # 이미지 파일 존재 여부 확인 (확장자 시도)
-            possible_extensions = ['', '.jpg', '.jpeg', '.png']
-            image_path = None
-            for ext in possible_extensions:
-                temp_path = base_image_path + ext
-                if os.path.exists(temp_path):
-                    image_path = temp_path
-                    break
+            # 이미지 파일 존재 여부 확인 (ImageStore 색인 조회, 확장자 포함)
+            image_store = image_store_for_db(self.db_path)
+            image_path = image_store.resolve(image_token)
 
             if image_path is None:
+                base_image_path = os.path.normpath(os.path.join(image_store.image_dir, image_token))
                 self.image_display.setText(f"이미지 파일을 찾을 수 없습니다: {base_image_path}")
                 print(f"이미지 파일 존재하지 않음: {base_image_path}")
                 self.image_display.clear()
                 self.update_button_state()
                 return
 
-            # 비동기적으로 이미지 로드
-            self.image_loader.load_image(image_path)
+            # 미리 읽은 이미지가 있으면 바로 표시, 없으면 직접 로드
+            pixmap = self.read_ahead.pixmap(image_token) if self.read_ahead else None
+            if pixmap is not None:
+                self.display_image(pixmap)
+            else:
+                self.image_loader.load_image(image_path)
+            self.schedule_read_ahead()
         else:
             self.image_display.setText("데이터베이스 경로가 설정되지 않았습니다.")
 
@@ -451,16 +605,30 @@ class ImageTableWidget(QWidget):
             print(f"임스탬프 변환 오류: {e}")
             return "N/A"
 
+    def schedule_read_ahead(self):
+        """
+        현재 위치에서 진행 방향으로 K개, 반대 방향으로 몇 개를 백그라운드에서 미리 읽음.
+        K는 자동 이동 중이면 속도에 맞춰 늘어나고 메모리 한도로 제한된다.
+        """
+        if self.read_ahead is None or not self.images:
+            return
+        direction = self.auto_move_direction or self.last_move_direction
+        depth = read_ahead_depth(self.get_speed() if self.auto_move_direction else None)
+        indices = neighbour_indices(self.current_image_index, len(self.images), direction, depth)
+        self.read_ahead.update([self.images[i][1] for i in indices])
+
     def show_previous_image(self):
         """이전 이미지로 이동"""
         if self.current_image_index > 0:
             self.current_image_index -= 1
+            self.last_move_direction = 'prev'
             self.display_image_from_token(self.images[self.current_image_index][1])
 
     def show_next_image(self):
         """다음 이미지로 이동"""
         if self.current_image_index < len(self.images) - 1:
             self.current_image_index += 1
+            self.last_move_direction = 'next'
             self.display_image_from_token(self.images[self.current_image_index][1])
 
     # 키보드 이벤트 처리 (좌우 화살표 키로 이미지 전환 및 상하 화살표 키로 자동 이동 제어)
@@ -518,6 +686,7 @@ class ImageTableWidget(QWidget):
                 interval = int(1000 / speed)  # 밀리초 단위
                 self.auto_timer.start(interval)
                 self.auto_prev_button.setText("<= Stop Auto Prev")
+                self.schedule_read_ahead()  # 속도에 맞춰 미리 읽기 범위 확장
         else:
             # 자동 이전 이동 중지
             self.auto_timer.stop()
@@ -545,6 +714,7 @@ class ImageTableWidget(QWidget):
                 interval = int(1000 / speed)  # 밀리초 단위
                 self.auto_timer.start(interval)
                 self.auto_next_button.setText("Stop Auto Next =>")
+                self.schedule_read_ahead()  # 속도에 맞춰 미리 읽기 범위 확장
         else:
             # 자동 다음 이동 중지
             self.auto_timer.stop()
@@ -588,10 +758,24 @@ class ImageTableWidget(QWidget):
         if not self.images:
             return False
             
-        # 이미지 토큰으로 인덱스 찾기
-        for idx, (_, token) in enumerate(self.images):
-            if token == target_token:
-                self.current_image_index = idx  # 현재 인덱스 업데이트
-                self.display_image_from_token(token)
-                return True
-        return False
+        idx = self.visible_index_of_token(target_token)
+        if idx is None:
+            return False
+        self.current_image_index = idx  # 현재 인덱스 업데이트
+        self.display_image_from_token(self.images[idx][1])
+        return True
+
+    def visible_index_of_token(self, image_token):
+        """현재 목록에서 토큰의 인덱스. 유사 화면 접기로 숨겨졌으면 그 구간 대표 화면의 인덱스 (없으면 None)"""
+        idx = self.images.index_of_token(image_token)
+        if idx is not None:
+            return idx
+        hidden = self.search_results.index_of_token(image_token)
+        if hidden is None:
+            return None
+        # 숨겨진 화면은 바로 앞에서 시작하는 구간에 속하므로 대표 화면이 나올 때까지 거슬러 올라감
+        for search_idx in range(hidden - 1, -1, -1):
+            idx = self.images.index_of_token(self.search_results[search_idx][1])
+            if idx is not None:
+                return idx
+        return None
@@ -0,0 +1,196 @@
+# lecmd_index.py
+
+import os
+import json
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import numpy as np
+
+KST_OFFSET = timedelta(hours=9)
+TABLE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+MATCH_TOLERANCE_SECONDS = 60  # App 테이블과 비교할 때 허용 오차 (±1분)
+
+
+def table_time_to_epoch(table_time):
+    """App 테이블의 KST 시간 문자열(또는 naive datetime)을 UTC epoch 초로 변환 (숫자는 이미 epoch 초)"""
+    if isinstance(table_time, (int, float)):
+        return table_time
+    if isinstance(table_time, str):
+        table_time = datetime.strptime(table_time, TABLE_TIME_FORMAT)
+    return calendar.timegm(table_time.timetuple()) - int(KST_OFFSET.total_seconds())
+
+
+def parse_lecmd_line(line):
+    """
+    LECmd JSON 한 줄을 항목(dict)으로 변환
+    :return: {"file_name", "source_file", "created_kst", "epoch"} 또는 SourceCreated가 없으면 None
+    """
+    item = json.loads(line)
+    source_created = item.get("SourceCreated")
+    if not source_created:
+        return None
+
+    utc_time = datetime.fromisoformat(source_created.replace("Z", "+00:00"))
+    source_file_path = item.get("SourceFile", "")
+    return {
+        "file_name": os.path.basename(source_file_path).replace(".lnk", ""),
+        "source_file": source_file_path,
+        "created_kst": (utc_time + KST_OFFSET).replace(tzinfo=None),
+        "epoch": utc_time.timestamp(),
+    }
+
+
+def load_lecmd_entries(json_file_path):
+    """
+    LECmd JSON 결과를 한 번만 파싱해 생성 시간 순으로 정렬된 항목 리스트로 반환
+    :return: (항목 리스트, 파싱 실패 메시지 리스트)
+    """
+    entries = []
+    errors = []
+    with open(json_file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = parse_lecmd_line(line)
+            except json.JSONDecodeError as e:
+                errors.append(f"[WARNING] JSON 파싱 실패: {e}")
+                continue
+            except Exception as e:
+                errors.append(f"[ERROR] JSON 처리 중 오류 발생: {e}")
+                continue
+            if entry is not None:
+                entries.append(entry)
+
+    entries.sort(key=lambda entry: entry["epoch"])
+    return entries, errors
+
+
+def match_entries_to_table(entries, table_times, tolerance=MATCH_TOLERANCE_SECONDS):
+    """
+    정렬된 LNK 항목과 App 테이블 시간을 구간 조인한다.
+    테이블 시간을 한 번 정렬한 뒤 각 항목의 [epoch - tolerance, epoch + tolerance] 구간을
+    searchsorted로 찾으므로 O((n + m) log m)이다.
+    :param entries: load_lecmd_entries()가 반환한 항목 리스트
+    :param table_times: App 테이블 행 순서대로의 KST 시간 문자열 또는 UTC epoch 초 리스트 (빈 값 허용)
+    :return: 매칭된 항목마다 {"entry", "rows", "nearest_row", "nearest_delta"} 리스트 (생성 시간 순)
+    """
+    rows = []
+    epochs = []
+    for row, table_time in enumerate(table_times):
+        if not table_time:
+            continue
+        try:
+            epochs.append(table_time_to_epoch(table_time))
+            rows.append(row)
+        except ValueError:
+            continue
+
+    if not entries or not epochs:
+        return []
+
+    table_epochs = np.asarray(epochs, dtype=np.int64)
+    order = np.argsort(table_epochs, kind="stable")
+    table_epochs = table_epochs[order]
+    table_rows = np.asarray(rows, dtype=np.int64)[order]
+
+    entry_epochs = np.asarray([entry["epoch"] for entry in entries], dtype=np.float64)
+    starts = np.searchsorted(table_epochs, entry_epochs - tolerance, side="left")
+    ends = np.searchsorted(table_epochs, entry_epochs + tolerance, side="right")
+
+    matches = []
+    for entry, entry_epoch, start, end in zip(entries, entry_epochs, starts, ends):
+        if start >= end:
+            continue
+        deltas = table_epochs[start:end] - entry_epoch
+        nearest = int(np.argmin(np.abs(deltas)))
+        matches.append({
+            "entry": entry,
+            "rows": table_rows[start:end].tolist(),
+            "nearest_row": int(table_rows[start + nearest]),
+            "nearest_delta": float(deltas[nearest]),
+        })
+    return matches
+
+
+def format_lnk_entries(entries):
+    """LNK 항목을 텍스트 박스 출력용 줄 리스트로 변환"""
+    lines = []
+    for entry in entries:
+        lines.append(f"파일 이름: {entry['file_name']}")
+        if entry.get("target_path"):
+            lines.append(f"대상 경로: {entry['target_path']}")
+        lines.append(f"생성 시간 (KST): {entry['created_kst'].strftime(TABLE_TIME_FORMAT)}")
+        lines.append("-" * 50)  # 구분선
+    return lines
+
+
+class LecmdIndex:
+    """
+    Recall_load 폴더의 최신 LECmd JSON을 메모리에 정렬된 상태로 보관하는 인덱스.
+    폴더/파일의 수정 시간이 바뀔 때만 다시 읽고, 조회는 이진 탐색으로 처리한다.
+    """
+
+    def __init__(self, json_dir):
+        self.json_dir = json_dir
+        self.json_file_path = None
+        self.entries = []
+        self.epochs = []
+        self.errors = []
+        self._dir_mtime = None
+        self._loaded_key = None  # (파일 경로, 수정 시간)
+        self._pinned = False  # LNK를 직접 파싱해 넣은 경우 JSON 파일을 보지 않음
+
+    def set_entries(self, entries, source, errors=None):
+        """lnk_parser로 직접 파싱한 항목으로 인덱스를 채움 (이후 refresh는 JSON을 다시 읽지 않음)"""
+        self.entries = sorted(entries, key=lambda entry: entry["epoch"])
+        self.epochs = [entry["epoch"] for entry in self.entries]
+        self.errors = errors or []
+        self.json_file_path = source
+        self._pinned = True
+
+    def find_latest_json(self):
+        """폴더 수정 시간이 바뀐 경우에만 JSON 파일 목록을 다시 확인"""
+        dir_mtime = os.stat(self.json_dir).st_mtime
+        if dir_mtime != self._dir_mtime or self.json_file_path is None:
+            json_files = [entry.path for entry in os.scandir(self.json_dir)
+                          if entry.is_file() and entry.name.lower().endswith(".json")]
+            self._dir_mtime = dir_mtime
+            self.json_file_path = max(json_files, key=os.path.getctime) if json_files else None
+        return self.json_file_path
+
+    def refresh(self):
+        """
+        최신 JSON 파일이 바뀌었거나 수정되었으면 다시 로드
+        :return: 사용 중인 JSON 파일 경로 (없으면 None, 직접 파싱한 경우 원본 폴더)
+        """
+        if self._pinned:
+            return self.json_file_path
+
+        if not os.path.isdir(self.json_dir):
+            self.json_file_path = None
+            self.entries, self.epochs, self.errors = [], [], []
+            self._loaded_key = None
+            return None
+
+        json_file_path = self.find_latest_json()
+        if json_file_path is None:
+            self.entries, self.epochs, self.errors = [], [], []
+            self._loaded_key = None
+            return None
+
+        loaded_key = (json_file_path, os.path.getmtime(json_file_path))
+        if loaded_key != self._loaded_key:
+            self.entries, self.errors = load_lecmd_entries(json_file_path)
+            self.epochs = [entry["epoch"] for entry in self.entries]
+            self._loaded_key = loaded_key
+            print(f"[DEBUG] LECmd 인덱스 로드 완료: {json_file_path} ({len(self.entries)}개 항목)")
+        return json_file_path
+
+    def lookup(self, table_time, tolerance=MATCH_TOLERANCE_SECONDS):
+        """table_time(KST) ±tolerance 초 안에 생성된 LNK 항목 리스트"""
+        epoch = table_time_to_epoch(table_time)
+        start = bisect_left(self.epochs, epoch - tolerance)
+        end = bisect_right(self.epochs, epoch + tolerance)
+        return self.entries[start:end]
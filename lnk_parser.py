@@ -0,0 +1,267 @@
+# lnk_parser.py
+
+import os
+import sys
+import uuid
+import struct
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from lecmd_index import KST_OFFSET
+
+FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+LNK_HEADER_SIZE = 0x4C
+LNK_CLSID = uuid.UUID("00021401-0000-0000-c000-000000000046")
+
+# LinkFlags (MS-SHLLINK 2.1.1)
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+
+TRACKER_DATA_BLOCK_SIGNATURE = 0xA0000003
+ANSI_CODEPAGE = "mbcs" if sys.platform == "win32" else "cp949"  # 비유니코드 문자열 (한국어 Windows 기준)
+DRIVE_TYPES = {
+    0: "DRIVE_UNKNOWN", 1: "DRIVE_NO_ROOT_DIR", 2: "DRIVE_REMOVABLE", 3: "DRIVE_FIXED",
+    4: "DRIVE_REMOTE", 5: "DRIVE_CDROM", 6: "DRIVE_RAMDISK",
+}
+
+
+class LnkParseError(Exception):
+    """Shell Link(.lnk) 형식이 올바르지 않을 때 발생"""
+
+
+def filetime_to_datetime(filetime):
+    """FILETIME을 UTC datetime으로 변환 (0이면 None)"""
+    if not filetime:
+        return None
+    try:
+        return FILETIME_EPOCH + timedelta(microseconds=filetime // 10)
+    except OverflowError:
+        return None
+
+
+def format_utc(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ""
+
+
+def read_c_string(data, offset, unicode=False):
+    """NULL로 끝나는 ANSI/UTF-16 문자열 읽기"""
+    if unicode:
+        end = offset
+        while end + 1 < len(data) and data[end:end + 2] != b"\x00\x00":
+            end += 2
+        return data[offset:end].decode("utf-16-le", errors="replace")
+    end = data.find(b"\x00", offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode(ANSI_CODEPAGE, errors="replace")
+
+
+def parse_volume_id(data, offset):
+    """VolumeID 구조 (드라이브 종류, 일련번호, 볼륨 레이블)"""
+    _size, drive_type, serial_number, label_offset = struct.unpack_from("<IIII", data, offset)
+    if label_offset == 0x14:
+        label_offset_unicode = struct.unpack_from("<I", data, offset + 16)[0]
+        label = read_c_string(data, offset + label_offset_unicode, unicode=True)
+    else:
+        label = read_c_string(data, offset + label_offset)
+    return {
+        "DriveType": DRIVE_TYPES.get(drive_type, str(drive_type)),
+        "VolumeSerialNumber": f"{serial_number:08X}",
+        "VolumeLabel": label,
+    }
+
+
+def parse_link_info(data, offset):
+    """LinkInfo 구조에서 로컬/네트워크 경로와 볼륨 정보 추출"""
+    (link_info_size, header_size, flags, volume_id_offset, local_base_path_offset,
+     network_link_offset, common_path_suffix_offset) = struct.unpack_from("<IIIIIII", data, offset)
+
+    info = {}
+    local_base_path = ""
+    if flags & 0x1:
+        info.update(parse_volume_id(data, offset + volume_id_offset))
+        if header_size >= 0x24:
+            local_base_path_offset_unicode = struct.unpack_from("<I", data, offset + 28)[0]
+            local_base_path = read_c_string(data, offset + local_base_path_offset_unicode, unicode=True)
+        else:
+            local_base_path = read_c_string(data, offset + local_base_path_offset)
+
+    if flags & 0x2:
+        net_offset = offset + network_link_offset
+        net_name_offset, device_name_offset = struct.unpack_from("<II", data, net_offset + 8)
+        if net_name_offset > 0x14:
+            net_name_offset_unicode = struct.unpack_from("<I", data, net_offset + 20)[0]
+            info["NetworkShareName"] = read_c_string(data, net_offset + net_name_offset_unicode, unicode=True)
+        else:
+            info["NetworkShareName"] = read_c_string(data, net_offset + net_name_offset)
+        if device_name_offset:
+            info["NetworkDeviceName"] = read_c_string(data, net_offset + device_name_offset)
+
+    if header_size >= 0x24:
+        suffix_offset_unicode = struct.unpack_from("<I", data, offset + 32)[0]
+        common_path_suffix = read_c_string(data, offset + suffix_offset_unicode, unicode=True)
+    else:
+        common_path_suffix = read_c_string(data, offset + common_path_suffix_offset)
+
+    base = local_base_path or info.get("NetworkShareName", "")
+    if base and common_path_suffix:
+        info["TargetPath"] = base.rstrip("\\") + "\\" + common_path_suffix
+    else:
+        info["TargetPath"] = base or common_path_suffix
+    return link_info_size, info
+
+
+def parse_tracker_block(data, offset):
+    """TrackerDataBlock (MachineID, Droid, 생성 시 MAC 주소)"""
+    machine_id = data[offset + 16:offset + 32].split(b"\x00", 1)[0].decode("ascii", errors="replace")
+    volume_droid = uuid.UUID(bytes_le=data[offset + 32:offset + 48])
+    file_droid = uuid.UUID(bytes_le=data[offset + 48:offset + 64])
+    birth_file_droid = uuid.UUID(bytes_le=data[offset + 80:offset + 96])
+    tracker = {
+        "MachineID": machine_id,
+        "VolumeDroid": str(volume_droid),
+        "FileDroid": str(file_droid),
+        "BirthFileDroid": str(birth_file_droid),
+    }
+    if file_droid.version == 1:
+        tracker["MacAddress"] = ":".join(f"{(file_droid.node >> shift) & 0xFF:02x}" for shift in range(40, -8, -8))
+    return tracker
+
+
+def parse_lnk_bytes(data):
+    """Shell Link 내용을 파싱해 dict로 반환 (MS-SHLLINK)"""
+    if len(data) < LNK_HEADER_SIZE or struct.unpack_from("<I", data, 0)[0] != LNK_HEADER_SIZE:
+        raise LnkParseError("Shell Link 헤더가 아닙니다")
+    if uuid.UUID(bytes_le=data[4:20]) != LNK_CLSID:
+        raise LnkParseError("Shell Link CLSID가 일치하지 않습니다")
+
+    link_flags, file_attributes, creation_time, access_time, write_time, file_size = struct.unpack_from(
+        "<IIQQQI", data, 20)
+    record = {
+        "TargetCreated": format_utc(filetime_to_datetime(creation_time)),
+        "TargetAccessed": format_utc(filetime_to_datetime(access_time)),
+        "TargetModified": format_utc(filetime_to_datetime(write_time)),
+        "FileSize": file_size,
+        "FileAttributes": f"0x{file_attributes:08X}",
+    }
+
+    offset = LNK_HEADER_SIZE
+    if link_flags & HAS_LINK_TARGET_ID_LIST:
+        id_list_size = struct.unpack_from("<H", data, offset)[0]
+        offset += 2 + id_list_size
+
+    if link_flags & HAS_LINK_INFO:
+        link_info_size, info = parse_link_info(data, offset)
+        record.update(info)
+        offset += link_info_size
+
+    unicode = bool(link_flags & IS_UNICODE)
+    for flag, key in ((HAS_NAME, "Name"), (HAS_RELATIVE_PATH, "RelativePath"),
+                      (HAS_WORKING_DIR, "WorkingDirectory"), (HAS_ARGUMENTS, "Arguments"),
+                      (HAS_ICON_LOCATION, "IconLocation")):
+        if not link_flags & flag:
+            continue
+        count = struct.unpack_from("<H", data, offset)[0]
+        offset += 2
+        size = count * 2 if unicode else count
+        raw = data[offset:offset + size]
+        record[key] = raw.decode("utf-16-le", errors="replace") if unicode else raw.decode(ANSI_CODEPAGE, errors="replace")
+        offset += size
+
+    # ExtraData 블록 (TrackerDataBlock만 사용)
+    while offset + 8 <= len(data):
+        block_size, signature = struct.unpack_from("<II", data, offset)
+        if block_size < 4:
+            break
+        if signature == TRACKER_DATA_BLOCK_SIGNATURE and block_size >= 0x60:
+            record.update(parse_tracker_block(data, offset))
+        offset += block_size
+
+    if not record.get("TargetPath") and record.get("RelativePath"):
+        record["TargetPath"] = record["RelativePath"]
+    return record
+
+
+def file_created_time(stat):
+    """파일 생성 시간 (epoch 초, 알 수 없으면 None). Windows의 st_ctime만 생성 시간이다."""
+    created = getattr(stat, "st_birthtime", None)
+    if created is None and sys.platform == "win32":
+        created = stat.st_ctime
+    return created
+
+
+def parse_lnk_file(path):
+    """
+    단일 .lnk 파일 파싱 (프로세스 풀 작업 단위).
+    SourceCreated는 LECmd와 같이 .lnk 파일 자체의 생성 시간(UTC)이다.
+    생성 시간을 얻을 수 없는 환경(Python 3.12 미만의 Linux 등, st_ctime이 inode 변경 시간)에서는 None.
+    """
+    record = {"SourceFile": path}
+    try:
+        stat = os.stat(path)
+        created = file_created_time(stat)
+        record["SourceCreated"] = (datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+                                   if created is not None else None)
+        record["SourceModified"] = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
+        with open(path, "rb") as f:
+            record.update(parse_lnk_bytes(f.read()))
+    except (OSError, struct.error, IndexError, ValueError, LnkParseError) as e:
+        record["Error"] = str(e)
+    return record
+
+
+def parse_lnk_directory(lnk_dir, max_workers=None):
+    """
+    폴더의 .lnk 파일을 프로세스 풀에서 일괄 파싱
+    :return: 레코드(dict) 리스트 (실패한 파일은 Error 키 포함)
+    """
+    paths = sorted(entry.path for entry in os.scandir(lnk_dir)
+                   if entry.is_file() and entry.name.lower().endswith(".lnk"))
+    if max_workers == 1 or len(paths) < 32:
+        return [parse_lnk_file(path) for path in paths]
+
+    # Qt 스레드에서 호출될 수 있으므로 fork 대신 spawn 사용
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(parse_lnk_file, paths, chunksize=64))
+
+
+def records_to_entries(records):
+    """
+    파싱 레코드를 lecmd_index 항목 형식으로 변환 (App 탭 매칭에 바로 사용)
+    :return: (생성 시간 순 항목 리스트, 오류 메시지 리스트)
+    """
+    entries = []
+    errors = []
+    for record in records:
+        if record.get("Error"):
+            errors.append(f"[WARNING] LNK 파싱 실패: {os.path.basename(record['SourceFile'])} ({record['Error']})")
+            continue
+        if not record.get("SourceCreated"):
+            errors.append(f"[WARNING] LNK 생성 시간을 알 수 없어 매칭에서 제외: {os.path.basename(record['SourceFile'])}")
+            continue
+        utc_time = datetime.fromisoformat(record["SourceCreated"])
+        entries.append({
+            "file_name": os.path.basename(record["SourceFile"]).replace(".lnk", ""),
+            "source_file": record["SourceFile"],
+            "created_kst": (utc_time + KST_OFFSET).replace(tzinfo=None),
+            "epoch": utc_time.timestamp(),
+            "target_path": record.get("TargetPath", ""),
+            "record": record,
+        })
+    entries.sort(key=lambda entry: entry["epoch"])
+    return entries, errors
+
+
+if __name__ == "__main__":
+    # 사용법: python lnk_parser.py <Recent 폴더>
+    if len(sys.argv) < 2:
+        print("사용법: python lnk_parser.py <Recent 폴더>")
+        sys.exit(1)
+    for item in parse_lnk_directory(sys.argv[1]):
+        print(item)
@@ -0,0 +1,154 @@
+# locked_file.py
+
+import os
+import sys
+import time
+import ctypes
+import hashlib
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # 한 번에 읽을 크기 (4MB)
+
+GENERIC_READ = 0x80000000
+FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004  # READ | WRITE | DELETE
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_FLAG_SEQUENTIAL_SCAN = 0x08000000
+
+
+class LockedFile:
+    """
+    다른 프로세스가 열고 있는 파일(SRUDB.dat, ukg.db 등)을 읽기 위한 파일 객체.
+    Windows에서는 CreateFileW를 공유 모드 + 백업 시맨틱으로 열고 ReadFile로 읽는다.
+    readinto()를 제공하므로 일반 파일 객체와 동일하게 iter_chunks()에 넘길 수 있다.
+    """
+
+    def __init__(self, file_path):
+        from ctypes import wintypes
+
+        self.name = file_path
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._kernel32.CreateFileW.restype = wintypes.HANDLE
+        self._bytes_read = wintypes.DWORD(0)
+        self._handle = self._kernel32.CreateFileW(
+            file_path, GENERIC_READ, FILE_SHARE_ALL, None, OPEN_EXISTING,
+            FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_SEQUENTIAL_SCAN, None
+        )
+        if self._handle == wintypes.HANDLE(-1).value:
+            self._handle = None
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def readinto(self, buffer):
+        """buffer(bytearray)에 직접 읽어 들이고 읽은 바이트 수를 반환 (0이면 EOF)"""
+        view = memoryview(buffer)
+        c_buffer = (ctypes.c_char * len(view)).from_buffer(view)
+        success = self._kernel32.ReadFile(self._handle, c_buffer, len(view), ctypes.byref(self._bytes_read), None)
+        if not success:
+            raise ctypes.WinError(ctypes.get_last_error())
+        return self._bytes_read.value
+
+    def close(self):
+        if self._handle is not None:
+            self._kernel32.CloseHandle(self._handle)
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_locked(file_path):
+    """Windows에서는 LockedFile, 그 외 환경에서는 일반 바이너리 파일 객체를 반환"""
+    if sys.platform == "win32":
+        return LockedFile(file_path)
+    return open(file_path, "rb", buffering=0)
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    파일을 chunk_size 단위로 읽어 memoryview를 차례로 반환한다.
+    하나의 버퍼를 재사용하므로 반환된 chunk는 다음 반복 전에 소비(쓰기/해시/복사)해야 한다.
+    :param source: 파일 경로 또는 readinto()를 지원하는 파일 객체 (Linux 벤치마크용 대체 파일 등)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open_locked(os.fspath(source)) as f:
+            yield from iter_chunks(f, chunk_size)
+        return
+
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        n = source.readinto(buffer)
+        if not n:
+            break
+        yield view[:n]
+
+
+def copy_locked(source, dst, chunk_size=DEFAULT_CHUNK_SIZE, hash_name=None):
+    """
+    source를 dst로 스트리밍 복사한다. 전체 파일을 메모리에 올리지 않는다.
+    :param dst: 대상 경로 또는 write()를 지원하는 파일 객체
+    :param hash_name: 'sha256' 등 hashlib 알고리즘 이름 (None이면 해시 계산 안 함)
+    :return: (복사한 바이트 수, 해시 hex 문자열 또는 None)
+    """
+    if isinstance(dst, (str, os.PathLike)):
+        dst_dir = os.path.dirname(os.fspath(dst))
+        if dst_dir:
+            os.makedirs(dst_dir, exist_ok=True)
+        with open(dst, "wb") as fdst:
+            return copy_locked(source, fdst, chunk_size, hash_name)
+
+    digest = hashlib.new(hash_name) if hash_name else None
+    size = 0
+    for chunk in iter_chunks(source, chunk_size):
+        if digest is not None:
+            digest.update(chunk)
+        dst.write(chunk)
+        size += len(chunk)
+    return size, (digest.hexdigest() if digest is not None else None)
+
+
+def read_locked(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """파일 전체를 bytearray 하나로 읽는다 (작은 파일용)"""
+    data = bytearray()
+    for chunk in iter_chunks(source, chunk_size):
+        data += chunk
+    return data
+
+
+if __name__ == "__main__":
+    # 처리량 측정: python locked_file.py <파일 경로> [chunk MB]
+    if len(sys.argv) < 2:
+        print("사용법: python locked_file.py <파일 경로> [chunk MB]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    chunk_size = int(sys.argv[2]) * 1024 * 1024 if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE
+    file_size = os.path.getsize(path)
+    size_mb = file_size / (1024 * 1024)
+    print(f"[DEBUG] 대상 파일: {path} ({size_mb:.1f} MB), chunk {chunk_size // (1024 * 1024)} MB")
+
+    def report(label, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {elapsed:8.3f}s  {size_mb / elapsed if elapsed else 0:10.1f} MB/s")
+
+    def legacy_concat():
+        # 기존 read_file 방식: bytes 누적 (매 반복마다 전체 복사)
+        data = b""
+        with open(path, "rb", buffering=0) as f:
+            buffer = bytearray(chunk_size)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                data += bytes(buffer[:n])
+        return data
+
+    null_path = os.devnull
+    report("legacy bytes +=", legacy_concat)
+    report("read_locked (bytearray)", lambda: read_locked(path, chunk_size))
+    report("copy_locked", lambda: copy_locked(path, null_path, chunk_size))
+    report("copy_locked + sha256", lambda: copy_locked(path, null_path, chunk_size, "sha256"))
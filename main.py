@@ -4,21 +4,24 @@ import sys
 import os
 import subprocess
 import shutil
-import glob
 import pandas as pd
 import ctypes
+import multiprocessing
 from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QTableView, QVBoxLayout, QWidget, QLabel, \
     QHBoxLayout, QLineEdit, QSplitter, QStatusBar, QStyledItemDelegate, QTabWidget, QTextEdit, QSizePolicy, QMessageBox
 from PySide6.QtGui import QAction, QIcon
-from PySide6.QtCore import Qt, QSortFilterProxyModel
+from PySide6.QtCore import Qt, QSortFilterProxyModel, QTimer
 from database import SQLiteTableModel, load_data_from_db, load_app_data_from_db, load_web_data
 from image_loader import ImageLoaderThread
+from image_store import image_store_for_db
 from web import WebTableWidget as ImportedWebTableWidget
 from app_table import AppTableWidget
 from file_table import FileTableWidget
 from recovery_table import RecoveryTableWidget
 from no_focus_frame_style import NoFocusFrameStyle
 from Internal_Audit import InternalAuditWidget
+from evidence_collector import EvidenceCollector, MANIFEST_FILE_NAME, plan_recent_lnk, plan_prefetch, \
+    plan_browser_history, plan_recall_database
 
 # 문자열 매핑 딕셔너리: 이벤트 이름을 간결한 이름으로 매핑
 name_mapping = {
@@ -55,6 +58,8 @@ class MainWindow(QMainWindow):
         self.srudb_path = ""  # SRUDB.dat 파일 경로
         self.software_path = ""  # SOFTWARE 파일 경로
         self.current_mode = None  # 모드 상태를 저장하는 변수
+        self.evidence_collector = None  # 대상 PC 모드 아티팩트 수집 스레드
+        self.pending_collections = []  # 수집 중에 들어온 수집 요청 (끝나면 차례로 실행)
 
         # 모드 선택 (새로운 로직 추가)
         self.setup_mode()
@@ -84,6 +89,14 @@ class MainWindow(QMainWindow):
         open_srum_action.triggered.connect(self.open_srum_files_dialog)
         file_menu.addAction(open_srum_action)
 
+        # 수집 중에는 수집 중인 파일을 읽지 않도록 불러오기 메뉴 비활성화
+        self.load_actions = [open_file_action, open_history_action, open_prefetch_action, open_srum_action]
+
+        # "실행 중인 작업 취소" 메뉴 항목 추가 (수집, Prefetch 파싱, SrumECmd, 복구 스크립트)
+        cancel_tasks_action = QAction("실행 중인 작업 취소", self)
+        cancel_tasks_action.triggered.connect(self.cancel_running_tasks)
+        file_menu.addAction(cancel_tasks_action)
+
         # 검색창 추가
         top_layout = QWidget(self)
         top_layout.setLayout(QHBoxLayout())
@@ -130,6 +143,7 @@ class MainWindow(QMainWindow):
         try:
             self.app_table_tab = AppTableWidget(mode=self.current_mode)  # 모드 전달
             self.tab_widget.addTab(self.app_table_tab, "AppTable")
+            self.app_table_tab.task_status.connect(self.statusBar().showMessage)
             if self.db_path:
                 self.app_table_tab.set_db_path(self.db_path)  # DB 경로 설정
         except ImportError:
@@ -222,7 +236,7 @@ class MainWindow(QMainWindow):
 
     # main.py - collect_files 메서드 수정
     def collect_files(self):
-        """대상 PC 모드에서 데이터 복사 및 SRUM 파싱"""
+        """대상 PC 모드에서 데이터 복사 및 SRUM 파싱 (백그라운드 병렬 수집)"""
         if self.current_mode != 'target':
             print("분석 모드에서 데이터 복사를 건너뜁니다.")
             return  # 분석 모드에서는 복사 기능 비활성화
@@ -236,124 +250,79 @@ class MainWindow(QMainWindow):
         output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Recover_Output")
         os.makedirs(output_dir, exist_ok=True)
 
-        # Recent 폴더 내 .lnk 파일만 복사
-        try:
-            recent_folder = os.path.join(os.environ['USERPROFILE'], 'AppData\\Roaming\\Microsoft\\Windows\\Recent')
-            recent_destination = os.path.join(recall_load_dir, "Recent_Artifact")
-
-            if os.path.exists(recent_folder):
-                # Recent 폴더 내 .lnk 파일만 복사
-                if not os.path.exists(recent_destination):
-                    os.makedirs(recent_destination)
-
-                lnk_files = [f for f in os.listdir(recent_folder) if f.endswith('.lnk')]
-                for lnk_file in lnk_files:
-                    src_file = os.path.join(recent_folder, lnk_file)
-                    dst_file = os.path.join(recent_destination, lnk_file)
-                    shutil.copy2(src_file, dst_file)
-                    print(f"[DEBUG] .lnk 파일 복사 완료: {lnk_file}")
-            else:
-                print(f"[ERROR] Recent 폴더를 찾을 수 없습니다: {recent_folder}")
-        except Exception as e:
-            print(f"Recent 폴더의 .lnk 파일 복사 중 오류 발생: {e}")
-
-        # 브라우저 히스토리 파일 복사
-        try:
-            if hasattr(self.web_table_tab, 'copy_history_files') and self.web_table_tab:
-                print("copy_history_files 호출 시작...")
-                self.web_table_tab.copy_history_files(destination_folder=recall_load_dir)
-                print("브라우저 히스토리 파일 복사 완료")
-            else:
-                print("WebTableWidget이 초기화되지 않았거나 copy_history_files 함수가 존재하지 않습니다.")
-        except Exception as e:
-            print(f"브라우저 히스토리 파일 복사 중 오류 발생: {e}")
-
-        # Prefetch 파일 복사 추가
-        try:
-            prefetch_src = r"C:\Windows\Prefetch"
-            prefetch_dst = os.path.join(recall_load_dir, "Prefetch_Data")
-
-            if not os.path.exists(prefetch_dst):
-                os.makedirs(prefetch_dst)
-
-            # Prefetch 파일 복사
-            copied_count = 0
-            for file in os.listdir(prefetch_src):
-                if file.endswith('.pf'):
-                    src_file = os.path.join(prefetch_src, file)
-                    dst_file = os.path.join(prefetch_dst, file)
-                    try:
-                        shutil.copy2(src_file, dst_file)
-                        copied_count += 1
-                    except Exception as e:
-                        print(f"Prefetch 파일 복사 중 오류 발생: {e}")
-        except Exception as e:
-            print(f"Prefetch 파일 처리 중 오류 발생: {e}")
-
-        # SRUM 및 SOFTWARE 파일 복사
-        try:
-            if hasattr(self.app_table_tab, 'copy_srum_files_and_backup'):
-                self.app_table_tab.copy_srum_files_and_backup(destination_folder=recall_load_dir)
-                print("SRUDB.dat 및 SOFTWARE 파일 복사 완료")
-            else:
-                print("AppTableWidget이 초기화되지 않았거나 copy_srum_files_and_backup 함수가 없습니다.")
-        except Exception as e:
-            print(f"SRUM 및 SOFTWARE 파일 복사 중 오류 발생: {e}")
+        # 복사할 아티팩트를 미리 모두 계획
+        tasks = []
+        tasks.extend(plan_recent_lnk(recall_load_dir))
+        if self.web_table_tab and hasattr(self.web_table_tab, 'get_history_source_paths'):
+            tasks.extend(plan_browser_history(recall_load_dir, self.web_table_tab.get_history_source_paths()))
+        else:
+            print("WebTableWidget이 초기화되지 않았거나 get_history_source_paths 함수가 존재하지 않습니다.")
+        tasks.extend(plan_prefetch(recall_load_dir))
+        recall_tasks, clean_dirs = plan_recall_database(recall_load_dir, output_dir)
+        tasks.extend(recall_tasks)
+
+        # SRUM 및 SOFTWARE 파일 복사는 수집 스레드에서 복사 후 실행
+        extra_steps = []
+        if hasattr(self.app_table_tab, 'copy_srum_files_and_backup'):
+            extra_steps.append((
+                "SRUDB.dat 및 SOFTWARE 파일 복사",
+                lambda: self.app_table_tab.copy_srum_files_and_backup(destination_folder=recall_load_dir)
+            ))
+        else:
+            print("AppTableWidget이 초기화되지 않았거나 copy_srum_files_and_backup 함수가 없습니다.")
 
-        # ukg.db 파일 복사 및 ImageStore 복사 추가
-        try:
-            user_path = os.path.expanduser("~")
-            ukp_folder_path = os.path.join(user_path, r"AppData\Local\CoreAIPlatform.00\UKP")
-            guid_folders = glob.glob(os.path.join(ukp_folder_path, "{*}"))
-
-            ukg_db_source = None
-            for folder in guid_folders:
-                potential_path = os.path.join(folder, "ukg.db")
-                if os.path.exists(potential_path):
-                    ukg_db_source = potential_path
-                    break
-
-            if ukg_db_source:
-                ukg_db_destination = os.path.join(recall_load_dir, "ukg.db")
-                shutil.copyfile(ukg_db_source, ukg_db_destination)
-                print(f"ukg.db 파일 복사 완료: {ukg_db_destination}")
-            else:
-                print("ukg.db 파일을 찾을 수 없습니다.")
-
-            # ImageStore 폴더 복사
-            for folder in guid_folders:
-                image_store_path = os.path.join(folder, "ImageStore")
-                if os.path.exists(image_store_path):
-                    image_store_destination = os.path.join(recall_load_dir, "ImageStore")
-                    if os.path.exists(image_store_destination):
-                        print(f"ImageStore 폴더 이미 존재, 기존 폴더 삭제")
-                        shutil.rmtree(image_store_destination)  # 기존 폴더 삭제
-                    shutil.copytree(image_store_path, image_store_destination)
-                    print(f"ImageStore 폴더 복사 완료: {image_store_destination}")
-                    break
-            else:
-                print("ImageStore 폴더를 찾을 수 없습니다.")
+        self.start_evidence_collection(tasks, recall_load_dir, clean_dirs, extra_steps)
 
-        except Exception as e:
-            print(f"ukg.db 또는 ImageStore 복사 중 오류 발생: {e}")
+    def start_evidence_collection(self, tasks, recall_load_dir, clean_dirs=None, extra_steps=None, on_finished=None):
+        """수집 스레드를 시작하고 진행 상황을 상태 표시줄에 표시"""
+        if self.evidence_collector and self.evidence_collector.isRunning():
+            # 실행 중인 수집 스레드는 교체하지 않고, 끝난 뒤 이어서 실행
+            self.pending_collections.append((tasks, recall_load_dir, clean_dirs, extra_steps, on_finished))
+            print(f"[DEBUG] 아티팩트 수집이 진행 중이므로 요청을 대기열에 추가합니다. (대기 {len(self.pending_collections)}개)")
+            self.statusBar().showMessage("아티팩트 수집이 끝나면 이어서 수집합니다.")
+            return
 
-        # ukg.db-wal 파일 복사 및 이름 변경
-        try:
-            ukg_wal_source = None
-            for folder in guid_folders:
-                potential_wal_path = os.path.join(folder, "ukg.db-wal")
-                if os.path.exists(potential_wal_path):
-                    ukg_wal_source = potential_wal_path
-                    break
-
-            if ukg_wal_source:
-                wal_destination = os.path.join(output_dir, "remained.db-wal")
-                shutil.copyfile(ukg_wal_source, wal_destination)
-                print(f"ukg.db-wal 파일을 {wal_destination}로 복사 및 이름 변경 완료")
-            else:
-                print("ukg.db-wal 파일을 찾을 수 없습니다.")
-        except Exception as e:
-            print(f"ukg.db-wal 파일 복사 중 오류 발생: {e}")
+        manifest_path = os.path.join(recall_load_dir, MANIFEST_FILE_NAME)
+        self.evidence_collector = EvidenceCollector(tasks, manifest_path, clean_dirs, extra_steps)
+        self.evidence_collector.progress.connect(self.on_collection_progress)
+        self.evidence_collector.collection_finished.connect(self.on_collection_finished)
+        if on_finished:
+            self.evidence_collector.collection_finished.connect(on_finished)
+        self.evidence_collector.finished.connect(self.on_collector_thread_finished)
+        self.set_load_actions_enabled(False)
+        self.evidence_collector.start()
+
+    def on_collector_thread_finished(self):
+        """수집 스레드 종료 후 대기 중인 수집을 시작하거나 불러오기 메뉴를 다시 활성화"""
+        if self.pending_collections:
+            # 종료 신호를 보내는 중인 스레드 객체를 바로 교체하지 않도록 이벤트 루프로 넘김
+            QTimer.singleShot(0, lambda: self.start_evidence_collection(*self.pending_collections.pop(0)))
+        else:
+            self.set_load_actions_enabled(True)
+
+    def set_load_actions_enabled(self, enabled):
+        for action in self.load_actions:
+            action.setEnabled(enabled)
+
+    def cancel_running_tasks(self):
+        """백그라운드에서 실행 중인 수집/분석/복구 작업 중단"""
+        self.pending_collections.clear()
+        if self.evidence_collector and self.evidence_collector.isRunning():
+            self.evidence_collector.cancel()
+        if hasattr(self.app_table_tab, 'cancel_background_tasks'):
+            self.app_table_tab.cancel_background_tasks()
+        if hasattr(self.recovery_table_tab, 'cancel_recovery'):
+            self.recovery_table_tab.cancel_recovery()
+        self.statusBar().showMessage("실행 중인 작업 취소를 요청했습니다.")
+
+    def on_collection_progress(self, done, total, path):
+        """수집 진행 상황 표시"""
+        self.statusBar().showMessage(f"아티팩트 수집 중... {done}/{total} ({os.path.basename(path)})")
+
+    def on_collection_finished(self, manifest_path):
+        """수집 완료 처리"""
+        print(f"아티팩트 수집 완료. 매니페스트: {manifest_path}")
+        self.statusBar().showMessage(f"아티팩트 수집 완료: {manifest_path}")
 
     def open_srum_files_dialog(self):
         """SRUM 파일과 SOFTWARE 파일을 선택하도록 하는 다이얼로그"""
@@ -609,8 +578,7 @@ class MainWindow(QMainWindow):
             # 다른 탭에 db_path 전달
             if hasattr(self.app_table_tab, 'set_db_path'):
                 self.app_table_tab.set_db_path(self.db_path)
-            if hasattr(self.image_table_tab, 'set_db_path'):
-                self.image_table_tab.set_db_path(self.db_path)
+            # 이미지 탭은 load_data에서 이미 설정됨
             if hasattr(self.web_table_tab, 'set_db_path'):
                 self.web_table_tab.set_db_path(self.db_path)
             if hasattr(self.file_table_tab, 'set_db_path'):
@@ -679,16 +647,16 @@ class MainWindow(QMainWindow):
             if self.current_mode == 'analysis':
                 self.open_additional_files_dialog()
 
-            # LECmd 실행 로직 추가
+            # Recent 폴더 LNK 파싱
             if self.current_mode == 'target':
-                # 대상 PC 모드에서 자동으로 LECmd 실행
+                # 대상 PC 모드에서 자동으로 LNK 파싱
                 recent_folder = os.path.join(desktop_path, "Recall_load", "Recent_Artifact")
                 if os.path.exists(recent_folder):
                     print(f"[DEBUG] 대상 PC 모드에서 Recent_Artifact 처리: {recent_folder}")
-                    if hasattr(self.app_table_tab, 'run_lecmd_with_path'):
-                        self.app_table_tab.run_lecmd_with_path(recent_folder)
+                    if hasattr(self.app_table_tab, 'parse_recent_folder'):
+                        self.app_table_tab.parse_recent_folder(recent_folder)
                     else:
-                        print("[ERROR] AppTableWidget에 run_lecmd_with_path 메서드가 없습니다.")
+                        print("[ERROR] AppTableWidget에 parse_recent_folder 메서드가 없습니다.")
                 else:
                     print("[ERROR] 대상 PC 모드에서 Recent_Artifact 폴더를 찾을 수 없습니다.")
 
@@ -697,10 +665,10 @@ class MainWindow(QMainWindow):
                 recent_folder = QFileDialog.getExistingDirectory(self, "Recent 폴더 선택", desktop_path)
                 if recent_folder:
                     print(f"[DEBUG] 분석 PC 모드에서 선택된 Recent 폴더: {recent_folder}")
-                    if hasattr(self.app_table_tab, 'run_lecmd_with_path'):
-                        self.app_table_tab.run_lecmd_with_path(recent_folder)
+                    if hasattr(self.app_table_tab, 'parse_recent_folder'):
+                        self.app_table_tab.parse_recent_folder(recent_folder)
                     else:
-                        print("[ERROR] AppTableWidget에 run_lecmd_with_path 메서드가 없습니다.")
+                        print("[ERROR] AppTableWidget에 parse_recent_folder 메서드가 없습니다.")
                 else:
                     print("[DEBUG] 분석 PC 모드에서 Recent 폴더가 선택되지 않았습니다.")
 
@@ -930,9 +898,8 @@ class MainWindow(QMainWindow):
             image_token_index = self.proxy_model.index(row, 2)
             image_token = image_token_index.data()
             if image_token:
-                image_dir = os.path.join(os.path.dirname(self.db_path), "ImageStore")
-                image_path = os.path.join(image_dir, image_token)
-                if not os.path.exists(image_path):
+                image_path = image_store_for_db(self.db_path).resolve(image_token)
+                if image_path is None:
                     self.image_label.setText(f"이미지 파일을 찾을 수 없습니다: {image_token}")
                     return
 
@@ -965,25 +932,16 @@ class MainWindow(QMainWindow):
         """Prefetch 디렉토리 선택 다이얼로그"""
         if self.current_mode == 'target':
             # 대상 PC 모드에서는 자동으로 Prefetch 디렉토리 설정
-            prefetch_src = r"C:\Windows\Prefetch"
             desktop_path = os.path.expanduser("~\\Desktop")
-            prefetch_dst = os.path.join(desktop_path, "Recall_load", "Prefetch_Data")
-
-            if not os.path.exists(prefetch_dst):
-                os.makedirs(prefetch_dst)
+            recall_load_dir = os.path.join(desktop_path, "Recall_load")
+            prefetch_dst = os.path.join(recall_load_dir, "Prefetch_Data")
 
             try:
-                # Prefetch 파일 복사
-                for file in os.listdir(prefetch_src):
-                    if file.endswith('.pf'):
-                        src_file = os.path.join(prefetch_src, file)
-                        dst_file = os.path.join(prefetch_dst, file)
-                        try:
-                            shutil.copy2(src_file, dst_file)
-                        except Exception as e:
-                            print(f"Prefetch 파일 복사 중 오류 발생: {e}")
-
-                self.analyze_prefetch_data(prefetch_dst)
+                # Prefetch 파일을 백그라운드에서 복사한 뒤 분석
+                self.start_evidence_collection(
+                    plan_prefetch(recall_load_dir), recall_load_dir,
+                    on_finished=lambda _: self.analyze_prefetch_data(prefetch_dst)
+                )
 
             except Exception as e:
                 print(f"Prefetch 파일 처리 중 오류 발생: {e}")
@@ -1012,6 +970,7 @@ class MainWindow(QMainWindow):
             print("[DEBUG] load_prefetch_data 메서드가 존재하지 않습니다.")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Prefetch 파서 프로세스 풀 (패키징된 실행 파일 대응)
     try:
         app = QApplication(sys.argv)
         app.setWindowIcon(QIcon("WinRecallAnalyzer_logo.ico"))
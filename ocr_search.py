@@ -0,0 +1,229 @@
+# ocr_search.py
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from PySide6.QtCore import QThread, Signal
+from analysis_cache import AnalysisCache
+
+OCR_INDEX_DIR_NAME = "ocr_index"
+OCR_ALIAS = "ocr"
+TRIGRAM_MIN_LENGTH = 3  # trigram 토크나이저는 3글자 이상 검색어만 색인으로 찾음
+TRIGRAM_AVAILABLE = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+_indexes = {}  # ukg.db 경로 -> OcrIndex
+_indexes_lock = threading.Lock()
+
+
+def like_pattern(term):
+    """검색어를 부분 문자열 LIKE 패턴으로 변환 (%, _, \\를 이스케이프하여 글자 그대로 검색, ESCAPE '\\'와 함께 사용)"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def fts_phrase(term):
+    """검색어를 FTS5 구문(phrase) 문자열로 변환 (연산자/특수문자를 그대로 검색)"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+class OcrIndex:
+    """
+    ukg.db OCR 텍스트(WindowCaptureTextIndex_content.c2)의 trigram FTS5 사본.
+    증거 DB는 수정하지 않고 Recall_load/ocr_index/<SHA-256 앞 16자리>.db에 따로 만들며,
+    검색 시 ATTACH하여 MATCH(부분 문자열, 한국어 포함)와 bm25 순위에 사용한다.
+    색인이 준비되기 전이나 SQLite가 trigram을 지원하지 않으면 LIKE 조건으로 대신 검색한다.
+    """
+
+    def __init__(self, db_path, cache=None):
+        self.db_path = db_path
+        self.cache = cache
+        self.index_path = None  # 준비가 끝나면 설정됨
+        self.builder = None  # OcrIndexBuilder 스레드
+
+    def is_ready(self):
+        return self.index_path is not None
+
+    def build(self):
+        """색인 파일을 찾거나 새로 만든다 (수 초~수십 초 걸릴 수 있으므로 스레드에서 호출)"""
+        cache = self.cache or AnalysisCache()
+        key = cache.file_hash(self.db_path)
+        index_dir = os.path.join(os.path.dirname(cache.cache_path), OCR_INDEX_DIR_NAME)
+        os.makedirs(index_dir, exist_ok=True)
+        index_path = os.path.join(index_dir, f"{key[:16]}.db")
+
+        if not os.path.exists(index_path):
+            start = time.perf_counter()
+            temp_path = index_path + ".tmp"
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            conn = sqlite3.connect(temp_path)
+            try:
+                conn.execute("ATTACH DATABASE ? AS src", (self.db_path,))
+                conn.execute("CREATE VIRTUAL TABLE OcrText USING fts5(Text, tokenize='trigram')")
+                # 캡처 하나에 OCR 행이 여러 개면 줄바꿈으로 합쳐 rowid(WindowCaptureId)를 하나로 유지
+                conn.execute("""
+                    INSERT INTO OcrText (rowid, Text)
+                    SELECT CAST(c0 AS INTEGER), group_concat(c2, char(10))
+                    FROM src.WindowCaptureTextIndex_content
+                    WHERE c0 IS NOT NULL AND c2 IS NOT NULL
+                    GROUP BY CAST(c0 AS INTEGER)
+                """)
+                conn.execute("INSERT INTO OcrText (OcrText) VALUES ('optimize')")
+                conn.commit()
+                row_count = conn.execute("SELECT COUNT(*) FROM OcrText").fetchone()[0]
+            finally:
+                conn.close()
+            os.replace(temp_path, index_path)
+            print(f"[DEBUG] OCR trigram 색인 생성 완료: {row_count}개 캡처 ({time.perf_counter() - start:.1f}초)")
+
+        self.index_path = index_path
+        return index_path
+
+    def attach(self, conn):
+        """검색 연결에 색인을 ocr 스키마로 연결 (준비되지 않았으면 False)"""
+        if not self.is_ready():
+            return False
+        conn.execute(f"ATTACH DATABASE ? AS {OCR_ALIAS}", (self.index_path,))
+        return True
+
+
+class OcrIndexBuilder(QThread):
+    """OCR trigram 색인을 백그라운드에서 준비하는 스레드"""
+    index_ready = Signal(str)   # 색인 파일 경로
+    index_failed = Signal(str)  # 오류 메시지
+
+    def __init__(self, ocr_index):
+        super().__init__()
+        self.ocr_index = ocr_index
+
+    def run(self):
+        try:
+            self.index_ready.emit(self.ocr_index.build())
+        except (OSError, sqlite3.Error) as e:
+            print(f"[ERROR] OCR 색인 생성 실패 (LIKE 검색 사용): {e}")
+            self.index_failed.emit(str(e))
+
+
+def get_ocr_index(db_path):
+    """
+    ukg.db의 OcrIndex를 반환하고, 준비되지 않았다면 백그라운드 생성을 시작한다.
+    여러 탭(ImageTable, Internal Audit)이 같은 색인을 공유한다.
+    """
+    with _indexes_lock:
+        ocr_index = _indexes.get(db_path)
+        if ocr_index is None:
+            ocr_index = OcrIndex(db_path)
+            _indexes[db_path] = ocr_index
+    if TRIGRAM_AVAILABLE and not ocr_index.is_ready() and ocr_index.builder is None:
+        ocr_index.builder = OcrIndexBuilder(ocr_index)
+        ocr_index.builder.start()
+    return ocr_index
+
+
+def ocr_match_query(terms):
+    """3글자 이상 검색어를 하나의 FTS5 OR 쿼리로 묶음 (없으면 None)"""
+    phrases = list(dict.fromkeys(fts_phrase(term) for term in terms if len(term) >= TRIGRAM_MIN_LENGTH))
+    if not phrases:
+        return None
+    return "Text : (" + " OR ".join(phrases) + ")"
+
+
+def ocr_any_condition(terms, use_index, capture_id_column="wc.Id"):
+    """
+    OCR 텍스트에 terms 중 하나라도 글자 그대로 포함된 캡처 조건 (c2 LIKE '%term%' OR ...와 같은 의미).
+    3글자 이상 검색어는 MATCH 하나로, 나머지는 LIKE 서브쿼리 하나로 묶는다.
+    :param use_index: ocr 스키마가 ATTACH되어 있으면 True
+    :return: (SQL 조건, 파라미터 리스트)
+    """
+    if not use_index:
+        likes = " OR ".join("c2 LIKE ? ESCAPE '\\'" for _ in terms)
+        return (f"{capture_id_column} IN (SELECT CAST(c0 AS INTEGER) FROM WindowCaptureTextIndex_content "
+                f"WHERE {likes})", [like_pattern(term) for term in terms])
+
+    conditions = []
+    params = []
+    match_query = ocr_match_query(terms)
+    if match_query:
+        conditions.append(f"{capture_id_column} IN (SELECT rowid FROM {OCR_ALIAS}.OcrText WHERE OcrText MATCH ?)")
+        params.append(match_query)
+    # 3글자 미만(예: 두 글자 한국어 단어)은 trigram으로 찾을 수 없어 FTS 내용을 LIKE로 훑음.
+    # '+Text'로 색인 사용을 막음 (SQLite 3.40은 바이트 길이로 판단해 "%기밀%" 같은 검색이 0건이 됨)
+    short_terms = [term for term in terms if len(term) < TRIGRAM_MIN_LENGTH]
+    if short_terms:
+        likes = " OR ".join("+Text LIKE ? ESCAPE '\\'" for _ in short_terms)
+        conditions.append(f"{capture_id_column} IN (SELECT rowid FROM {OCR_ALIAS}.OcrText WHERE {likes})")
+        params.extend(like_pattern(term) for term in short_terms)
+    return " OR ".join(conditions), params
+
+
+def ocr_condition(term, use_index, capture_id_column="wc.Id"):
+    """OCR 텍스트에 term이 포함된 캡처 조건 (LIKE '%term%'과 같은 의미)"""
+    return ocr_any_condition([term], use_index, capture_id_column)
+
+
+def ocr_missing_condition(use_index, capture_id_column="wc.Id"):
+    """OCR 텍스트가 없는 캡처 조건 (%OCR%==n/a)"""
+    if not use_index:
+        return (f"{capture_id_column} NOT IN (SELECT CAST(c0 AS INTEGER) FROM WindowCaptureTextIndex_content "
+                f"WHERE c0 IS NOT NULL AND c2 IS NOT NULL)", [])
+    return f"{capture_id_column} NOT IN (SELECT rowid FROM {OCR_ALIAS}.OcrText)", []
+
+
+def prepare_ocr_rank(conn, terms, use_index, capture_id_column="wc.Id"):
+    """
+    검색어 중 하나라도 포함한 캡처의 bm25 순위를 임시 테이블 OcrRank(CaptureId 기본 키)에 채우고
+    검색 쿼리에 붙일 LEFT JOIN 절을 반환 (값이 작을수록 관련도 높음).
+    ORDER BY ocr_rank.Rank IS NULL, ocr_rank.Rank 로 정렬한다.
+    (FTS 서브쿼리를 직접 LEFT JOIN하면 자동 인덱스가 생기지 않아 캡처마다 전체를 훑음)
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS OcrRank (CaptureId INTEGER PRIMARY KEY, Rank REAL)")
+    conn.execute("DELETE FROM temp.OcrRank")
+    match_query = ocr_match_query(terms)
+    if use_index and match_query:
+        conn.execute(f"""
+            INSERT INTO temp.OcrRank (CaptureId, Rank)
+            SELECT rowid, bm25(OcrText) FROM {OCR_ALIAS}.OcrText WHERE OcrText MATCH ?
+        """, (match_query,))
+    return f"LEFT JOIN temp.OcrRank ocr_rank ON ocr_rank.CaptureId = {capture_id_column}"
+
+
+def open_search_connection(db_path):
+    """
+    ukg.db 검색 연결을 열고 OCR 색인이 준비되어 있으면 ATTACH
+    :return: (연결, 색인 사용 여부)
+    """
+    conn = sqlite3.connect(db_path)
+    use_index = False
+    try:
+        use_index = get_ocr_index(db_path).attach(conn)
+    except sqlite3.Error as e:
+        print(f"[ERROR] OCR 색인 연결 실패 (LIKE 검색 사용): {e}")
+    return conn, use_index
+
+
+if __name__ == "__main__":
+    # 벤치마크: python ocr_search.py <ukg.db> <검색어> [검색어 ...]
+    if len(sys.argv) < 3:
+        print("사용법: python ocr_search.py <ukg.db> <검색어> [검색어 ...]")
+        sys.exit(1)
+
+    db = os.path.abspath(sys.argv[1])
+    search_terms = sys.argv[2:]
+    ocr_index = OcrIndex(db)
+    start = time.perf_counter()
+    ocr_index.build()
+    print(f"색인 준비                 {time.perf_counter() - start:8.3f}s  {ocr_index.index_path}")
+
+    for use_fts in (False, True):
+        conn = sqlite3.connect(db)
+        if use_fts:
+            ocr_index.attach(conn)
+        for search_term in search_terms:
+            condition, params = ocr_condition(search_term, use_fts)
+            start = time.perf_counter()
+            hits = conn.execute(f"SELECT COUNT(*) FROM WindowCapture wc WHERE {condition}", params).fetchone()[0]
+            label = "FTS5 trigram" if use_fts else "LIKE '%term%'"
+            print(f"{label:<14} {search_term:<12} {time.perf_counter() - start:8.4f}s  {hits}개")
+        conn.close()
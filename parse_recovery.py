@@ -1,32 +1,42 @@
 # parse_recovery.py
 
-import subprocess
 import sys
 import os
 import re
 import sqlite3
 import sqlparse
 import shutil
-
-def run_shell_command(command):
-    try:
-        # 표준 출력과 오류를 모두 캡처
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print(f"명령어 출력: {result.stdout}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"명령어 실행 중 오류 발생: {e}")
-        print(f"오류 출력: {e.stderr}")
+from tool_runner import run_tool, STATUS_OK, STATUS_TIMEOUT, STATUS_CANCELLED
+
+RECOVER_TIMEOUT = 1800  # .recover 제한 시간 (초)
+
+def run_recover(source_db, dump_sql, timeout=RECOVER_TIMEOUT):
+    """
+    sqlite3 CLI의 .recover 결과를 덤프 파일로 저장 (셸 파이프 없이 실행).
+    stderr는 줄 단위로 출력하고, 제한 시간을 넘기면 sqlite3를 종료한다.
+    손상된 DB에서는 sqlite3가 0이 아닌 종료 코드를 내면서도 쓸 수 있는 덤프를 남기는 경우가 많으므로,
+    제한 시간 초과/취소 또는 덤프가 비어 있을 때만 실패로 본다.
+    """
+    returncode, status = run_tool(
+        [sqlite_executable, source_db],
+        on_line=lambda stream, line: print(f"[sqlite3] {line}"),
+        timeout=timeout,
+        stdin_text=".recover\n",
+        stdout_path=dump_sql,
+        encoding="utf-8",
+    )
+    if status == STATUS_TIMEOUT:
+        print(f".recover 명령어가 제한 시간({timeout}초)을 초과했습니다.")
         return False
-    except Exception as e:
-        print(f"예외 발생: {e}")
+    if status == STATUS_CANCELLED:
+        print(".recover 명령어 실행이 취소되었습니다.")
         return False
+    if not os.path.exists(dump_sql) or os.path.getsize(dump_sql) == 0:
+        print(f".recover 덤프가 비어 있습니다. (종료 코드 {returncode})")
+        return False
+    if status != STATUS_OK:
+        print(f"[WARNING] .recover 명령어가 종료 코드 {returncode}로 끝났지만 덤프를 계속 처리합니다.")
+    return True
 
 def filter_backup_sql(dump_sql, filtered_dump_sql):
     system_tables = [
@@ -182,11 +192,8 @@ def main(source_db, recovered_db):
 
         try:
             print("데이터베이스 덤프를 생성 중입니다...")
-            if os.name == 'nt':
-                command = f'echo .recover | "{sqlite_executable}" "{source_db}" > "{dump_sql}"'
-            else:
-                command = f'echo ".recover" | "{sqlite_executable}" "{source_db}" > "{dump_sql}"'
-            run_shell_command(command)
+            if not run_recover(source_db, dump_sql):
+                sys.exit(1)
             print(f"데이터베이스 덤프가 성공적으로 '{dump_sql}'에 저장되었습니다.")
         except Exception as e:
             print(f".recover 명령어 실행 중 오류 발생: {e}")
@@ -0,0 +1,350 @@
+# prefetch_parser.py
+
+import os
+import sys
+import struct
+import ctypes
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+KST = timezone(timedelta(hours=9))
+FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+SCCA_SIGNATURE = b"SCCA"
+MAM_SIGNATURE = b"MAM"
+COMPRESSION_FORMAT_XPRESS_HUFF = 4
+SUPPORTED_VERSIONS = (17, 23, 26, 30)
+
+HUFFMAN_TABLE_SIZE = 256  # 512개 심볼 x 4비트 길이
+HUFFMAN_MAX_BITS = 15
+HUFFMAN_CHUNK_SIZE = 65536
+
+PREFETCH_COLUMNS = [
+    "SourceFilename", "ExecutableName", "Hash", "Version", "Size", "RunCount",
+    "LastRun", "PreviousRuns", "Volumes", "Directories", "FilesLoaded", "Error"
+]
+
+
+class PrefetchParseError(Exception):
+    """Prefetch 파일 형식이 올바르지 않을 때 발생"""
+
+
+# ----------------------------------------------------------------------
+# MAM (Xpress Huffman) 압축 해제 - Windows 10 이상
+# ----------------------------------------------------------------------
+def build_huffman_table(table_bytes):
+    """
+    256바이트 심볼 길이 표로 15비트 디코딩 테이블(심볼, 길이)을 만든다. (MS-XCA 2.2.4)
+    """
+    lengths = []
+    for value in table_bytes:
+        lengths.append(value & 0x0F)
+        lengths.append(value >> 4)
+
+    symbols = [0] * (1 << HUFFMAN_MAX_BITS)
+    bit_lengths = [0] * (1 << HUFFMAN_MAX_BITS)
+    position = 0
+    for bit_length in range(1, HUFFMAN_MAX_BITS + 1):
+        entry_count = 1 << (HUFFMAN_MAX_BITS - bit_length)
+        for symbol, length in enumerate(lengths):
+            if length != bit_length:
+                continue
+            end = position + entry_count
+            if end > len(symbols):
+                raise PrefetchParseError("잘못된 Huffman 테이블")
+            symbols[position:end] = [symbol] * entry_count
+            bit_lengths[position:end] = [bit_length] * entry_count
+            position = end
+    return symbols, bit_lengths
+
+
+def xpress_huffman_decompress(data, output_size):
+    """
+    LZ77 + Huffman(Xpress Huffman) 압축 해제 순수 파이썬 구현 (MS-XCA 2.2.4).
+    64KB 출력 블록마다 새 Huffman 테이블이 앞에 온다.
+    """
+    output = bytearray()
+    position = 0
+    data_length = len(data)
+
+    def read16(offset):
+        if offset + 2 > data_length:
+            return 0
+        return data[offset] | (data[offset + 1] << 8)
+
+    while len(output) < output_size:
+        if position + HUFFMAN_TABLE_SIZE > data_length:
+            raise PrefetchParseError("압축 데이터가 예상보다 짧습니다")
+        symbols, bit_lengths = build_huffman_table(data[position:position + HUFFMAN_TABLE_SIZE])
+        position += HUFFMAN_TABLE_SIZE
+
+        next_bits = (read16(position) << 16) | read16(position + 2)
+        position += 4
+        extra_bit_count = 16
+        block_end = min(len(output) + HUFFMAN_CHUNK_SIZE, output_size)
+
+        while len(output) < block_end:
+            index = next_bits >> (32 - HUFFMAN_MAX_BITS)
+            symbol = symbols[index]
+            bit_length = bit_lengths[index]
+            if bit_length == 0:
+                raise PrefetchParseError("잘못된 Huffman 코드")
+
+            next_bits = (next_bits << bit_length) & 0xFFFFFFFF
+            extra_bit_count -= bit_length
+            if extra_bit_count < 0:
+                next_bits |= read16(position) << (-extra_bit_count)
+                extra_bit_count += 16
+                position += 2
+
+            if symbol < 256:
+                output.append(symbol)
+                continue
+
+            symbol -= 256
+            match_length = symbol & 0x0F
+            offset_bit_length = symbol >> 4
+            if match_length == 15:
+                match_length = data[position]
+                position += 1
+                if match_length == 255:
+                    match_length = read16(position)
+                    position += 2
+                    if match_length == 0:
+                        match_length = struct.unpack_from("<I", data, position)[0]
+                        position += 4
+                    if match_length < 15:
+                        raise PrefetchParseError("잘못된 매치 길이")
+                    match_length -= 15
+                match_length += 15
+            match_length += 3
+
+            match_offset = (next_bits >> (32 - offset_bit_length)) if offset_bit_length else 0
+            match_offset += 1 << offset_bit_length
+            next_bits = (next_bits << offset_bit_length) & 0xFFFFFFFF
+            extra_bit_count -= offset_bit_length
+            if extra_bit_count < 0:
+                next_bits |= read16(position) << (-extra_bit_count)
+                extra_bit_count += 16
+                position += 2
+
+            if match_offset > len(output):
+                raise PrefetchParseError("매치 거리가 출력 범위를 벗어났습니다")
+            start = len(output) - match_offset
+            if match_offset >= match_length:
+                output += output[start:start + match_length]
+            else:
+                # 겹치는 매치: 패턴을 반복해서 채움
+                pattern = output[start:]
+                repeat = match_length // match_offset + 1
+                output += (pattern * repeat)[:match_length]
+
+    return bytes(output[:output_size])
+
+
+def native_decompress(data, output_size):
+    """Windows에서는 ntdll.RtlDecompressBufferEx로 압축 해제 (실패하면 None)"""
+    if sys.platform != "win32":
+        return None
+    try:
+        ntdll = ctypes.WinDLL("ntdll")
+        workspace_size = ctypes.c_ulong(0)
+        fragment_size = ctypes.c_ulong(0)
+        if ntdll.RtlGetCompressionWorkSpaceSize(ctypes.c_ushort(COMPRESSION_FORMAT_XPRESS_HUFF),
+                                                 ctypes.byref(workspace_size), ctypes.byref(fragment_size)):
+            return None
+        workspace = ctypes.create_string_buffer(workspace_size.value)
+        output = ctypes.create_string_buffer(output_size)
+        final_size = ctypes.c_ulong(0)
+        status = ntdll.RtlDecompressBufferEx(
+            ctypes.c_ushort(COMPRESSION_FORMAT_XPRESS_HUFF), output, output_size,
+            ctypes.c_char_p(data), len(data), ctypes.byref(final_size), workspace
+        )
+        if status:
+            return None
+        return output.raw[:final_size.value]
+    except (OSError, AttributeError):
+        return None
+
+
+def decompress_mam(data):
+    """
+    'MAM' 압축 Prefetch를 해제한다.
+    헤더: 시그니처(3) + 플래그(1, 하위 4비트 압축 형식 / 0x80이면 CRC32 포함) + 원본 크기(4)
+    """
+    flags = data[3]
+    output_size = struct.unpack_from("<I", data, 4)[0]
+    compressed = data[12:] if flags & 0x80 else data[8:]
+    if flags & 0x0F != COMPRESSION_FORMAT_XPRESS_HUFF:
+        raise PrefetchParseError(f"지원하지 않는 MAM 압축 형식: {flags & 0x0F}")
+
+    decompressed = native_decompress(compressed, output_size)
+    if decompressed is None:
+        decompressed = xpress_huffman_decompress(compressed, output_size)
+    return decompressed
+
+
+# ----------------------------------------------------------------------
+# SCCA 구조 파싱
+# ----------------------------------------------------------------------
+def filetime_to_kst(filetime):
+    """FILETIME(100ns 단위)을 KST 문자열로 변환 (0이면 빈 문자열)"""
+    if not filetime:
+        return ""
+    try:
+        utc_time = FILETIME_EPOCH + timedelta(microseconds=filetime // 10)
+    except OverflowError:
+        return ""
+    return utc_time.astimezone(KST).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def read_utf16(data, offset, length_in_chars=None):
+    """UTF-16LE 문자열 읽기 (길이가 없으면 NULL 문자까지)"""
+    if length_in_chars is not None:
+        raw = data[offset:offset + length_in_chars * 2]
+    else:
+        end = offset
+        while end + 1 < len(data) and data[end:end + 2] != b"\x00\x00":
+            end += 2
+        raw = data[offset:end]
+    return raw.decode("utf-16-le", errors="replace").split("\x00", 1)[0]
+
+
+def parse_volumes(data, version, volumes_offset, volume_count):
+    """볼륨 정보(장치 경로, 일련번호, 생성 시간)와 참조 디렉토리 목록"""
+    entry_size = 40 if version == 17 else (96 if version == 30 else 104)
+    volumes = []
+    directories = []
+    for index in range(volume_count):
+        entry_offset = volumes_offset + index * entry_size
+        (path_offset, path_length, creation_time, serial_number,
+         _file_refs_offset, _file_refs_size, dir_strings_offset, dir_count) = struct.unpack_from(
+            "<IIQIIIII", data, entry_offset)
+
+        device_path = read_utf16(data, volumes_offset + path_offset, path_length)
+        volumes.append(f"{device_path} (Serial: {serial_number:08X}, Created: {filetime_to_kst(creation_time)})")
+
+        position = volumes_offset + dir_strings_offset
+        for _ in range(dir_count):
+            if position + 2 > len(data):
+                break
+            length = struct.unpack_from("<H", data, position)[0]
+            directories.append(read_utf16(data, position + 2, length))
+            position += 2 + (length + 1) * 2
+    return volumes, directories
+
+
+def parse_prefetch_bytes(data):
+    """
+    Prefetch 파일 내용(압축 여부 무관)을 파싱해 dict로 반환.
+    버전 17(XP), 23(Vista/7), 26(8.1), 30(10/11) 지원.
+    """
+    if data[:3] == MAM_SIGNATURE:
+        data = decompress_mam(data)
+
+    if len(data) < 84 or data[4:8] != SCCA_SIGNATURE:
+        raise PrefetchParseError("SCCA 시그니처가 없습니다")
+
+    version = struct.unpack_from("<I", data, 0)[0]
+    if version not in SUPPORTED_VERSIONS:
+        raise PrefetchParseError(f"지원하지 않는 Prefetch 버전: {version}")
+
+    file_size = struct.unpack_from("<I", data, 12)[0]
+    executable_name = read_utf16(data, 16, 30)
+    prefetch_hash = struct.unpack_from("<I", data, 76)[0]
+
+    # 파일 정보 섹션 (헤더 84바이트 뒤)
+    (metrics_offset, _metrics_count, _trace_offset, _trace_count,
+     filenames_offset, filenames_size, volumes_offset, volume_count, _volumes_size) = struct.unpack_from(
+        "<IIIIIIIII", data, 84)
+
+    if version == 17:
+        run_times = [struct.unpack_from("<Q", data, 120)[0]]
+        run_count = struct.unpack_from("<I", data, 144)[0]
+    elif version == 23:
+        run_times = [struct.unpack_from("<Q", data, 128)[0]]
+        run_count = struct.unpack_from("<I", data, 152)[0]
+    else:
+        run_times = list(struct.unpack_from("<8Q", data, 128))
+        # 버전 30의 두 번째 변형(메트릭 배열이 0x128에서 시작)은 실행 횟수 위치가 8바이트 앞에 있다
+        run_count_offset = 200 if version == 30 and metrics_offset == 0x128 else 208
+        run_count = struct.unpack_from("<I", data, run_count_offset)[0]
+
+    filenames_raw = data[filenames_offset:filenames_offset + filenames_size]
+    files_loaded = [name for name in filenames_raw.decode("utf-16-le", errors="replace").split("\x00") if name]
+    volumes, directories = parse_volumes(data, version, volumes_offset, volume_count)
+
+    run_times = [filetime_to_kst(value) for value in run_times if value]
+    return {
+        "ExecutableName": executable_name,
+        "Hash": f"{prefetch_hash:08X}",
+        "Version": version,
+        "Size": file_size,
+        "RunCount": run_count,
+        "LastRun": run_times[0] if run_times else "",
+        "PreviousRuns": ", ".join(run_times[1:]),
+        "Volumes": ",\n".join(volumes),
+        "Directories": ",\n".join(directories),
+        "FilesLoaded": ",\n".join(files_loaded),
+    }
+
+
+def parse_prefetch_file(path):
+    """단일 .pf 파일 파싱 (프로세스 풀 작업 단위, 오류는 Error 열에 기록)"""
+    record = {"SourceFilename": path}
+    try:
+        with open(path, "rb") as f:
+            record.update(parse_prefetch_bytes(f.read()))
+    except (OSError, struct.error, IndexError, PrefetchParseError) as e:
+        record["Error"] = str(e)
+    return record
+
+
+def parse_prefetch_directory(prefetch_dir, max_workers=None, progress_callback=None, cancel_event=None):
+    """
+    디렉토리의 .pf 파일을 프로세스 풀에서 병렬로 파싱해 DataFrame으로 반환.
+    LastRun은 PECmd 결과 처리와 동일하게 KST 문자열이다.
+    :param progress_callback: (완료 파일 수, 전체 파일 수)를 받는 함수
+    :param cancel_event: threading.Event, 설정되면 남은 파일을 건너뛰고 None 반환
+    """
+    paths = sorted(entry.path for entry in os.scandir(prefetch_dir)
+                   if entry.is_file() and entry.name.lower().endswith(".pf"))
+    if not paths:
+        return pd.DataFrame(columns=PREFETCH_COLUMNS)
+
+    total = len(paths)
+    records = []
+    if max_workers == 1 or total < 8:
+        for path in paths:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            records.append(parse_prefetch_file(path))
+            if progress_callback:
+                progress_callback(len(records), total)
+    else:
+        # Qt 스레드에서 호출되므로 fork 대신 spawn 사용 (Windows와 동일한 방식)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for record in executor.map(parse_prefetch_file, paths, chunksize=16):
+                if cancel_event is not None and cancel_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+                records.append(record)
+                if progress_callback and (len(records) % 16 == 0 or len(records) == total):
+                    progress_callback(len(records), total)
+
+    df = pd.DataFrame.from_records(records, columns=PREFETCH_COLUMNS)
+    df = df.astype({"Version": "Int64", "Size": "Int64", "RunCount": "Int64"})
+    failed = df["Error"].notna().sum()
+    print(f"[DEBUG] Prefetch 파싱 완료: {len(df) - failed}개 성공, {failed}개 실패")
+    return df
+
+
+if __name__ == "__main__":
+    # 사용법: python prefetch_parser.py <Prefetch 폴더>
+    if len(sys.argv) < 2:
+        print("사용법: python prefetch_parser.py <Prefetch 폴더>")
+        sys.exit(1)
+    result = parse_prefetch_directory(sys.argv[1])
+    print(result[["ExecutableName", "RunCount", "LastRun"]].to_string())
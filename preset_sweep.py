@@ -0,0 +1,352 @@
+# preset_sweep.py
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import Qt, QThread, Signal, QAbstractTableModel
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableView, QHeaderView
+
+try:
+    import ahocorasick
+except ImportError:  # 선택 의존성: 없으면 검색어마다 부분 문자열 검사 (느림)
+    ahocorasick = None
+
+from analysis_cache import AnalysisCache
+from audit_query import FIELD_RELATIONS, TERM_FIELDS, optimize, parse
+
+SWEEP_CACHE_KIND = "preset_sweep"
+SWEEP_FIELDS = ("Title", "App", "Web", "File", "OCR")
+MATRIX_KEY_COLUMNS = ["CaptureId", "TimeStamp", "ImageToken"]
+PROGRESS_INTERVAL = 5000  # 진행 상황을 알리는 OCR 행 간격
+
+
+class PatternMatcher:
+    """
+    여러 검색어(소문자)를 한 번에 찾는 매처. pyahocorasick이 있으면 Aho-Corasick 오토마톤으로
+    텍스트를 한 번만 훑고, 없으면 검색어마다 부분 문자열 검사로 대신한다.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.automaton = None
+        if ahocorasick is not None and self.patterns:
+            self.automaton = ahocorasick.Automaton()
+            for pattern_id, pattern in enumerate(self.patterns):
+                self.automaton.add_word(pattern, pattern_id)
+            self.automaton.make_automaton()
+
+    def find(self, text):
+        """text(소문자)에 들어 있는 검색어 번호 집합"""
+        if not text:
+            return frozenset()
+        if self.automaton is not None:
+            return frozenset(pattern_id for _, pattern_id in self.automaton.iter(text))
+        return frozenset(pattern_id for pattern_id, pattern in enumerate(self.patterns) if pattern in text)
+
+
+def collect_patterns(node, patterns):
+    """AST의 검색어 값(소문자)을 patterns 딕셔너리(값 -> 번호)에 추가"""
+    if node is None:
+        return
+    kind = node[0]
+    if kind in ("and", "or"):
+        for child in node[1]:
+            collect_patterns(child, patterns)
+    elif kind == "not":
+        collect_patterns(node[1], patterns)
+    elif kind == "term" or (kind == "field" and node[2] is not None):
+        patterns.setdefault(node[-1].lower(), len(patterns))
+
+
+class SweepHits:
+    """필드별 검색어 적중 캡처(행 번호) 목록과 값이 있는 캡처 표시"""
+
+    def __init__(self, capture_count, pattern_count):
+        self.capture_count = capture_count
+        self.rows = {field: [[] for _ in range(pattern_count)] for field in SWEEP_FIELDS}
+        self.present = {field: np.zeros(capture_count, dtype=bool) for field in SWEEP_FIELDS}
+        self._arrays = {}
+
+    def add(self, field, row, pattern_ids):
+        for pattern_id in pattern_ids:
+            self.rows[field][pattern_id].append(row)
+
+    def array(self, field, pattern_id):
+        """(필드, 검색어) 적중 여부 bool 배열 (처음 사용할 때 만들어 재사용)"""
+        key = (field, pattern_id)
+        array = self._arrays.get(key)
+        if array is None:
+            array = np.zeros(self.capture_count, dtype=bool)
+            array[self.rows[field][pattern_id]] = True
+            self._arrays[key] = array
+        return array
+
+
+def evaluate(node, hits, patterns):
+    """
+    검색식 AST를 캡처 전체에 대해 벡터 연산으로 평가 (bool 배열).
+    의미는 audit_query.compile_node와 같다: 일반 검색어는 제목/앱/OCR 중 하나에 포함,
+    !!는 어느 필드에도 포함되지 않음, %Field% == N/A는 해당 필드 값이 없음.
+    """
+    if node is None:
+        return np.ones(hits.capture_count, dtype=bool)
+    kind = node[0]
+    if kind == "and":
+        result = evaluate(node[1][0], hits, patterns)
+        for child in node[1][1:]:
+            result = result & evaluate(child, hits, patterns)
+        return result
+    if kind == "or":
+        result = evaluate(node[1][0], hits, patterns)
+        for child in node[1][1:]:
+            result = result | evaluate(child, hits, patterns)
+        return result
+    if kind == "not":
+        return ~evaluate(node[1], hits, patterns)
+    if kind == "term":
+        pattern_id = patterns[node[1].lower()]
+        result = hits.array(TERM_FIELDS[0], pattern_id)
+        for field in TERM_FIELDS[1:]:
+            result = result | hits.array(field, pattern_id)
+        return result
+    field, value = node[1], node[2]
+    if value is None:
+        return ~hits.present[field]
+    return hits.array(field, patterns[value.lower()])
+
+
+def sweep_presets(db_path, presets, progress_callback=None, cancel_event=None):
+    """
+    저장된 검색어(프리셋)를 캡처 전체에 대해 한 번에 평가하여 캡처 × 프리셋 적중 행렬을 반환.
+    WindowCapture와 OCR 텍스트는 각각 한 번씩만 읽고, 모든 프리셋의 검색어를 하나의 매처로 찾는다.
+    제목/앱/URI/경로는 중복 값이 많으므로 값별로 한 번만 검사한다.
+    :param presets: [(프리셋 이름, 전개된 검색식), ...]
+    :param progress_callback: callback(완료 OCR 행 수, 전체 OCR 행 수)
+    :return: DataFrame (CaptureId, TimeStamp, ImageToken, 프리셋별 bool 열), 취소되면 None
+    """
+    trees = [(name, optimize(parse(expression))) for name, expression in presets]
+    patterns = {}
+    for _, tree in trees:
+        collect_patterns(tree, patterns)
+    matcher = PatternMatcher(patterns)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        captures = conn.execute("""
+            SELECT Id, TimeStamp, ImageToken, WindowTitle
+            FROM WindowCapture
+            WHERE ImageToken IS NOT NULL
+            ORDER BY TimeStamp
+        """).fetchall()
+        row_of = {capture[0]: row for row, capture in enumerate(captures)}
+        hits = SweepHits(len(captures), len(patterns))
+
+        # 제목 (같은 제목은 한 번만 검사)
+        title_matches = {}
+        for row, (_, _, _, title) in enumerate(captures):
+            if title is None:
+                continue
+            hits.present["Title"][row] = True
+            found = title_matches.get(title)
+            if found is None:
+                found = title_matches[title] = matcher.find(title.lower())
+            hits.add("Title", row, found)
+
+        # 앱/웹/파일 관계 (대상 테이블 값별로 한 번만 검사)
+        for field, (relation, foreign_key, table, column) in FIELD_RELATIONS.items():
+            value_matches = {}
+            for capture_id, value in conn.execute(
+                    f"SELECT r.WindowCaptureId, t.{column} FROM {relation} r JOIN {table} t ON t.Id = r.{foreign_key} "
+                    f"WHERE t.{column} IS NOT NULL"):
+                row = row_of.get(capture_id)
+                if row is None:
+                    continue
+                hits.present[field][row] = True
+                found = value_matches.get(value)
+                if found is None:
+                    found = value_matches[value] = matcher.find(str(value).lower())
+                hits.add(field, row, found)
+
+        # OCR 텍스트 (한 번 순회)
+        total = conn.execute("SELECT COUNT(*) FROM WindowCaptureTextIndex_content").fetchone()[0]
+        cursor = conn.execute("SELECT CAST(c0 AS INTEGER), c2 FROM WindowCaptureTextIndex_content WHERE c2 IS NOT NULL")
+        for done, (capture_id, text) in enumerate(cursor, 1):
+            if done % PROGRESS_INTERVAL == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                if progress_callback:
+                    progress_callback(done, total)
+            row = row_of.get(capture_id)
+            if row is None:
+                continue
+            hits.present["OCR"][row] = True
+            hits.add("OCR", row, matcher.find(text.lower()))
+        if progress_callback:
+            progress_callback(total, total)
+    finally:
+        conn.close()
+
+    matrix = pd.DataFrame(captures, columns=MATRIX_KEY_COLUMNS + ["WindowTitle"]).drop(columns="WindowTitle")
+    for name, tree in trees:
+        matrix[name] = evaluate(tree, hits, patterns)
+    return matrix
+
+
+def sweep_cache_key(cache, db_path, presets):
+    """ukg.db 해시와 프리셋(이름, 전개된 검색식)으로 만든 캐시 키"""
+    return cache.artifact_key([db_path], extra=[f"{name}\x00{expression}" for name, expression in presets])
+
+
+def capture_days(timestamps):
+    """TimeStamp(밀리초) Series를 로컬 날짜 문자열(YYYY-MM-DD) Series로 변환"""
+    local_zone = datetime.now().astimezone().tzinfo
+    return pd.to_datetime(timestamps, unit="ms", utc=True).dt.tz_convert(local_zone).dt.strftime('%Y-%m-%d')
+
+
+def summarize_by_day(matrix, preset_names):
+    """프리셋 × 날짜별 적중 캡처 수 (히트맵용 DataFrame, 행=프리셋, 열=날짜)"""
+    counts = matrix[preset_names].astype(int).groupby(capture_days(matrix["TimeStamp"])).sum()
+    return counts.T
+
+
+class PresetSweepWorker(QThread):
+    """프리셋 일괄 검색을 백그라운드에서 실행하는 스레드 (결과는 분석 캐시에 저장)"""
+    progress = Signal(int, int)           # (완료 OCR 행 수, 전체)
+    sweep_finished = Signal(object, bool) # (적중 행렬 DataFrame, 캐시 사용 여부)
+    sweep_failed = Signal(str)
+
+    def __init__(self, db_path, presets):
+        super().__init__()
+        self.db_path = db_path
+        self.presets = presets
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            cache = AnalysisCache()
+            key = sweep_cache_key(cache, self.db_path, self.presets)
+            matrix = cache.load_frame(SWEEP_CACHE_KIND, key)
+            if matrix is not None:
+                self.sweep_finished.emit(matrix, True)
+                return
+
+            start = time.perf_counter()
+            matrix = sweep_presets(self.db_path, self.presets, self.progress.emit, self._cancel_event)
+            if matrix is None:
+                self.sweep_failed.emit("프리셋 일괄 검색이 취소되었습니다.")
+                return
+            print(f"[DEBUG] 프리셋 {len(self.presets)}개 일괄 검색 완료: 캡처 {len(matrix)}개 "
+                  f"({time.perf_counter() - start:.1f}초, Aho-Corasick: {ahocorasick is not None})")
+            cache.store_frame(SWEEP_CACHE_KIND, key, matrix)
+            self.sweep_finished.emit(matrix, False)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"[ERROR] 프리셋 일괄 검색 실패: {e}")
+            self.sweep_failed.emit(f"프리셋 일괄 검색 실패: {e}")
+
+
+class HeatmapModel(QAbstractTableModel):
+    """프리셋 × 날짜 적중 수 히트맵 모델 (첫 열은 합계)"""
+
+    def __init__(self, counts, parent=None):
+        super().__init__(parent)
+        self.counts = counts
+        self.totals = counts.sum(axis=1)
+        self.max_count = max(int(counts.to_numpy().max()) if counts.size else 0, 1)
+
+    def rowCount(self, parent=None):
+        return len(self.counts.index)
+
+    def columnCount(self, parent=None):
+        return len(self.counts.columns) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        value = int(self.totals.iloc[row]) if column == 0 else int(self.counts.iat[row, column - 1])
+        if role == Qt.DisplayRole:
+            return str(value) if value else ""
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole and column > 0 and value:
+            # 흰색(0) -> 빨간색(최대) 선형 보간
+            ratio = value / self.max_count
+            return QColor(255, int(255 - 200 * ratio), int(255 - 200 * ratio))
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return "합계" if section == 0 else self.counts.columns[section - 1]
+        return self.counts.index[section]
+
+    def cell(self, index):
+        """(프리셋 이름, 날짜 또는 None(합계))"""
+        preset = self.counts.index[index.row()]
+        day = None if index.column() == 0 else self.counts.columns[index.column() - 1]
+        return preset, day
+
+
+class PresetHeatmapDialog(QDialog):
+    """프리셋 × 날짜 적중 히트맵. 셀을 클릭하면 해당 캡처만 표시하도록 알린다."""
+    cell_selected = Signal(str, object)  # (프리셋 이름, 날짜 문자열 또는 None)
+
+    def __init__(self, matrix, preset_names, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("프리셋 일괄 검색 결과")
+        self.resize(900, 500)
+        layout = QVBoxLayout(self)
+
+        hit_count = int(matrix[preset_names].any(axis=1).sum()) if preset_names else 0
+        layout.addWidget(QLabel(f"캡처 {len(matrix)}개 중 {hit_count}개가 하나 이상의 프리셋에 해당합니다. "
+                                "셀을 클릭하면 해당 캡처만 표시합니다."))
+
+        self.model = HeatmapModel(summarize_by_day(matrix, preset_names), self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.clicked.connect(lambda index: self.cell_selected.emit(*self.model.cell(index)))
+        layout.addWidget(self.table)
+
+
+def filter_matrix(matrix, preset, day=None):
+    """적중 행렬에서 프리셋(및 날짜)에 해당하는 (TimeStamp, ImageToken) 리스트 (행렬이 시간순이므로 시간순)"""
+    selected = matrix[matrix[preset]]
+    if day is not None:
+        selected = selected[capture_days(selected["TimeStamp"]) == day]
+    selected = selected.drop_duplicates("ImageToken")  # 검색 결과와 같이 ImageToken 기준 중복 제거
+    return list(selected[["TimeStamp", "ImageToken"]].itertuples(index=False, name=None))
+
+
+if __name__ == "__main__":
+    # 벤치마크: python preset_sweep.py <ukg.db> [search_terms.json]
+    from search_terms import SearchTermRegistry, SearchTermCycleError
+
+    if len(sys.argv) < 2:
+        print("사용법: python preset_sweep.py <ukg.db> [search_terms.json]")
+        sys.exit(1)
+
+    registry = SearchTermRegistry(sys.argv[2] if len(sys.argv) > 2 else "search_terms.json")
+    preset_list = []
+    for entry_name in registry.terms:
+        try:
+            preset_list.append((entry_name, registry.expand(f"{{{entry_name}}}")))
+        except SearchTermCycleError as e:
+            print(f"[ERROR] {e}")
+
+    start = time.perf_counter()
+    result = sweep_presets(os.path.abspath(sys.argv[1]), preset_list)
+    print(f"일괄 검색 (프리셋 {len(preset_list)}개)  {time.perf_counter() - start:8.3f}s  캡처 {len(result)}개 "
+          f"(Aho-Corasick: {ahocorasick is not None})")
+    for entry_name, _ in preset_list:
+        print(f"  {entry_name:<30} {int(result[entry_name].sum()):8d}")
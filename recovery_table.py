@@ -1,51 +1,72 @@
 # recovery_table.py
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QLabel, QHeaderView
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QThread, QTimer, Signal
 from database import SQLiteTableModel, load_recovery_data_from_db
 from no_focus_frame_style import NoFocusFrameStyle
 import subprocess
+from tool_runner import run_tool, python_script_env, STATUS_OK, STATUS_TIMEOUT, STATUS_CANCELLED
 import sys
 import os
+import time
 import sqlite3
 import shutil
+import threading
 from datetime import datetime
 
+SCRIPT_TIMEOUT = 3600  # 복구 스크립트 하나당 제한 시간 (초)
+
 class RecoveryThread(QThread):
-    """백그라운드에서 복구 스크립트를 실행하는 스레드."""
-    recovery_info = Signal(str)   # 정보 메시지 전달
-    recovery_error = Signal(str)  # 오류 메시지 전달
+    """
+    백그라운드에서 복구 스크립트(parse_recovery.py -> parse_process.py -> recovery-wal-app-gui.py)를
+    차례로 실행하는 스레드. 각 스크립트 출력은 줄 단위로 전달되며 취소/제한 시간을 지원한다.
+    """
+    recovery_info = Signal(str)    # 정보 메시지 전달
+    recovery_error = Signal(str)   # 오류 메시지 전달
+    output_line = Signal(str)      # 스크립트 출력 한 줄
+    progress = Signal(int, int)    # (완료 단계, 전체 단계)
 
-    def __init__(self, parse_recovery_path, parse_process_path, original_db, recovered_db):
+    def __init__(self, steps, timeout=SCRIPT_TIMEOUT):
+        """
+        :param steps: (표시 이름, 명령어 리스트) 리스트
+        :param timeout: 스크립트 하나당 제한 시간(초)
+        """
         super().__init__()
-        self.parse_recovery_path = parse_recovery_path
-        self.parse_process_path = parse_process_path
-        self.original_db = original_db
-        self.recovered_db = recovered_db
+        self.steps = steps
+        self.timeout = timeout
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """실행 중인 스크립트 종료 요청"""
+        self._cancel_event.set()
 
     def run(self):
+        total = len(self.steps)
+        env = python_script_env()
         try:
-            # parse_recovery.py 실행
-            cmd_recovery = [sys.executable, self.parse_recovery_path, self.original_db, self.recovered_db]
-            result_recovery = subprocess.run(cmd_recovery, capture_output=True, text=True)
-            recovery_output = result_recovery.stdout + "\n" + result_recovery.stderr
-            if result_recovery.returncode != 0:
-                self.recovery_error.emit(f"parse_recovery.py 오류: {result_recovery.stderr}")
-                return
-
-            # parse_process.py 실행
-            cmd_process = [sys.executable, self.parse_process_path, self.recovered_db]
-            result_process = subprocess.run(cmd_process, capture_output=True, text=True)
-            process_output = result_process.stdout + "\n" + result_process.stderr
-            if result_process.returncode != 0:
-                self.recovery_error.emit(f"parse_process.py 오류: {result_process.stderr}")
-                return
-
-            # 모든 출력 메시지를 결합하여 전달
-            combined_output = recovery_output + "\n" + process_output
+            for index, (name, command) in enumerate(self.steps):
+                self.progress.emit(index, total)
+                start = time.perf_counter()
+                returncode, status = run_tool(
+                    command,
+                    on_line=lambda stream, line, name=name: self.output_line.emit(f"[{name}] {line}"),
+                    timeout=self.timeout,
+                    cancel_event=self._cancel_event,
+                    env=env,
+                    encoding="utf-8",
+                )
+                if status == STATUS_CANCELLED:
+                    self.recovery_error.emit("복구 작업이 취소되었습니다.")
+                    return
+                if status == STATUS_TIMEOUT:
+                    self.recovery_error.emit(f"{name} 실행 제한 시간({self.timeout}초)을 초과했습니다.")
+                    return
+                if status != STATUS_OK:
+                    self.recovery_error.emit(f"{name} 오류 (종료 코드 {returncode})")
+                    return
+                print(f"[DEBUG] {name} 완료 ({time.perf_counter() - start:.1f}초)")
+            self.progress.emit(total, total)
             self.recovery_info.emit("복구 스크립트가 성공적으로 실행되었습니다.")
-        except sqlite3.Error as e:
-            self.recovery_error.emit(f"원본 데이터베이스 접근 중 오류 발생: {e}")
         except Exception as e:
             self.recovery_error.emit(f"복구 스크립트 실행 중 예외 발생: {e}")
 
@@ -54,7 +75,9 @@ class RecoveryTableWidget(QWidget):
         super().__init__(parent)
         self.original_db_path = ""
         self.recovered_db_path = ""
-        self.thread = None
+        self.recover_output_dir = ""
+        self.recovery_thread = None  # 복구 스크립트 실행 스레드
+        self.pending_db_paths = None  # 복구 중에 새로 연 DB (끝나면 이어서 복구, 가장 최근 요청만 유지)
         self.setup_ui()
         
         # 기존의 self 시그널 연결 제거
@@ -95,6 +118,13 @@ class RecoveryTableWidget(QWidget):
         self.error_label.hide()
 
     def set_db_paths(self, original_db_path, recovered_db_path):
+        if self.recovery_thread and self.recovery_thread.isRunning():
+            # 실행 중인 복구가 끝나면 on_recovery_thread_finished에서 이어서 시작
+            self.pending_db_paths = (original_db_path, recovered_db_path)
+            print(f"[DEBUG] 복구 작업이 진행 중이므로 끝난 뒤 복구합니다: {recovered_db_path}")
+            self.status_label.setText("진행 중인 복구가 끝나면 새로 연 DB를 복구합니다.")
+            return
+
         try:
             print(f"\nRecovery 프로세스 시작: {recovered_db_path}")
             '''
@@ -188,161 +218,34 @@ class RecoveryTableWidget(QWidget):
             print(f"원본 DB를 복사했습니다: {self.original_db_path}")
             
             '''
-            3. WAL 복구 실행 전 DB 연결 닫기
-                - parse_recover.py 수행
-                - 실제 SQLite 복구 작업 수행
-                - 삭제된 레코드 복구 (lost and found 테이블 생성됨)
+            3~5. 복구 스크립트 실행 (백그라운드)
+                - parse_recovery.py: sqlite3 .recover로 삭제된 레코드 복구 (lost and found 테이블 생성됨)
+                - parse_process.py: lost and found 테이블에서 re_WindowCapture 테이블 생성
+                - recovery-wal-app-gui.py: WAL 파일에서 데이터 복구
+                - 출력은 줄 단위로 표시되며 cancel_recovery()로 중단할 수 있음
             '''
-            print("\n[3단계] SQLite Recovery 실행")
+            print("\n[3~5단계] 복구 스크립트 실행")
             if hasattr(self, 'conn') and self.conn:
                 self.conn.close()
                 print("기존 DB 연결을 닫았습니다.")
-            
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            recovery_path = os.path.join(current_dir, "parse_recovery.py")
-            try:
-                result = subprocess.run(
-                    [sys.executable, recovery_path, self.original_db_path, self.recovered_db_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                print(result.stdout)
-            except subprocess.CalledProcessError as e:
-                print(f"parse_recovery.py 실행 중 오류:\n출력: {e.stdout}\n오류: {e.stderr}")
-                raise
-            
-            '''
-            4. Process 실행
-                - parse_process.py 수행
-                - re_WindowCapture 테이블 생성
-                - 생성된 lost and found 테이블에서 windowcapture 레코드를 추출하여 re_windowcapture 테이블에 저장
-            '''
-            print("\n[4단계] Process 실행")
-            process_path = os.path.join(current_dir, "parse_process.py")
-            try:
-                result = subprocess.run(
-                    [sys.executable, process_path, self.recovered_db_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                print(result.stdout)
-            except subprocess.CalledProcessError as e:
-                print(f"parse_process.py 실행 중 오류:\n출력: {e.stdout}\n오류: {e.stderr}")
-                raise
 
-            '''
-            5. WAL 복구 실행
-                - recovery-wal-app-gui.py 수행
-                - WAL 파일에서 데이터 복구
-            '''
-            print("\n[5단계] WAL 복구 실행")
-            if hasattr(self, 'conn') and self.conn:
-                self.conn.close()
-                print("기존 DB 연결을 닫았습니다.")
-            
-            recovery_wal_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recovery-wal-app-gui.py")
-            result = subprocess.run(
-                [sys.executable, recovery_wal_path, self.original_db_path],
-                check=True, capture_output=True, text=True
-            )
-            print(result.stdout)
-
-            ''' 
-            6. WAL DB에서 테이블 복사
-                - 복구된 데이터베이스에서 테이블 복사
-                - re_App, re_Web, re_WindowCaptureAppRelation, re_WindowCaptureWebRelation 테이블 복사
-            '''
-            print("\n[6단계] WAL DB에서 테이블 복사")
-            wal_path = os.path.join(recover_output_dir, "recovered_with_wal.db")
-            if os.path.exists(wal_path):
-                wal_conn = sqlite3.connect(wal_path)
-                recovery_conn = sqlite3.connect(self.recovered_db_path)
-                
-                cursor_wal = wal_conn.cursor()
-                cursor_recovery = recovery_conn.cursor()
-                
-                try:
-                    # App 테이블 복사
-                    cursor_recovery.execute("DROP TABLE IF EXISTS re_App")
-                    cursor_recovery.execute("""
-                        CREATE TABLE re_App (
-                            Id INTEGER PRIMARY KEY,
-                            WindowsAppId TEXT,
-                            IconUri TEXT,
-                            Name TEXT,
-                            Path TEXT,
-                            Properties TEXT
-                        )
-                    """)
-                    
-                    cursor_wal.execute("SELECT Id, WindowsAppId, IconUri, Name, Path, Properties FROM App")
-                    app_data = cursor_wal.fetchall()
-                    cursor_recovery.executemany("INSERT INTO re_App VALUES (?, ?, ?, ?, ?, ?)", app_data)
-                    print(f"\nApp 테이블 복사 완료: {len(app_data)}개 레코드")
-                    
-                    # Web 테이블 복사
-                    cursor_recovery.execute("DROP TABLE IF EXISTS re_Web")
-                    cursor_recovery.execute("""
-                        CREATE TABLE re_Web (
-                            Id INTEGER PRIMARY KEY,
-                            Domain TEXT,
-                            Uri TEXT,
-                            IconUri TEXT,
-                            Properties TEXT
-                        )
-                    """)
-                    
-                    cursor_wal.execute("SELECT Id, Domain, Uri, IconUri, Properties FROM Web")
-                    web_data = cursor_wal.fetchall()
-                    cursor_recovery.executemany("INSERT INTO re_Web VALUES (?, ?, ?, ?, ?)", web_data)
-                    print(f"Web 테이블 복사 완료: {len(web_data)}개 레코드")
-                    
-                    # WindowCaptureAppRelation 테이블 복사
-                    cursor_recovery.execute("DROP TABLE IF EXISTS re_WindowCaptureAppRelation")
-                    cursor_recovery.execute("""
-                        CREATE TABLE re_WindowCaptureAppRelation (
-                            WindowCaptureId INTEGER,
-                            AppId INTEGER,
-                            PRIMARY KEY (WindowCaptureId, AppId)
-                        )
-                    """)
-                    
-                    cursor_wal.execute("SELECT WindowCaptureId, AppId FROM WindowCaptureAppRelation")
-                    relation_data = cursor_wal.fetchall()
-                    cursor_recovery.executemany("INSERT INTO re_WindowCaptureAppRelation VALUES (?, ?)", relation_data)
-                    print(f"WindowCaptureAppRelation 테이블 복사 완료: {len(relation_data)}개 레코드")
-                    
-                    # WindowCaptureWebRelation 테이블 복사
-                    cursor_recovery.execute("DROP TABLE IF EXISTS re_WindowCaptureWebRelation")
-                    cursor_recovery.execute("""
-                        CREATE TABLE re_WindowCaptureWebRelation (
-                            WindowCaptureId INTEGER,
-                            WebId INTEGER,
-                            PRIMARY KEY (WindowCaptureId, WebId)
-                        )
-                    """)
-                    
-                    cursor_wal.execute("SELECT WindowCaptureId, WebId FROM WindowCaptureWebRelation")
-                    web_relation_data = cursor_wal.fetchall()
-                    cursor_recovery.executemany("INSERT INTO re_WindowCaptureWebRelation VALUES (?, ?)", web_relation_data)
-                    print(f"WindowCaptureWebRelation 테이블 복사 완료: {len(web_relation_data)}개 레코드")
-                    
-                    recovery_conn.commit()
-                    print("테이블 복사 작업이 완료되었습니다.")
-                finally:
-                    wal_conn.close()
-                    recovery_conn.close()
-
-            '''
-            7. 복구 완료 메시지 표시
-                - 복구 결과 확인
-                - 결과 메시지 표시
-                - 복구된 데이터 로드
-            '''
-            print("\n[7단계] 복구 완료 메시지 표시")
-            self.on_recovery_info("복구 스크립트가 성공적으로 실행되었습니다.")
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            steps = [
+                ("parse_recovery.py", [sys.executable, os.path.join(current_dir, "parse_recovery.py"),
+                                       self.original_db_path, self.recovered_db_path]),
+                ("parse_process.py", [sys.executable, os.path.join(current_dir, "parse_process.py"),
+                                      self.recovered_db_path]),
+                ("recovery-wal-app-gui.py", [sys.executable, os.path.join(current_dir, "recovery-wal-app-gui.py"),
+                                             self.original_db_path]),
+            ]
+            self.recover_output_dir = recover_output_dir
+            self.recovery_thread = RecoveryThread(steps)
+            self.recovery_thread.output_line.connect(print)
+            self.recovery_thread.progress.connect(self.on_recovery_progress)
+            self.recovery_thread.recovery_info.connect(self.on_recovery_scripts_finished)
+            self.recovery_thread.recovery_error.connect(self.on_recovery_error)
+            self.recovery_thread.finished.connect(self.on_recovery_thread_finished)
+            self.recovery_thread.start()
 
         except Exception as e:
             error_msg = f"복구 스크립트 실행 중 예외 발생: {e}"
@@ -350,6 +253,124 @@ class RecoveryTableWidget(QWidget):
             self.error_label.setText(error_msg)
             self.error_label.show()
 
+    def on_recovery_progress(self, done, total):
+        """복구 스크립트 진행 단계 표시"""
+        self.status_label.setText(f"복구 스크립트 실행 중... ({done}/{total})")
+
+    def on_recovery_thread_finished(self):
+        """복구 스레드 종료 후 대기 중인 DB가 있으면 이어서 복구"""
+        if self.pending_db_paths is None:
+            return
+        db_paths, self.pending_db_paths = self.pending_db_paths, None
+        # 종료 신호를 보내는 중인 스레드 객체를 바로 교체하지 않도록 이벤트 루프로 넘김
+        QTimer.singleShot(0, lambda: self.set_db_paths(*db_paths))
+
+    def cancel_recovery(self):
+        """실행 중인 복구 스크립트 중단"""
+        self.pending_db_paths = None
+        if self.recovery_thread and self.recovery_thread.isRunning():
+            self.recovery_thread.cancel()
+
+    def on_recovery_scripts_finished(self, message):
+        """
+        복구 스크립트 완료 후 처리
+            6. WAL DB에서 테이블 복사
+            7. 복구 완료 메시지 표시 및 복구된 데이터 로드
+        """
+        try:
+            self.copy_wal_tables()
+        except Exception as e:
+            self.on_recovery_error(f"WAL DB 테이블 복사 중 예외 발생: {e}")
+            return
+        print("\n[7단계] 복구 완료 메시지 표시")
+        self.on_recovery_info(message)
+
+    def copy_wal_tables(self):
+        """
+        복구된 데이터베이스로 WAL DB 테이블 복사
+        (re_App, re_Web, re_WindowCaptureAppRelation, re_WindowCaptureWebRelation)
+        """
+        print("\n[6단계] WAL DB에서 테이블 복사")
+        wal_path = os.path.join(self.recover_output_dir, "recovered_with_wal.db")
+        if os.path.exists(wal_path):
+            wal_conn = sqlite3.connect(wal_path)
+            recovery_conn = sqlite3.connect(self.recovered_db_path)
+            
+            cursor_wal = wal_conn.cursor()
+            cursor_recovery = recovery_conn.cursor()
+            
+            try:
+                # App 테이블 복사
+                cursor_recovery.execute("DROP TABLE IF EXISTS re_App")
+                cursor_recovery.execute("""
+                    CREATE TABLE re_App (
+                        Id INTEGER PRIMARY KEY,
+                        WindowsAppId TEXT,
+                        IconUri TEXT,
+                        Name TEXT,
+                        Path TEXT,
+                        Properties TEXT
+                    )
+                """)
+                
+                cursor_wal.execute("SELECT Id, WindowsAppId, IconUri, Name, Path, Properties FROM App")
+                app_data = cursor_wal.fetchall()
+                cursor_recovery.executemany("INSERT INTO re_App VALUES (?, ?, ?, ?, ?, ?)", app_data)
+                print(f"\nApp 테이블 복사 완료: {len(app_data)}개 레코드")
+                
+                # Web 테이블 복사
+                cursor_recovery.execute("DROP TABLE IF EXISTS re_Web")
+                cursor_recovery.execute("""
+                    CREATE TABLE re_Web (
+                        Id INTEGER PRIMARY KEY,
+                        Domain TEXT,
+                        Uri TEXT,
+                        IconUri TEXT,
+                        Properties TEXT
+                    )
+                """)
+                
+                cursor_wal.execute("SELECT Id, Domain, Uri, IconUri, Properties FROM Web")
+                web_data = cursor_wal.fetchall()
+                cursor_recovery.executemany("INSERT INTO re_Web VALUES (?, ?, ?, ?, ?)", web_data)
+                print(f"Web 테이블 복사 완료: {len(web_data)}개 레코드")
+                
+                # WindowCaptureAppRelation 테이블 복사
+                cursor_recovery.execute("DROP TABLE IF EXISTS re_WindowCaptureAppRelation")
+                cursor_recovery.execute("""
+                    CREATE TABLE re_WindowCaptureAppRelation (
+                        WindowCaptureId INTEGER,
+                        AppId INTEGER,
+                        PRIMARY KEY (WindowCaptureId, AppId)
+                    )
+                """)
+                
+                cursor_wal.execute("SELECT WindowCaptureId, AppId FROM WindowCaptureAppRelation")
+                relation_data = cursor_wal.fetchall()
+                cursor_recovery.executemany("INSERT INTO re_WindowCaptureAppRelation VALUES (?, ?)", relation_data)
+                print(f"WindowCaptureAppRelation 테이블 복사 완료: {len(relation_data)}개 레코드")
+                
+                # WindowCaptureWebRelation 테이블 복사
+                cursor_recovery.execute("DROP TABLE IF EXISTS re_WindowCaptureWebRelation")
+                cursor_recovery.execute("""
+                    CREATE TABLE re_WindowCaptureWebRelation (
+                        WindowCaptureId INTEGER,
+                        WebId INTEGER,
+                        PRIMARY KEY (WindowCaptureId, WebId)
+                    )
+                """)
+                
+                cursor_wal.execute("SELECT WindowCaptureId, WebId FROM WindowCaptureWebRelation")
+                web_relation_data = cursor_wal.fetchall()
+                cursor_recovery.executemany("INSERT INTO re_WindowCaptureWebRelation VALUES (?, ?)", web_relation_data)
+                print(f"WindowCaptureWebRelation 테이블 복사 완료: {len(web_relation_data)}개 레코드")
+                
+                recovery_conn.commit()
+                print("테이블 복사 작업이 완료되었습니다.")
+            finally:
+                wal_conn.close()
+                recovery_conn.close()
+
     def on_recovery_info(self, message):
         """
         정보 메시지를 처리합니다.
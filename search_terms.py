@@ -0,0 +1,194 @@
+# search_terms.py
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+
+SEARCH_TERMS_FILE = "search_terms.json"
+PLACEHOLDER_PATTERN = re.compile(r'\{([^}]+)\}')
+
+_registries = {}  # 파일 경로 -> SearchTermRegistry
+_registries_lock = threading.Lock()
+
+
+class SearchTermCycleError(ValueError):
+    """저장된 검색어가 {검색어명}으로 서로를 참조하는 순환"""
+
+    def __init__(self, cycle):
+        super().__init__("검색어 순환 참조: " + " → ".join(cycle))
+        self.cycle = cycle
+
+
+def placeholder_names(text):
+    """검색식의 {검색어명} 참조 목록 (등장 순서, 중복 제거)"""
+    return list(dict.fromkeys(name.strip() for name in PLACEHOLDER_PATTERN.findall(text)))
+
+
+class SearchTermRegistry:
+    """
+    search_terms.json의 저장된 검색어 레지스트리.
+    파일은 수정 시간(mtime)과 크기가 바뀔 때만 다시 읽고, {검색어명} 참조를 의존성 그래프로 만들어
+    순환을 찾아낸다. 검색어별 전개 결과와 검색식 전개 결과는 파일이 바뀔 때까지 캐시된다.
+    """
+
+    def __init__(self, path=SEARCH_TERMS_FILE):
+        self.path = path
+        self.entries = []        # json 항목 리스트 (enabled, name, term, and_checked, or_checked)
+        self.terms = {}          # 검색어명 -> 검색식
+        self.dependencies = {}   # 검색어명 -> 참조하는 (정의된) 검색어명 리스트
+        self.cycles = []         # 발견된 순환 (검색어명 리스트)
+        self.load_error = None   # 마지막 로드 오류 메시지
+        self._signature = False  # (mtime, size), 파일이 없으면 None, 아직 읽지 않았으면 False
+        self._expanded_names = {}
+        self._expanded_texts = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # 로드
+    # ------------------------------------------------------------------
+    def refresh(self):
+        """파일이 바뀌었으면 다시 읽고 캐시를 비움 (다시 읽었으면 True)"""
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self._expanded_names.clear()
+            self._expanded_texts.clear()
+            self.load_error = None
+            entries = []
+            if signature is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] {self.path} 로드 오류: {e}")
+                    self.load_error = str(e)
+                    entries = []
+
+            self.entries = [entry for entry in entries if isinstance(entry, dict)]
+            self.terms = {entry['name'].strip(): entry['term'] for entry in self.entries
+                          if 'name' in entry and 'term' in entry}
+            self.dependencies = {name: [ref for ref in placeholder_names(term) if ref in self.terms]
+                                 for name, term in self.terms.items()}
+            self.cycles = self.find_cycles()
+            for cycle in self.cycles:
+                print(f"[ERROR] 검색어 순환 참조: {' → '.join(cycle)}")
+            print(f"[DEBUG] 검색어 {len(self.terms)}개 로드 ({self.path})")
+            return True
+
+    def find_cycles(self):
+        """의존성 그래프에서 순환을 찾음 (반복 DFS, 순환마다 경로 하나)"""
+        state = {}  # 검색어명 -> 1(탐색 중), 2(완료)
+        cycles = []
+        for root in self.dependencies:
+            if root in state:
+                continue
+            stack = [(root, iter(self.dependencies[root]))]
+            path = [root]
+            state[root] = 1
+            while stack:
+                name, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[name] = 2
+                    stack.pop()
+                    path.pop()
+                elif state.get(child) == 1:
+                    cycles.append(path[path.index(child):] + [child])
+                elif child not in state:
+                    state[child] = 1
+                    path.append(child)
+                    stack.append((child, iter(self.dependencies[child])))
+        return cycles
+
+    def save(self, entries):
+        """검색어 목록을 파일에 저장하고 다시 읽음"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # 조회/전개
+    # ------------------------------------------------------------------
+    def contains(self, name):
+        self.refresh()
+        return name.strip() in self.terms
+
+    def expand_name(self, name, visiting=()):
+        """
+        검색어명을 모든 {참조}가 전개된 검색식으로 변환 (결과는 캐시)
+        :raises SearchTermCycleError: 순환 참조가 있는 경우
+        """
+        expanded = self._expanded_names.get(name)
+        if expanded is not None:
+            return expanded
+        if name in visiting:
+            raise SearchTermCycleError(list(visiting[visiting.index(name):]) + [name])
+
+        visiting = visiting + (name,)
+        expanded = PLACEHOLDER_PATTERN.sub(lambda m: self.replace_placeholder(m, visiting), self.terms[name])
+        self._expanded_names[name] = expanded
+        return expanded
+
+    def replace_placeholder(self, match, visiting=()):
+        """{검색어명}을 (전개된 검색식)으로 치환, 정의되지 않은 이름은 그대로 둠"""
+        name = match.group(1).strip()
+        if name not in self.terms:
+            return match.group(0)
+        return f"({self.expand_name(name, visiting)})"
+
+    def expand(self, text):
+        """
+        검색식의 {검색어명}을 전개 (파일이 바뀌지 않았으면 같은 검색식은 캐시에서 반환)
+        :raises SearchTermCycleError: 순환 참조가 있는 경우
+        """
+        if '{' not in text:
+            return text
+        self.refresh()
+        with self._lock:
+            expanded = self._expanded_texts.get(text)
+            if expanded is None:
+                expanded = PLACEHOLDER_PATTERN.sub(self.replace_placeholder, text)
+                self._expanded_texts[text] = expanded
+            return expanded
+
+
+def get_search_term_registry(path=SEARCH_TERMS_FILE):
+    """파일 경로별로 하나의 SearchTermRegistry를 공유 (Internal Audit 탭과 고급 검색 대화상자)"""
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = SearchTermRegistry(path)
+            _registries[key] = registry
+        return registry
+
+
+if __name__ == "__main__":
+    # 벤치마크: python search_terms.py [search_terms.json] ["{검색어명}"]
+    terms_path = sys.argv[1] if len(sys.argv) > 1 else SEARCH_TERMS_FILE
+    start = time.perf_counter()
+    registry = SearchTermRegistry(terms_path)
+    print(f"로드/그래프 구성   {time.perf_counter() - start:8.5f}s  검색어 {len(registry.terms)}개, 순환 {len(registry.cycles)}개")
+
+    queries = [sys.argv[2]] if len(sys.argv) > 2 else [f"{{{name}}}" for name in registry.terms]
+    for cached in (False, True):
+        start = time.perf_counter()
+        total_length = 0
+        for query in queries:
+            try:
+                total_length += len(registry.expand(query))
+            except SearchTermCycleError as e:
+                print(f"[ERROR] {e}")
+        label = "전개 (캐시)" if cached else "전개 (처음)"
+        print(f"{label:<14} {time.perf_counter() - start:8.5f}s  검색식 {len(queries)}개, 전개 길이 합 {total_length}")
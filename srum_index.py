@@ -0,0 +1,58 @@
+# srum_index.py
+
+import pandas as pd
+
+KST_OFFSET_MINUTES = 9 * 60
+EPOCH = pd.Timestamp("1970-01-01")
+EPOCH_UTC = EPOCH.tz_localize("UTC")
+ONE_MINUTE = pd.Timedelta(minutes=1)
+
+
+def exe_basename(exe_info):
+    r"""SRUM ExeInfo(예: \device\harddiskvolume3\...\chrome.exe)에서 소문자 파일명만 추출"""
+    if not isinstance(exe_info, str):
+        return ""
+    name = exe_info.replace("\\", "/").rsplit("/", 1)[-1]
+    return name.split(" [", 1)[0].strip().lower()  # 'svchost.exe [netsvcs]' 같은 서비스 표기 제거
+
+
+def table_time_to_minute(app_time):
+    """App 테이블의 KST 시간 문자열을 UTC epoch 분(int)으로 변환 (초는 버림)"""
+    return int((pd.Timestamp(app_time) - EPOCH) // ONE_MINUTE) - KST_OFFSET_MINUTES
+
+
+class SrumIndex:
+    """
+    SRUM CSV(Application Resource Usage)를 로드 시 한 번만 정규화한 조회 테이블.
+    ExeInfo는 파일명 categorical 열로, Timestamp는 UTC epoch 분(int64)으로 변환해
+    (ExeName, Minute) 정렬 MultiIndex를 만든다. 선택마다 전체 프레임을 훑지 않고
+    인덱스 구간 조회(O(log n))로 ForegroundCycleTime을 찾는다.
+    """
+
+    def __init__(self, csv_data):
+        frame = pd.DataFrame({
+            "ExeName": pd.Categorical(csv_data["ExeInfo"].map(exe_basename)),
+            "Minute": (pd.to_datetime(csv_data["Timestamp"], errors="coerce", utc=True) - EPOCH_UTC) // ONE_MINUTE,
+            "ForegroundCycleTime": csv_data["ForegroundCycleTime"].to_numpy(),
+            "RowOrder": range(len(csv_data)),  # 원본 CSV 순서 (첫 번째 매칭 선택용)
+        })
+        frame = frame.dropna(subset=["Minute"]).astype({"Minute": "int64"})
+        self.exe_names = set(frame["ExeName"].cat.categories)
+        self.frame = frame.set_index(["ExeName", "Minute"]).sort_index()
+        print(f"[DEBUG] SRUM 인덱스 생성 완료 - {len(self.frame)}개 행, 실행 파일 {len(self.exe_names)}개")
+
+    def lookup(self, app_path, app_time, tolerance_minutes=1):
+        """
+        app_path 실행 파일의 app_time(KST) ±tolerance_minutes 분 범위 SRUM 행 반환
+        :return: 원본 CSV 순서로 정렬된 DataFrame (ForegroundCycleTime, RowOrder)
+        """
+        exe_name = exe_basename(app_path)
+        if exe_name not in self.exe_names:
+            return self.frame.iloc[0:0]
+
+        minute = table_time_to_minute(app_time)
+        matched = self.frame.loc[(exe_name, slice(minute - tolerance_minutes, minute + tolerance_minutes)), :]
+        return matched.sort_values("RowOrder")
+
+    def has_exe(self, app_path):
+        return exe_basename(app_path) in self.exe_names
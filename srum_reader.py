@@ -0,0 +1,163 @@
+# srum_reader.py
+
+import os
+import sys
+import time
+import struct
+import sqlite3
+from datetime import datetime, timedelta
+import pandas as pd
+
+try:
+    from dissect.esedb import EseDB
+except ImportError:  # 선택 의존성: 없으면 SrumECmd 경로 사용
+    EseDB = None
+
+from srum_index import exe_basename
+
+ID_MAP_TABLE = "SruDbIdMapTable"
+APP_RESOURCE_USAGE_TABLE = "{D10CA2FE-6FCF-4F6D-848E-B2E99266FA89}"
+OLE_EPOCH = datetime(1899, 12, 30)
+PROGRESS_INTERVAL = 5000  # 진행 상황을 알리고 취소를 확인하는 레코드 간격
+
+# SrumECmd AppResourceUseInfo CSV와 같은 열 이름을 사용 (srum_index/캐시와 호환)
+USAGE_COLUMNS = [
+    "ForegroundCycleTime", "BackgroundCycleTime", "FaceTime",
+    "ForegroundContextSwitches", "BackgroundContextSwitches",
+    "ForegroundBytesRead", "ForegroundBytesWritten",
+    "BackgroundBytesRead", "BackgroundBytesWritten",
+]
+SRUM_COLUMNS = ["Id", "Timestamp", "ExeInfo", "AppId", "UserId", "Sid"] + USAGE_COLUMNS
+
+
+def is_available():
+    """dissect.esedb 설치 여부 (없으면 SrumECmd로 처리)"""
+    return EseDB is not None
+
+
+def ole_timestamp_to_string(value):
+    """ESE DateTime(OLE Automation date, int64 비트로 저장)을 UTC 문자열로 변환"""
+    if value is None:
+        return None
+    days = struct.unpack("<d", struct.pack("<q", value))[0]
+    try:
+        return (OLE_EPOCH + timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    except OverflowError:
+        return None
+
+
+def read_sid(blob):
+    """바이너리 SID를 S-1-5-... 문자열로 변환"""
+    if not blob or len(blob) < 8:
+        return None
+    revision, sub_authority_count = blob[0], blob[1]
+    authority = int.from_bytes(blob[2:8], "big")
+    sub_authorities = struct.unpack_from(f"<{sub_authority_count}I", blob, 8)
+    return f"S-{revision}-{authority}" + "".join(f"-{value}" for value in sub_authorities)
+
+
+def load_id_map(db):
+    """SruDbIdMapTable을 IdIndex -> 이름(앱 경로/서비스) 또는 SID로 변환"""
+    id_map = {}
+    for record in db.table(ID_MAP_TABLE).records():
+        blob = record.get("IdBlob")
+        if not blob:
+            continue
+        if record.get("IdType") == 3:
+            id_map[record.get("IdIndex")] = read_sid(blob)
+        else:
+            id_map[record.get("IdIndex")] = blob.decode("utf-16-le", errors="replace").rstrip("\x00")
+    return id_map
+
+
+def load_app_names_from_db(db_path):
+    """ukg.db App 테이블에 있는 실행 파일 이름(소문자) 집합"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT DISTINCT Path FROM App WHERE Path IS NOT NULL").fetchall()
+    finally:
+        conn.close()
+    return {exe_basename(path) for (path,) in rows if path}
+
+
+def iter_app_resource_usage(srudb_path, app_names=None, progress_callback=None, cancel_event=None):
+    """
+    SRUDB.dat의 Application Resource Usage 테이블을 한 행씩 읽어 dict로 반환하는 제너레이터.
+    AppId/UserId는 SruDbIdMapTable로 변환하고, app_names가 주어지면 해당 실행 파일 행만
+    사용량 열을 읽어 반환한다. (전체 SRUM DB를 메모리에 올리지 않음)
+    :param app_names: 실행 파일 이름(소문자) 집합, None이면 전체
+    :param progress_callback: (읽은 레코드 수, 0) 형태로 호출 (전체 레코드 수는 미리 알 수 없음)
+    :param cancel_event: threading.Event, 설정되면 남은 레코드를 읽지 않고 종료
+    """
+    if EseDB is None:
+        raise RuntimeError("dissect.esedb가 설치되어 있지 않습니다.")
+
+    with open(srudb_path, "rb") as f:
+        db = EseDB(f)
+        id_map = load_id_map(db)
+
+        wanted_ids = None
+        if app_names is not None:
+            wanted_ids = {index for index, name in id_map.items()
+                          if name and exe_basename(name) in app_names}
+
+        for scanned, record in enumerate(db.table(APP_RESOURCE_USAGE_TABLE).records(), 1):
+            if scanned % PROGRESS_INTERVAL == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if progress_callback:
+                    progress_callback(scanned, 0)
+            app_id = record.get("AppId")
+            if wanted_ids is not None and app_id not in wanted_ids:
+                continue
+
+            user_id = record.get("UserId")
+            row = {
+                "Id": record.get("AutoIncId"),
+                "Timestamp": ole_timestamp_to_string(record.get("TimeStamp")),
+                "ExeInfo": id_map.get(app_id, ""),
+                "AppId": app_id,
+                "UserId": user_id,
+                "Sid": id_map.get(user_id, ""),
+            }
+            for column in USAGE_COLUMNS:
+                row[column] = record.get(column)
+            yield row
+
+
+def load_app_resource_usage(srudb_path, app_names=None, progress_callback=None, cancel_event=None):
+    """iter_app_resource_usage 결과를 SrumECmd CSV와 같은 형태의 DataFrame으로 반환 (취소되면 None)"""
+    rows = iter_app_resource_usage(srudb_path, app_names, progress_callback, cancel_event)
+    df = pd.DataFrame.from_records(rows, columns=SRUM_COLUMNS)
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    return df.astype({column: "Int64" for column in ["Id", "AppId", "UserId"] + USAGE_COLUMNS})
+
+
+if __name__ == "__main__":
+    # 벤치마크: python srum_reader.py <SRUDB.dat> [SrumECmd AppResourceUseInfo CSV] [ukg.db]
+    if len(sys.argv) < 2:
+        print("사용법: python srum_reader.py <SRUDB.dat> [AppResourceUseInfo CSV] [ukg.db]")
+        sys.exit(1)
+
+    srudb = sys.argv[1]
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else None
+    ukg_db = sys.argv[3] if len(sys.argv) > 3 else None
+    print(f"[DEBUG] SRUDB.dat: {srudb} ({os.path.getsize(srudb) / (1024 * 1024):.1f} MB)")
+
+    start = time.perf_counter()
+    native = load_app_resource_usage(srudb)
+    print(f"ESE 직접 읽기 (전체)     {time.perf_counter() - start:8.3f}s  {len(native)}개 행")
+
+    if ukg_db:
+        names = load_app_names_from_db(ukg_db)
+        start = time.perf_counter()
+        filtered = load_app_resource_usage(srudb, names)
+        print(f"ESE 직접 읽기 (App 필터) {time.perf_counter() - start:8.3f}s  {len(filtered)}개 행")
+
+    if csv_path:
+        start = time.perf_counter()
+        csv_frame = pd.read_csv(csv_path)
+        csv_frame["Timestamp"] = pd.to_datetime(csv_frame["Timestamp"]).dt.strftime('%Y-%m-%d %H:%M:%S')
+        print(f"SrumECmd CSV 읽기        {time.perf_counter() - start:8.3f}s  {len(csv_frame)}개 행 "
+              f"(SrumECmd 실행 시간 제외)")
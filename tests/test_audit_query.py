@@ -0,0 +1,67 @@
+# tests/test_audit_query.py
+
+import pytest
+
+from audit_query import SearchSyntaxError, optimize, parse, tokenize
+
+
+def tree(expression):
+    return optimize(parse(expression))
+
+
+def test_field_after_term_is_anded():
+    assert tree("foo %App%==chrome") == ("and", (("term", "foo"), ("field", "App", "chrome")))
+
+
+def test_field_between_terms_with_operator():
+    assert tree("x %Web%==naver.com && y") == (
+        "and", (("term", "x"), ("field", "Web", "naver.com"), ("term", "y")))
+
+
+def test_field_directly_after_term():
+    assert tree("a%App%==b") == ("and", (("term", "a"), ("field", "App", "b")))
+
+
+def test_term_keeps_spaces_and_plain_percent():
+    assert tree("save as") == ("term", "save as")
+    assert tree("100% sure") == ("term", "100% sure")
+    assert tree("%Unknown%==x") == ("term", "%Unknown%==x")
+
+
+def test_field_not_available():
+    assert tree("%OCR% == N/A") == ("field", "OCR", None)
+
+
+def test_not_operator():
+    assert tree("!!a") == ("not", ("term", "a"))
+    assert tree("!!!!a") == ("term", "a")
+    assert tree("a && !!%Title%==b") == ("and", (("term", "a"), ("not", ("field", "Title", "b"))))
+
+
+def test_not_inside_term_is_literal():
+    assert tokenize("a!!b") == [("term", "a!!b")]
+
+
+def test_nested_groups():
+    assert tree("((a || b) && (c || (d && e)))") == (
+        "and", (("or", (("term", "a"), ("term", "b"))),
+                ("or", (("term", "c"), ("and", (("term", "d"), ("term", "e")))))))
+
+
+def test_implicit_and_after_group():
+    assert tree("(a) b") == ("and", (("term", "a"), ("term", "b")))
+
+
+def test_duplicate_terms_removed():
+    assert tree("a || a || b") == ("or", (("term", "a"), ("term", "b")))
+
+
+@pytest.mark.parametrize("expression", ["(a || b", "((a)", "a)", "(a))", ")"])
+def test_unbalanced_parentheses(expression):
+    with pytest.raises(SearchSyntaxError):
+        parse(expression)
+
+
+def test_empty_expression():
+    assert tree("") is None
+    assert tree("()") is None
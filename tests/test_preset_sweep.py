@@ -0,0 +1,121 @@
+# tests/test_preset_sweep.py
+
+import sqlite3
+
+import pytest
+
+import preset_sweep
+from analysis_cache import AnalysisCache
+from audit_query import build_search_query, compile_search
+from ocr_search import OcrIndex, like_pattern, prepare_ocr_rank
+
+# (제목, 앱, URI, 경로, OCR 텍스트)
+CAPTURES = [
+    ("proj_alpha 회의록", "Notepad", None, "C:\\temp\\proj_alpha.docx", "내부 자료 proj_alpha"),
+    ("projXalpha", "Notepad", None, None, "projXalpha 검토"),
+    ("fileAx 보고서", "Explorer", None, "D:\\fileAx.txt", None),
+    ("file_x 보고서", "Explorer", None, "D:\\file_x.txt", "file_x"),
+    ("할인 100% 이벤트", "Chrome", "https://shop.example.com/sale?rate=100%", None, "100% 할인"),
+    ("할인 1000 이벤트", "Chrome", "https://shop.example.com/sale?rate=1000", None, "1000 할인"),
+    ("C:\\temp 폴더", "Explorer", None, "C:\\temp", "C:\\temp"),
+    ("C:temp 폴더", "Explorer", None, "C:temp", "C:temp"),
+    ("기밀 문서", "Word", None, None, "기밀"),
+    (None, None, None, None, None),
+]
+
+PRESETS = [
+    ("밑줄", "proj_"),
+    ("밑줄 파일", "file_x"),
+    ("퍼센트", "100%"),
+    ("퍼센트 URI", "%Web%==rate=100%"),
+    ("역슬래시", "C:\\t"),
+    ("역슬래시 경로", "%File%==\\temp"),
+    ("밑줄 OCR", "%OCR%==_x"),
+    ("두 글자", "기밀 || %OCR%==1%"),
+    ("부정", "!!proj_ && %App%==explorer"),
+    ("값 없음", "%OCR%==n/a"),
+]
+
+
+def create_ukg_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE WindowCapture (Id INTEGER PRIMARY KEY, TimeStamp INTEGER, ImageToken TEXT, WindowTitle TEXT);
+        CREATE TABLE App (Id INTEGER PRIMARY KEY, Name TEXT);
+        CREATE TABLE Web (Id INTEGER PRIMARY KEY, Uri TEXT);
+        CREATE TABLE File (Id INTEGER PRIMARY KEY, Path TEXT);
+        CREATE TABLE WindowCaptureAppRelation (WindowCaptureId INTEGER, AppId INTEGER);
+        CREATE TABLE WindowCaptureWebRelation (WindowCaptureId INTEGER, WebId INTEGER);
+        CREATE TABLE WindowCaptureFileRelation (WindowCaptureId INTEGER, FileId INTEGER);
+        CREATE TABLE WindowCaptureTextIndex_content (id INTEGER PRIMARY KEY, c0, c1, c2);
+    """)
+    for capture_id, (title, app, uri, path, text) in enumerate(CAPTURES, 1):
+        conn.execute("INSERT INTO WindowCapture VALUES (?, ?, ?, ?)",
+                     (capture_id, 1700000000000 + capture_id, f"token{capture_id}", title))
+        for relation, foreign_key, table, column, value in (
+                ("WindowCaptureAppRelation", "AppId", "App", "Name", app),
+                ("WindowCaptureWebRelation", "WebId", "Web", "Uri", uri),
+                ("WindowCaptureFileRelation", "FileId", "File", "Path", path)):
+            if value is None:
+                continue
+            value_id = conn.execute(f"INSERT INTO {table} ({column}) VALUES (?)", (value,)).lastrowid
+            conn.execute(f"INSERT INTO {relation} (WindowCaptureId, {foreign_key}) VALUES (?, ?)",
+                         (capture_id, value_id))
+        if text is not None:
+            conn.execute("INSERT INTO WindowCaptureTextIndex_content (c0, c2) VALUES (?, ?)", (capture_id, text))
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def ukg_db(tmp_path):
+    db_path = str(tmp_path / "ukg.db")
+    create_ukg_db(db_path)
+    return db_path
+
+
+def search_tokens(db_path, expression, ocr_index=None):
+    """compile_search 결과 캡처의 ImageToken 집합"""
+    use_index = ocr_index is not None
+    where_clause, params, rank_terms = compile_search(expression, use_index)
+    conn = sqlite3.connect(db_path)
+    try:
+        if use_index:
+            ocr_index.attach(conn)
+        rank_join = prepare_ocr_rank(conn, rank_terms, use_index)
+        rows = conn.execute(build_search_query(where_clause, rank_join), params).fetchall()
+    finally:
+        conn.close()
+    return {image_token for _, image_token in rows}
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern("proj_") == "%proj\\_%"
+    assert like_pattern("100%") == "%100\\%%"
+    assert like_pattern("C:\\t") == "%C:\\\\t%"
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+@pytest.mark.parametrize("use_index", [False, True])
+def test_sweep_matches_compile_search(ukg_db, tmp_path, monkeypatch, use_automaton, use_index):
+    if use_automaton and preset_sweep.ahocorasick is None:
+        pytest.skip("pyahocorasick 없음")
+    if not use_automaton:
+        monkeypatch.setattr(preset_sweep, "ahocorasick", None)
+    ocr_index = None
+    if use_index:
+        ocr_index = OcrIndex(ukg_db, AnalysisCache(str(tmp_path / "cache" / "analysis_cache.db")))
+        ocr_index.build()
+
+    matrix = preset_sweep.sweep_presets(ukg_db, PRESETS)
+    for name, expression in PRESETS:
+        swept = set(matrix.loc[matrix[name], "ImageToken"])
+        assert swept == search_tokens(ukg_db, expression, ocr_index), name
+
+
+def test_wildcard_terms_match_literally(ukg_db):
+    assert search_tokens(ukg_db, "proj_") == {"token1"}
+    assert search_tokens(ukg_db, "file_x") == {"token4"}
+    assert search_tokens(ukg_db, "100%") == {"token5"}
+    assert search_tokens(ukg_db, "C:\\t") == {"token7"}
+    assert search_tokens(ukg_db, "%File%==\\temp") == {"token1", "token7"}
@@ -0,0 +1,252 @@
+# thumbnail_cache.py
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+from analysis_cache import default_cache_path
+from image_store import get_image_store
+
+THUMBNAIL_DIR_NAME = "thumbnails"
+THUMBNAIL_FORMAT = "jpg"
+THUMBNAIL_QUALITY = 85
+SIZE_STEP = 64                          # 디스크 썸네일 크기 단위 (창 크기가 조금 바뀌어도 같은 파일 사용)
+MEMORY_LIMIT = 256 * 1024 * 1024        # 메모리 LRU 최대 크기 (바이트)
+
+_caches = {}  # ImageStore 경로 -> ThumbnailCache
+_caches_lock = threading.Lock()
+
+
+def find_image_path(image_dir, image_token):
+    """ImageStore에서 토큰의 실제 이미지 파일 경로 (없으면 None)"""
+    return get_image_store(image_dir).resolve(image_token)
+
+
+def bucket_size(width, height):
+    """디스크 썸네일 상자 크기 (SIZE_STEP 단위로 올림)"""
+    return (-(-width // SIZE_STEP) * SIZE_STEP, -(-height // SIZE_STEP) * SIZE_STEP)
+
+
+def load_thumbnail_image(image_path, thumbnail_path, width, height):
+    """
+    디스크 썸네일을 읽거나, 없으면 원본을 축소 디코딩하여 만들고 저장한 QImage를 반환 (실패하면 null QImage).
+    QImage/QImageReader만 사용하므로 작업 스레드에서 호출해도 안전하다.
+    """
+    if os.path.exists(thumbnail_path):
+        image = QImage(thumbnail_path)
+        if not image.isNull():
+            return image
+
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid() and (source_size.width() > width or source_size.height() > height):
+        # JPEG는 디코딩 단계에서 축소되므로 원본 전체를 풀지 않음
+        reader.setScaledSize(source_size.scaled(QSize(width, height), Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        print(f"[ERROR] 썸네일 원본 로드 실패: {image_path} ({reader.errorString()})")
+        return image
+
+    temp_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+    try:
+        if image.save(temp_path, THUMBNAIL_FORMAT, THUMBNAIL_QUALITY):
+            os.replace(temp_path, thumbnail_path)
+    except OSError as e:
+        print(f"[ERROR] 썸네일 저장 실패: {thumbnail_path} ({e})")
+    return image
+
+
+class ThumbnailSignals(QObject):
+    thumbnail_loaded = Signal(str, int, int, QImage)  # (ImageToken, 너비, 높이, 화면 크기로 축소된 이미지)
+
+
+class ThumbnailTask(QRunnable):
+    """스레드 풀에서 디스크 썸네일을 준비하고 화면 크기로 축소하는 작업 (QImage만 사용)"""
+
+    def __init__(self, signals, image_dir, image_token, thumbnail_path, box_size, size):
+        super().__init__()
+        self.setAutoDelete(False)  # 취소(tryTake)할 수 있도록 ThumbnailCache가 참조를 유지
+        self.signals = signals
+        self.image_dir = image_dir
+        self.image_token = image_token
+        self.thumbnail_path = thumbnail_path
+        self.box_size = box_size
+        self.size = size
+
+    def run(self):
+        image = QImage()
+        image_path = find_image_path(self.image_dir, self.image_token)
+        if image_path:
+            image = load_thumbnail_image(image_path, self.thumbnail_path, *self.box_size)
+        if not image.isNull():
+            image = image.scaled(*self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.signals.thumbnail_loaded.emit(self.image_token, self.size[0], self.size[1], image)
+
+
+class ThumbnailCache(QObject):
+    """
+    ImageStore 스크린샷의 썸네일 캐시.
+    메모리에는 화면 크기 그대로의 QPixmap을 바이트 한도 LRU로 두고, 디스크에는 SIZE_STEP 단위 상자로
+    축소한 JPEG를 Recall_load/thumbnails/<ImageStore 경로 해시>/에 둔다.
+    메모리에 없는 썸네일은 request()로 QThreadPool에 요청하며, 준비되면 thumbnail_ready 신호를 보낸다.
+    아직 시작하지 않은 요청은 cancel()로 취소할 수 있다 (페이지 이동 시).
+    QPixmap은 GUI 스레드에서만 다루고, 작업 스레드는 QImage만 만든다.
+    """
+    thumbnail_ready = Signal(str, int, int)   # (ImageToken, 너비, 높이) - cached_pixmap()으로 가져옴
+    thumbnail_failed = Signal(str, int, int)  # 원본이 없거나 읽을 수 없음
+
+    def __init__(self, image_dir, thumbnail_root=None, memory_limit=MEMORY_LIMIT, parent=None):
+        super().__init__(parent)
+        self.image_dir = image_dir
+        store_key = hashlib.sha256(os.path.normcase(os.path.abspath(image_dir)).encode("utf-8")).hexdigest()[:16]
+        thumbnail_root = thumbnail_root or os.path.join(os.path.dirname(default_cache_path()), THUMBNAIL_DIR_NAME)
+        self.thumbnail_dir = os.path.join(thumbnail_root, store_key)
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        self.memory_limit = memory_limit
+        self.memory_used = 0
+        self._pixmaps = OrderedDict()  # (토큰, 너비, 높이) -> QPixmap
+        self._tasks = {}               # (토큰, 너비, 높이) -> 대기/실행 중인 ThumbnailTask
+        self._failed = set()           # 원본이 없거나 읽을 수 없는 (토큰, 너비, 높이)
+        self.pool = QThreadPool.globalInstance()
+        self.signals = ThumbnailSignals()
+        self.signals.thumbnail_loaded.connect(self.on_thumbnail_loaded)
+
+    def thumbnail_path(self, image_token, box_width, box_height):
+        return os.path.join(self.thumbnail_dir, f"{image_token}_{box_width}x{box_height}.{THUMBNAIL_FORMAT}")
+
+    # ------------------------------------------------------------------
+    # 메모리 LRU
+    # ------------------------------------------------------------------
+    def cached_pixmap(self, image_token, width, height):
+        """메모리에 있는 썸네일 (없으면 None)"""
+        key = (image_token, width, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def remember(self, image_token, width, height, pixmap):
+        key = (image_token, width, height)
+        previous = self._pixmaps.pop(key, None)
+        if previous is not None:
+            self.memory_used -= previous.width() * previous.height() * 4
+        self._pixmaps[key] = pixmap
+        self.memory_used += pixmap.width() * pixmap.height() * 4
+        while self.memory_used > self.memory_limit and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self.memory_used -= evicted.width() * evicted.height() * 4
+
+    def is_failed(self, image_token, width, height):
+        """원본이 없거나 읽을 수 없어 썸네일을 만들지 못한 토큰인지"""
+        return (image_token, width, height) in self._failed
+
+    def clear(self):
+        self._pixmaps.clear()
+        self._failed.clear()
+        self.memory_used = 0
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def get(self, image_token, width, height):
+        """
+        width x height 상자에 맞춘 썸네일 QPixmap (메모리 -> 디스크 -> 원본 순으로 찾음, 동기 호출).
+        원본이 없거나 읽을 수 없으면 None. GUI 스레드에서 호출한다.
+        """
+        pixmap = self.cached_pixmap(image_token, width, height)
+        if pixmap is not None:
+            return pixmap
+
+        box_width, box_height = bucket_size(width, height)
+        image_path = find_image_path(self.image_dir, image_token)
+        if image_path is None:
+            return None
+        image = load_thumbnail_image(image_path, self.thumbnail_path(image_token, box_width, box_height),
+                                     box_width, box_height)
+        if image.isNull():
+            return None
+        pixmap = QPixmap.fromImage(image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.remember(image_token, width, height, pixmap)
+        return pixmap
+
+    def request(self, image_tokens, width, height, priority=0):
+        """
+        메모리에 없는 썸네일을 스레드 풀에 요청 (주어진 순서대로, priority가 높은 요청이 먼저 실행).
+        준비되면 thumbnail_ready, 실패하면 thumbnail_failed 신호를 보낸다.
+        """
+        box_size = bucket_size(width, height)
+        for image_token in image_tokens:
+            key = (image_token, width, height)
+            if image_token is None or key in self._pixmaps or key in self._tasks or key in self._failed:
+                continue
+            task = ThumbnailTask(self.signals, self.image_dir, image_token,
+                                 self.thumbnail_path(image_token, *box_size), box_size, (width, height))
+            self._tasks[key] = task
+            self.pool.start(task, priority)
+
+    def cancel(self):
+        """아직 시작하지 않은 요청을 모두 취소 (실행 중인 작업은 끝나면 캐시에만 반영)"""
+        cancelled = 0
+        for key, task in list(self._tasks.items()):
+            if self.pool.tryTake(task):
+                del self._tasks[key]
+                cancelled += 1
+        return cancelled
+
+    def on_thumbnail_loaded(self, image_token, width, height, image):
+        """작업 완료 (GUI 스레드): 메모리 LRU에 올리고 알림"""
+        self._tasks.pop((image_token, width, height), None)
+        if image.isNull():
+            self._failed.add((image_token, width, height))
+            self.thumbnail_failed.emit(image_token, width, height)
+            return
+        self.remember(image_token, width, height, QPixmap.fromImage(image))
+        self.thumbnail_ready.emit(image_token, width, height)
+
+
+def get_thumbnail_cache(image_dir):
+    """ImageStore 경로별로 하나의 ThumbnailCache를 공유"""
+    key = os.path.normcase(os.path.abspath(image_dir))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ThumbnailCache(image_dir)
+            _caches[key] = cache
+        return cache
+
+
+if __name__ == "__main__":
+    # 벤치마크: python thumbnail_cache.py <ImageStore 폴더> [개수]
+    from PySide6.QtWidgets import QApplication
+
+    if len(sys.argv) < 2:
+        print("사용법: python thumbnail_cache.py <ImageStore 폴더> [개수]")
+        sys.exit(1)
+
+    app = QApplication(sys.argv)
+    store = sys.argv[1]
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 28
+    tokens = sorted(entry.name for entry in os.scandir(store) if entry.is_file())[:limit]
+    thumbnails = ThumbnailCache(store)
+
+    start = time.perf_counter()
+    for token in tokens:
+        pixmap = QPixmap(find_image_path(store, token))
+        pixmap.scaled(150, 105, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    print(f"원본 QPixmap + 축소   {time.perf_counter() - start:8.3f}s  {len(tokens)}개")
+
+    for label in ("썸네일 (디스크 생성)", "썸네일 (메모리)"):
+        start = time.perf_counter()
+        for token in tokens:
+            thumbnails.get(token, 150, 105)
+        print(f"{label:<16} {time.perf_counter() - start:8.3f}s")
+    thumbnails.clear()
+    start = time.perf_counter()
+    for token in tokens:
+        thumbnails.get(token, 150, 105)
+    print(f"{'썸네일 (디스크)':<16} {time.perf_counter() - start:8.3f}s")
@@ -0,0 +1,210 @@
+# tool_runner.py
+
+import os
+import re
+import sys
+import time
+import queue
+import locale
+import threading
+import subprocess
+from PySide6.QtCore import QThread, Signal
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_CANCELLED = "cancelled"
+
+POLL_INTERVAL = 0.1  # 취소/제한 시간 확인 주기 (초)
+TERMINATE_GRACE = 5  # terminate 후 kill 전 대기 시간 (초)
+
+
+def default_encoding():
+    """외부 도구 출력 인코딩 (한국어 Windows에서는 cp949)"""
+    return locale.getpreferredencoding(False) or "utf-8"
+
+
+def python_script_env():
+    """자식 파이썬 스크립트가 출력을 버퍼링하지 않고 UTF-8로 내보내도록 하는 환경 변수"""
+    env = dict(os.environ)
+    env["PYTHONUNBUFFERED"] = "1"
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def stop_process(process):
+    """terminate 후 일정 시간 안에 끝나지 않으면 kill"""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=TERMINATE_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def pump_lines(pipe, name, lines):
+    """파이프를 한 줄씩 읽어 큐에 전달 (EOF에서 None 전달)"""
+    try:
+        for line in iter(pipe.readline, ""):
+            lines.put((name, line.rstrip("\r\n")))
+    finally:
+        pipe.close()
+        lines.put((name, None))
+
+
+def run_tool(command, on_line=None, timeout=None, cancel_event=None, stdin_text=None,
+             stdout_path=None, cwd=None, env=None, encoding=None):
+    """
+    외부 도구를 실행하고 stdout/stderr를 줄 단위로 on_line(stream, line)에 전달.
+    process.wait() 후에 파이프를 읽지 않으므로 출력이 많아도 교착 상태가 생기지 않는다.
+    :param timeout: 전체 제한 시간(초), 초과하면 프로세스를 종료
+    :param cancel_event: threading.Event, 설정되면 프로세스를 종료
+    :param stdin_text: 표준 입력으로 보낼 문자열 (예: sqlite3 ".recover")
+    :param stdout_path: 지정하면 stdout을 파일로 저장하고 stderr만 스트리밍
+    :return: (returncode, status)
+    """
+    encoding = encoding or default_encoding()
+    stdout_file = open(stdout_path, "w", encoding=encoding, errors="replace") if stdout_path else None
+    creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin_text is not None else subprocess.DEVNULL,
+            stdout=stdout_file or subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            text=True,
+            encoding=encoding,
+            errors="replace",
+            bufsize=1,
+            creationflags=creationflags,
+        )
+    except Exception:
+        if stdout_file:
+            stdout_file.close()
+        raise
+
+    lines = queue.Queue()
+    streams = [("stderr", process.stderr)]
+    if stdout_file is None:
+        streams.insert(0, ("stdout", process.stdout))
+    for name, pipe in streams:
+        threading.Thread(target=pump_lines, args=(pipe, name, lines), daemon=True).start()
+
+    if stdin_text is not None:
+        try:
+            process.stdin.write(stdin_text)
+            process.stdin.close()
+        except OSError as e:
+            print(f"[ERROR] 표준 입력 전달 실패: {e}")
+
+    deadline = time.monotonic() + timeout if timeout else None
+    status = None
+    open_streams = len(streams)
+    try:
+        while open_streams or process.poll() is None:
+            if cancel_event is not None and cancel_event.is_set():
+                status = STATUS_CANCELLED
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                status = STATUS_TIMEOUT
+                break
+            if not open_streams:
+                time.sleep(POLL_INTERVAL)
+                continue
+            try:
+                name, line = lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+            elif on_line:
+                on_line(name, line)
+    finally:
+        if status is not None:
+            stop_process(process)
+        if stdout_file:
+            stdout_file.close()
+
+    returncode = process.wait()
+    if status is None:
+        status = STATUS_OK if returncode == 0 else STATUS_FAILED
+    return returncode, status
+
+
+class ExternalToolWorker(QThread):
+    """
+    외부 도구(SrumECmd, 복구 스크립트 등)를 백그라운드에서 실행하는 스레드.
+    출력은 줄 단위로, 진행 상황은 progress_pattern에 맞는 줄에서 (완료, 전체)로 전달한다.
+    """
+    output_line = Signal(str, str)    # (stdout/stderr, 줄)
+    progress = Signal(int, int)       # (완료 수, 전체 수; 모르면 0)
+    tool_finished = Signal(bool, str) # (성공 여부, 메시지)
+
+    def __init__(self, command, name=None, timeout=None, progress_pattern=None, total=0,
+                 stdin_text=None, stdout_path=None, cwd=None, env=None, encoding=None):
+        """
+        :param progress_pattern: 진행 줄 정규식. 그룹 2개면 (완료, 전체), 1개면 완료 수,
+                                 그룹이 없으면 일치하는 줄 수를 완료 수로 사용
+        :param total: 전체 작업 수 (정규식에서 얻을 수 없을 때)
+        """
+        super().__init__()
+        self.command = command
+        self.name = name or os.path.basename(str(command[0]))
+        self.timeout = timeout
+        self.progress_pattern = re.compile(progress_pattern) if progress_pattern else None
+        self.total = total
+        self.stdin_text = stdin_text
+        self.stdout_path = stdout_path
+        self.cwd = cwd
+        self.env = env
+        self.encoding = encoding
+        self.returncode = None
+        self.status = None
+        self._done = 0
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """실행 중인 도구 종료 요청 (UI에서 호출)"""
+        self._cancel_event.set()
+
+    def handle_line(self, stream, line):
+        self.output_line.emit(stream, line)
+        if self.progress_pattern is None:
+            return
+        match = self.progress_pattern.search(line)
+        if not match:
+            return
+        groups = match.groups()
+        if len(groups) >= 2:
+            self._done, self.total = int(groups[0]), int(groups[1])
+        elif len(groups) == 1:
+            self._done = int(groups[0])
+        else:
+            self._done += 1
+        self.progress.emit(self._done, self.total)
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            self.returncode, self.status = run_tool(
+                self.command, on_line=self.handle_line, timeout=self.timeout,
+                cancel_event=self._cancel_event, stdin_text=self.stdin_text,
+                stdout_path=self.stdout_path, cwd=self.cwd, env=self.env, encoding=self.encoding)
+        except Exception as e:
+            self.status = STATUS_FAILED
+            self.tool_finished.emit(False, f"{self.name} 실행 중 오류 발생: {e}")
+            return
+
+        elapsed = time.perf_counter() - start
+        if self.status == STATUS_OK:
+            self.tool_finished.emit(True, f"{self.name} 실행 완료 ({elapsed:.1f}초)")
+        elif self.status == STATUS_CANCELLED:
+            self.tool_finished.emit(False, f"{self.name} 실행이 취소되었습니다.")
+        elif self.status == STATUS_TIMEOUT:
+            self.tool_finished.emit(False, f"{self.name} 실행 제한 시간({self.timeout}초)을 초과했습니다.")
+        else:
+            self.tool_finished.emit(False, f"{self.name} 실행 실패 (종료 코드 {self.returncode})")
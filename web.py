@@ -4,6 +4,7 @@ import shutil
 import sqlite3
 import os
 import glob
+import html
 import re
 from datetime import datetime, timedelta, timezone
 from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
@@ -14,6 +15,34 @@ from no_focus_frame_style import NoFocusFrameStyle
 
 
 
+KST = timezone(timedelta(hours=9))
+
+# 연관 히스토리 패널 HTML 템플릿
+HISTORY_TABLE_TEMPLATE = (
+    "<div style='width: 700px; height: 300px; overflow: auto; border: 1px solid #ddd;'>"
+    "<table style='width: 100%; border-collapse: collapse; font-size: 14px;'>"
+    "<thead>"
+    "<tr style='background-color: #f2f2f2;'>"
+    "<th style='border: 1px solid #ddd; padding: 10px; width: 200px;'>URL</th>"
+    "<th style='border: 1px solid #ddd; padding: 10px; width: 200px;'>Title</th>"
+    "<th style='border: 1px solid #ddd; padding: 10px; width: 100px; text-align: center;'>Visit Count</th>"
+    "<th style='border: 1px solid #ddd; padding: 10px; width: 150px;'>Last Visit Time</th>"
+    "</tr>"
+    "</thead>"
+    "<tbody>{rows}</tbody>"
+    "</table>"
+    "</div>"
+)
+HISTORY_ROW_TEMPLATE = (
+    "<tr>"
+    "<td style='border: 1px solid #ddd; padding: 8px; width: 200px; overflow: hidden; text-overflow: ellipsis;'>{url}</td>"
+    "<td style='border: 1px solid #ddd; padding: 8px; width: 200px; overflow: hidden; text-overflow: ellipsis;'>{title}</td>"
+    "<td style='border: 1px solid #ddd; padding: 8px; width: 100px; text-align: center;'>{visit_count}</td>"
+    "<td style='border: 1px solid #ddd; padding: 8px; width: 150px;'>{last_visit_time}</td>"
+    "</tr>"
+)
+HISTORY_MESSAGE_ROW = "<tr><td colspan='4'>{message}</td></tr>"
+
 # 사용자 정의 정규 표현식 매칭 함수
 def regexp(pattern, input_str):
     if input_str is None:
@@ -188,6 +217,8 @@ class WebTableWidget(QWidget):
         self.db_path = db_path  # 부모로부터 전달받은 DB 경로
         self.current_mode = current_mode  # 부모로부터 전달받은 모드
         self.history_db_path = None
+        self.history_indexes = {}  # 히스토리 DB 경로 -> (mtime, 제목별 방문 기록 인덱스)
+        self.related_hits = {}  # (URI, 제목, 타임스탬프) -> 연관 히스토리 방문 기록 리스트
         self.user_path = os.path.expanduser("~")
         self.history_folder = os.path.join(self.user_path, "Desktop", "Recall_load", "Browser_History")
 
@@ -280,13 +311,15 @@ class WebTableWidget(QWidget):
                 if "Related Data" not in headers:
                     headers.append("Related Data")
 
-                # 기존 데이터를 유지하고 확장
+                # 기존 데이터를 유지하고 확장 (행별 연관 히스토리 결과를 캐시에 저장)
+                self.related_hits = {}
                 extended_data = []
                 for row in new_data:
+                    uri = row[0]  # URI
                     title = row[1]  # 타이틀
                     timestamp = row[2]  # 타임스탬프
-                    related_data_status = self.check_related_data(timestamp, title)
-                    extended_data.append(list(row) + [related_data_status])
+                    hits = self.get_related_hits(uri, title, timestamp)
+                    extended_data.append(list(row) + ["O" if hits else "X"])
 
                 # 데이터 모델 갱신
                 self._data = extended_data
@@ -328,72 +361,95 @@ class WebTableWidget(QWidget):
         # 기존 동작과 호환성을 위해 첫 번째 파일을 self.history_db_path로 설정
         self.history_db_path = self.history_db_paths[0] if self.history_db_paths else None
 
+        # 히스토리 파일 구성이 바뀌었으므로 행별 연관 결과를 다시 계산하도록 초기화
+        self.related_hits = {}
+
         # 기존 호출 유지
         self.display_related_history_data()
 
-    def check_related_data(self, timestamp_ukg, title_ukg):
-        """연관 데이터 확인 (여러 히스토리 파일 기반)"""
-        # 히스토리 파일 리스트가 없거나 제목/타임스탬프가 None이면 X 반환
-        if not hasattr(self,
-                       "history_db_paths") or not self.history_db_paths or title_ukg is None or timestamp_ukg is None:
-            return "X"
+    def load_history_index(self, history_db_path):
+        """
+        히스토리 DB의 urls 테이블을 한 번만 읽어 제목 -> 방문 기록 리스트 인덱스를 만든다.
+        파일 수정 시각이 바뀌지 않았다면 캐시된 인덱스를 그대로 사용한다.
+        """
+        try:
+            mtime = os.path.getmtime(history_db_path)
+        except OSError as e:
+            print(f"[DEBUG] 히스토리 파일 접근 오류: {e}")
+            return {}
+
+        cached = self.history_indexes.get(history_db_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        index = {}
+        conn = None
+        try:
+            conn = sqlite3.connect(history_db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT url, title, visit_count, last_visit_time FROM urls WHERE title IS NOT NULL")
+            for url, title, visit_count, last_visit_time in cursor:
+                try:
+                    visit_time = convert_chrome_timestamp(last_visit_time).astimezone(KST)
+                except Exception:
+                    continue
+                index.setdefault(title, []).append({
+                    "url": url,
+                    "title": title,
+                    "visit_count": visit_count,
+                    "last_visit_time": visit_time,
+                    "unix_timestamp": int(visit_time.timestamp()),
+                })
+        except sqlite3.Error as e:
+            print(f"[DEBUG] SQLite 오류 발생: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+        self.history_indexes[history_db_path] = (mtime, index)
+        print(f"[DEBUG] 히스토리 인덱스 생성 완료: {history_db_path} (제목 {len(index)}개)")
+        return index
+
+    def find_related_hits(self, timestamp_ukg, title_ukg):
+        """
+        ukg.db 행의 타임스탬프/제목과 ±1초 이내로 일치하는 모든 히스토리 방문 기록을 반환한다.
+        """
+        if not getattr(self, "history_db_paths", None) or title_ukg is None or timestamp_ukg is None:
+            return []
 
-        # timestamp_ukg가 문자열일 경우 변환
+        # 테이블의 타임스탬프는 KST 문자열
         if isinstance(timestamp_ukg, str):
             try:
-                timestamp_ukg = float(datetime.strptime(timestamp_ukg, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
+                ukg_unix_timestamp = int(
+                    datetime.strptime(timestamp_ukg, "%Y-%m-%d %H:%M:%S").replace(tzinfo=KST).timestamp()
+                )
             except ValueError:
-                return "X"
+                return []
+        else:
+            ukg_unix_timestamp = int(timestamp_ukg / 1000)
 
         simplified_title = simplify_title(title_ukg)
+        if not simplified_title:
+            return []
 
-        # 모든 히스토리 파일을 순회하며 연관 데이터 확인
+        hits = []
         for history_db_path in self.history_db_paths:
-            conn = None
-            try:
-                # SQLite 연결 및 사용자 정의 REGEXP 함수 생성
-                conn = sqlite3.connect(history_db_path)
-                conn.create_function("REGEXP", 2, regexp)
-                cursor = conn.cursor()
-
-                # ukg.db 타임스탬프를 KST로 변환
-                try:
-                    kst_time_ukg = datetime.fromtimestamp(timestamp_ukg / 1000, tz=timezone.utc).astimezone(
-                        timezone(timedelta(hours=9))
-                    )
-                    ukg_unix_timestamp = int(kst_time_ukg.timestamp())
-                except ValueError:
-                    continue
-
-                # 히스토리 데이터와 연관성 확인
-                query = "SELECT title, last_visit_time FROM urls WHERE title REGEXP ?"
-                cursor.execute(query, (simplified_title,))
-                data = cursor.fetchall()
+            for visit in self.load_history_index(history_db_path).get(simplified_title, []):
+                # ±1초의 매칭 허용
+                if abs(visit["unix_timestamp"] - ukg_unix_timestamp) <= 1:
+                    hits.append(visit)
+        return hits
+
+    def get_related_hits(self, uri, title, timestamp):
+        """행 키(URI, 제목, 타임스탬프)에 대한 연관 히스토리 결과를 캐시에서 조회 (없으면 계산 후 저장)"""
+        key = (uri, title, timestamp)
+        if key not in self.related_hits:
+            self.related_hits[key] = self.find_related_hits(timestamp, title)
+        return self.related_hits[key]
 
-                for row in data:
-                    chrome_title = row[0]
-                    chrome_time = row[1]
-
-                    try:
-                        # Chrome 타임스탬프 변환
-                        kst_time_converted = convert_chrome_timestamp(chrome_time).astimezone(
-                            timezone(timedelta(hours=9))
-                        )
-                        browser_unix_timestamp = int(kst_time_converted.timestamp())
-                    except Exception:
-                        continue
-
-                    # ±1초의 매칭 허용
-                    if chrome_title == simplified_title and abs(browser_unix_timestamp - ukg_unix_timestamp) <= 1:
-                        return "O"  # 연관 데이터 있음
-
-            except sqlite3.Error as e:
-                print(f"[DEBUG] SQLite 오류 발생: {e}")
-            finally:
-                if conn:
-                    conn.close()
-
-        return "X"  # 모든 히스토리 파일에서 연관 데이터 없음
+    def check_related_data(self, timestamp_ukg, title_ukg):
+        """연관 데이터 확인 (여러 히스토리 파일 기반)"""
+        return "O" if self.find_related_hits(timestamp_ukg, title_ukg) else "X"
 
     def update_related_data_status(self):
         print("[DEBUG] update_related_data_status 호출됨.")
@@ -401,9 +457,6 @@ class WebTableWidget(QWidget):
             print("[DEBUG] 히스토리 파일 경로가 설정되지 않았습니다.")
             return
 
-        proxy_model = self.proxy_model
-        source_model = proxy_model.sourceModel() if proxy_model else self
-
         model = self.table_view.model()
         if not model:
             print("[DEBUG] 모델이 초기화되지 않았습니다.")
@@ -424,15 +477,15 @@ class WebTableWidget(QWidget):
         rows_to_delete = []
 
         for row in range(model.rowCount()):
+            uri = model.index(row, 0).data()  # URI 열
             title = model.index(row, 1).data()  # 타이틀 열
             timestamp = model.index(row, 2).data()  # 타임스탬프 열
-            simplified_title = simplify_title(title)
 
-            if not simplified_title:
+            if not simplify_title(title):
                 continue
 
-            # Check if the data is related
-            related_data_status = self.check_related_data(timestamp, simplified_title)
+            # 연관 히스토리 결과를 행 단위로 캐시에 저장
+            related_data_status = "O" if self.get_related_hits(uri, title, timestamp) else "X"
             current_status = model.index(row, related_data_column_index).data()
 
             # If current status is 'X' but should be 'O', mark for deletion
@@ -457,6 +510,7 @@ class WebTableWidget(QWidget):
     def display_related_history_data(self, indexes=None):
         """
         선택된 행의 관련 히스토리 데이터를 오른쪽 데이터 뷰어에 HTML 표 형식으로 표시합니다.
+        연관 결과는 로드 시점에 행별로 캐시되므로 선택 시에는 DB를 다시 열지 않습니다.
         """
         if not indexes:
             self.data_viewer.setHtml("<p>히스토리 데이터를 표시할 인덱스가 없습니다.</p>")
@@ -470,109 +524,56 @@ class WebTableWidget(QWidget):
         if isinstance(indexes, QModelIndex):
             indexes = [indexes]
 
+        model = self.table_view.model()
         table_rows = []  # 테이블의 행 데이터를 저장
+        seen_rows = set()
 
         for index in indexes:
-            # 테이블에서 선택된 타이틀과 타임스탬프 가져오기
-            selected_title = self.table_view.model().index(index.row(), 1).data()
-            timestamp_ukg = self.table_view.model().index(index.row(), 2).data()
+            # 같은 행의 여러 셀이 선택된 경우 한 번만 처리
+            if index.row() in seen_rows:
+                continue
+            seen_rows.add(index.row())
+
+            # 테이블에서 선택된 URI, 타이틀과 타임스탬프 가져오기
+            uri = model.index(index.row(), 0).data()
+            selected_title = model.index(index.row(), 1).data()
+            timestamp_ukg = model.index(index.row(), 2).data()
 
             if not selected_title or not timestamp_ukg:
-                table_rows.append("<tr><td colspan='4'>선택된 타이틀 또는 타임스탬프가 비어 있습니다.</td></tr>")
+                table_rows.append(HISTORY_MESSAGE_ROW.format(message="선택된 타이틀 또는 타임스탬프가 비어 있습니다."))
                 continue
 
-            simplified_title = simplify_title(selected_title)
-
-            for history_db_path in self.history_db_paths:
-                try:
-                    # SQLite 연결
-                    conn = sqlite3.connect(history_db_path)
-                    conn.create_function("REGEXP", 2, regexp)
-                    cursor = conn.cursor()
-
-                    # 타임스탬프를 KST로 변환
-                    try:
-                        kst_time = datetime.strptime(timestamp_ukg, "%Y-%m-%d %H:%M:%S").replace(
-                            tzinfo=timezone(timedelta(hours=9))
-                        )
-                        unix_timestamp = int(kst_time.timestamp())
-                    except ValueError as e:
-                        table_rows.append(f"<tr><td colspan='4'>타임스탬프 변환 오류: {e}</td></tr>")
-                        continue
-
-                    # 히스토리 데이터 쿼리
-                    query = "SELECT url, title, visit_count, last_visit_time FROM urls WHERE title REGEXP ?"
-                    cursor.execute(query, (simplified_title,))
-                    data = cursor.fetchall()
-
-                    for row in data:
-                        chrome_title = row[1]
-                        chrome_time = row[3]
-
-                        # Chrome 시간도 KST로 변환
-                        kst_time_converted = convert_chrome_timestamp(chrome_time).astimezone(
-                            timezone(timedelta(hours=9))
-                        )
-                        browser_unix_timestamp = int(kst_time_converted.timestamp())
-
-                        # ±1초 허용
-                        if (
-                                simplified_title == chrome_title
-                                and abs(browser_unix_timestamp - unix_timestamp) <= 1
-                        ):
-                            converted_time = convert_chrome_timestamp(row[3]).astimezone(
-                                timezone(timedelta(hours=9))
-                            )
-                            table_rows.append(
-                                f"<tr>"
-                                f"<td style='border: 1px solid #ddd; padding: 8px; width: 200px; overflow: hidden; text-overflow: ellipsis;'>{row[0]}</td>"
-                                f"<td style='border: 1px solid #ddd; padding: 8px; width: 200px; overflow: hidden; text-overflow: ellipsis;'>{row[1]}</td>"
-                                f"<td style='border: 1px solid #ddd; padding: 8px; width: 100px; text-align: center;'>{row[2]}</td>"
-                                f"<td style='border: 1px solid #ddd; padding: 8px; width: 150px;'>{converted_time}</td>"
-                                f"</tr>"
-                            )
-
-                except sqlite3.Error as e:
-                    table_rows.append(f"<tr><td colspan='4'>히스토리 데이터를 로드하는 중 오류: {e}</td></tr>")
-                finally:
-                    if conn:
-                        conn.close()
+            for hit in self.get_related_hits(uri, selected_title, timestamp_ukg):
+                table_rows.append(HISTORY_ROW_TEMPLATE.format(
+                    url=html.escape(str(hit["url"])),
+                    title=html.escape(str(hit["title"])),
+                    visit_count=hit["visit_count"],
+                    last_visit_time=hit["last_visit_time"],
+                ))
 
         # 테이블 HTML 생성
         if table_rows:
-            html_content = (
-                    "<div style='width: 700px; height: 300px; overflow: auto; border: 1px solid #ddd;'>"
-                    "<table style='width: 100%; border-collapse: collapse; font-size: 14px;'>"
-                    "<thead>"
-                    "<tr style='background-color: #f2f2f2;'>"
-                    "<th style='border: 1px solid #ddd; padding: 10px; width: 200px;'>URL</th>"
-                    "<th style='border: 1px solid #ddd; padding: 10px; width: 200px;'>Title</th>"
-                    "<th style='border: 1px solid #ddd; padding: 10px; width: 100px; text-align: center;'>Visit Count</th>"
-                    "<th style='border: 1px solid #ddd; padding: 10px; width: 150px;'>Last Visit Time</th>"
-                    "</tr>"
-                    "</thead>"
-                    "<tbody>"
-                    + "".join(table_rows) +
-                    "</tbody>"
-                    "</table>"
-                    "</div>"
-            )
+            html_content = HISTORY_TABLE_TEMPLATE.format(rows="".join(table_rows))
         else:
             html_content = "<p>연관된 히스토리 데이터를 찾을 수 없습니다.</p>"
 
         # 텍스트 박스에 HTML 설정
         self.data_viewer.setHtml(html_content)
 
+    def get_history_source_paths(self):
+        """대상 PC의 브라우저별 원본 히스토리 파일 경로"""
+        return {
+            "Chrome": os.path.join(self.user_path, r"AppData\Local\Google\Chrome\User Data\Default\History"),
+            "Edge": os.path.join(self.user_path, r"AppData\Local\Microsoft\Edge\User Data\Default\History"),
+        }
+
     def copy_history_files(self, destination_folder):
         """브라우저 히스토리 파일 복사"""
         # Browser_History 폴더 경로 설정
         browser_history_folder = os.path.join(destination_folder, "Browser_History")
         os.makedirs(browser_history_folder, exist_ok=True)
 
-        history_paths = {
-            "Chrome": os.path.join(self.user_path, r"AppData\Local\Google\Chrome\User Data\Default\History"),
-            "Edge": os.path.join(self.user_path, r"AppData\Local\Microsoft\Edge\User Data\Default\History"),
-        }
+        history_paths = self.get_history_source_paths()
 
         for browser, path in history_paths.items():
             try: